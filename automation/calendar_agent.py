@@ -14,9 +14,12 @@ _active_timers = {}
 def set_reminder(message, minutes):
     """Set a reminder that fires after the specified number of minutes."""
     def _reminder_callback():
+        from core.speech_scheduler import get_scheduler, REMINDER
+
         print(f"REMINDER: {message}")
-        # The main loop can pick this up for speech output
         _active_timers.pop(message, None)
+        spoken = "Your timer is complete, sir." if message == "Timer complete" else f"A reminder, sir: {message}."
+        get_scheduler().say(spoken, priority=REMINDER, key=f"reminder:{message}")
 
     timer = threading.Timer(minutes * 60, _reminder_callback)
     timer.daemon = True
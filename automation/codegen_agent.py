@@ -1,7 +1,8 @@
-import requests
 import yaml
 import os
 
+from core.http_client import get_client
+
 
 def load_api_key():
     with open("config/settings.yaml", "r") as f:
@@ -27,7 +28,7 @@ def generate_code(prompt):
     }
 
     try:
-        response = requests.post(url, json=data, headers={"Content-Type": "application/json"})
+        response = get_client().post(url, json=data, headers={"Content-Type": "application/json"}, timeout=30)
         response.raise_for_status()
         result = response.json()
         code = result['candidates'][0]['content']['parts'][0]['text'].strip()
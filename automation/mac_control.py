@@ -12,6 +12,14 @@ def set_volume(level):
     # AppleScript volume is 0-7 usually, or 0-100 with output volume
     subprocess.run(["osascript", "-e", f'set volume output volume {level}'])
 
+def change_volume(step):
+    """Raise (step > 0) or lower (step < 0) the volume by step points, within 0-100."""
+    subprocess.run(["osascript",
+                    "-e", f"set level to (output volume of (get volume settings)) + {step}",
+                    "-e", "if level > 100 then set level to 100",
+                    "-e", "if level < 0 then set level to 0",
+                    "-e", "set volume output volume level"])
+
 def set_brightness(level):
     """Set brightness (0.0-1.0). Note: This might require 'brightness' brew package or similar, 
     but standard osascript for brightness is tricky without external tools. 
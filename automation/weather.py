@@ -1,6 +1,7 @@
-import requests
 import json
 
+from core.http_client import get_client
+
 def get_weather():
     """
     Get current weather using wttr.in (no API key required).
@@ -9,7 +10,7 @@ def get_weather():
     try:
         # wttr.in is a free weather service that doesn't require API keys
         # It automatically detects location from IP
-        response = requests.get(
+        response = get_client().get(
             "https://wttr.in/?format=j1",
             timeout=5
         )
@@ -1,11 +1,15 @@
 from duckduckgo_search import DDGS
 
+from core.http_client import get_client
+
 def search_web(query):
     """Search the web using DuckDuckGo (HTML backend) and return the first result."""
     print(f"🌐 Searching the web for: {query}")
     try:
         # backend='html' is often more reliable against rate limits
-        results = DDGS().text(query, max_results=1, backend="html")
+        # DDGS has its own HTTP stack, so the call is only timed, not pooled
+        with get_client().timed("html.duckduckgo.com"):
+            results = DDGS().text(query, max_results=1, backend="html")
         if results:
             first_result = results[0]
             return f"Here is what I found: {first_result['title']}. {first_result['body']} (Source: {first_result['href']})"
@@ -0,0 +1,143 @@
+"""
+Benchmark - Speech engine latency and word error rate over a WAV test set.
+
+With --corpus DIR, every WAV in DIR is transcribed by each engine listed in
+--engines and scored against DIR/transcripts.tsv (file name <TAB> text).
+Engines are names from core.voice_input.ASR_BACKENDS, or race:a+b to run
+several in parallel through RacingBackend, e.g.
+
+    python benchmarks/bench_asr.py --corpus ~/jarvis-wavs --engines google,vosk,race:vosk+google
+
+Without --corpus a simulated run shows what racing buys: the phrases from
+benchmarks/data/utterances.txt go through a fast local engine that garbles
+some words (with low confidence) and a slower remote engine that is accurate
+but unreachable 15% of the time, as on a flaky connection.
+
+Usage: python benchmarks/bench_asr.py [--corpus DIR] [--engines LIST]
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+import speech_recognition as sr
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.voice_input import ASRBackend, RacingBackend, create_backend, word_error_rate
+
+
+def load_corpus(directory):
+    transcripts = {}
+    with open(os.path.join(directory, "transcripts.tsv"), "r") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                name, text = line.rstrip("\n").split("\t", 1)
+                transcripts[name] = text
+    cases = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        name = os.path.basename(path)
+        if name in transcripts:
+            with sr.AudioFile(path) as source:
+                cases.append((sr.Recognizer().record(source), transcripts[name]))
+    return cases
+
+
+def build_engine(spec):
+    if spec.startswith("race:"):
+        return RacingBackend([create_backend(name) for name in spec[5:].split("+")])
+    return create_backend(spec)
+
+
+class SimulatedBackend(ASRBackend):
+    """Engine with scripted latency, accuracy and availability (simulation only)."""
+
+    def __init__(self, name, references, delay, garble_rate=0.0, offline_rate=0.0, seed=0):
+        super().__init__()
+        self.name = name
+        self.references = references
+        self.delay = delay
+        self.garble_rate = garble_rate
+        self.offline_rate = offline_rate
+        self.rng = random.Random(seed)
+
+    def _transcribe(self, audio):
+        text = self.references[audio.frame_data]
+        if self.rng.random() < self.offline_rate:
+            time.sleep(self.delay / 4)
+            raise sr.RequestError("connection failed")
+        time.sleep(self.delay * self.rng.uniform(0.7, 1.4))
+        if self.rng.random() < self.garble_rate:
+            words = text.split()
+            words[self.rng.randrange(len(words))] = "uh"
+            return " ".join(words), 0.4
+        return text, 0.92
+
+
+def simulated_cases():
+    path = os.path.join(ROOT, "benchmarks", "data", "utterances.txt")
+    with open(path, "r") as f:
+        phrases = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    cases = [(sr.AudioData(f"{i:04d}".encode(), 16000, 2), text) for i, text in enumerate(phrases)]
+    references = {audio.frame_data: text for audio, text in cases}
+
+    def local():
+        return SimulatedBackend("local", references, delay=0.12, garble_rate=0.2, seed=1)
+
+    def remote():
+        return SimulatedBackend("remote", references, delay=0.45, offline_rate=0.15, seed=2)
+
+    engines = {"local (offline model)": local(), "remote (network)": remote(),
+               "race local+remote": RacingBackend([local(), remote()])}
+    return cases, engines
+
+
+def evaluate(engine, cases):
+    latencies, errors, failures = [], 0.0, 0
+    for audio, reference in cases:
+        start = time.perf_counter()
+        try:
+            text, _ = engine.transcribe(audio)
+        except (sr.UnknownValueError, sr.RequestError):
+            text = None
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+        errors += word_error_rate(reference, text)
+    latencies.sort()
+    return {
+        "wer": errors / len(cases),
+        "failed": failures,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory of WAVs plus transcripts.tsv")
+    parser.add_argument("--engines", default="google", help="Comma-separated engines (default: google)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        cases = load_corpus(args.corpus)
+        engines = {spec: build_engine(spec) for spec in args.engines.split(",")}
+    else:
+        cases, engines = simulated_cases()
+        print("No --corpus given: simulated engines (latency and accuracy are scripted)")
+
+    print(f"{len(cases)} phrases")
+    print(f"  {'engine':24s}{'WER':>7s}{'failed':>8s}{'p50':>9s}{'p95':>9s}")
+    for name, engine in engines.items():
+        result = evaluate(engine, cases)
+        print(f"  {name:24s}{result['wer']:7.1%}{result['failed']:8d}"
+              f"{result['p50']:7.0f}ms{result['p95']:7.0f}ms")
+        if isinstance(engine, RacingBackend):
+            wins = ", ".join(f"{k} {v}" for k, v in engine.wins.items())
+            print(f"  {'':24s}wins: {wins}")
+
+
+if __name__ == "__main__":
+    main()
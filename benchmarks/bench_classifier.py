@@ -0,0 +1,93 @@
+"""
+Benchmark - Offline semantic intent classification before the Gemini fallback.
+
+Replays benchmarks/data/paraphrases.tsv through the same path main.py uses:
+route_command's matcher first, then classify_command() if nothing matched.
+Reports how many Gemini calls the classifier avoids, how often it picks the
+wrong intent or hijacks conversation, its per-utterance latency, and how long
+the index takes to build versus load from the disk cache.
+
+Usage: python benchmarks/bench_classifier.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.command_router import match_intent
+from core.intent_classifier import IntentClassifier, load_prototypes
+
+
+def load_cases():
+    path = os.path.join(ROOT, "benchmarks", "data", "paraphrases.tsv")
+    cases = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                utterance, expected = line.rstrip("\n").split("\t")
+                cases.append((utterance, None if expected == "-" else expected))
+    return cases
+
+
+def time_build(prototypes, index_file):
+    start = time.perf_counter()
+    classifier = IntentClassifier(prototypes, index_file=index_file)
+    return classifier, (time.perf_counter() - start) * 1000
+
+
+def main(rounds=200):
+    prototypes = load_prototypes(os.path.join(ROOT, "config", "intent_prototypes.json"))
+    examples = sum(len(spec.get("examples", [])) for spec in prototypes.values())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = os.path.join(tmp, "intent_index.npz")
+        _, cold_ms = time_build(prototypes, index_file)
+        classifier, warm_ms = time_build(prototypes, index_file)
+
+    cases = load_cases()
+    exact = avoided = wrong = hijacked = 0
+    latencies = []
+
+    for utterance, expected in cases:
+        intent = match_intent(utterance)
+        classified = False
+        if intent is None:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                command = classifier.command_for(utterance)
+            latencies.append((time.perf_counter() - start) / rounds * 1e6)
+            if command:
+                intent, classified = match_intent(command), True
+
+        name = intent.name if intent else None
+        if expected is None and name is not None:
+            hijacked += 1
+            print(f"  hijacked: {utterance!r} -> {name}")
+        elif expected is not None and name == expected:
+            if classified:
+                avoided += 1
+            else:
+                exact += 1
+        elif expected is not None:
+            wrong += 1
+            print(f"  missed:   {utterance!r} -> {name} (wanted {expected})")
+
+    commands = sum(1 for _, expected in cases if expected is not None)
+    latencies.sort()
+    print(f"\nPrototypes: {len(prototypes)} labels, {examples} examples")
+    print(f"Index build: {cold_ms:.1f} ms cold, {warm_ms:.1f} ms from cache")
+    print(f"Utterances: {len(cases)} ({commands} commands, {len(cases) - commands} conversation)")
+    print(f"  matched exactly by router:     {exact}")
+    print(f"  Gemini calls avoided:          {avoided} of {commands - exact}")
+    print(f"  commands still sent to Gemini: {wrong}")
+    print(f"  conversation hijacked:         {hijacked}")
+    if latencies:
+        print(f"Classification latency: median {latencies[len(latencies) // 2]:.0f} us, "
+              f"max {latencies[-1]:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark - ContextMemory, list slicing vs deque with cached fragments.
+
+    list:   the old ContextMemory. add_exchange re-slices the list on every
+            overflow and get_context_string re-joins every exchange
+    deque:  core.context_memory. popleft on overflow, token totals kept
+            as it goes, the context string built once per change
+
+A long session is replayed, with the context string read three times per
+turn. The deque version is timed in memory and with its session file. It
+also times resuming from that file after a restart, against replaying a
+log of every exchange, which the file would be without compaction.
+
+Usage: python benchmarks/bench_context_memory.py [--turns N] [--max-turns N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.context_memory import ContextMemory
+
+
+class LegacyContextMemory:
+    """The ContextMemory before the deque rewrite."""
+
+    def __init__(self, max_turns=10):
+        self.history = []
+        self.max_turns = max_turns
+
+    def add_exchange(self, user_input, assistant_response):
+        self.history.append({"user": user_input, "assistant": assistant_response})
+        if len(self.history) > self.max_turns:
+            self.history = self.history[-self.max_turns:]
+
+    def get_context_string(self):
+        if not self.history:
+            return ""
+        lines = []
+        for exchange in self.history:
+            lines.append(f"User: {exchange['user']}")
+            lines.append(f"JARVIS: {exchange['assistant']}")
+        return "\n".join(lines)
+
+
+def replay(memory, turns):
+    start = time.perf_counter()
+    for i in range(turns):
+        memory.add_exchange(f"question {i} about something or other",
+                            f"A considered answer to question {i}, sir, in a sentence or two.")
+        for _ in range(3):
+            memory.get_context_string()
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--max-turns", type=int, default=50)
+    args = parser.parse_args()
+
+    legacy = replay(LegacyContextMemory(args.max_turns), args.turns)
+    in_memory = replay(ContextMemory(args.max_turns), args.turns)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "conversation.jsonl")
+        memory = ContextMemory(args.max_turns, path=path)
+        persisted = replay(memory, args.turns)
+        memory.close()
+        lines = sum(1 for _ in open(path))
+
+        start = time.perf_counter()
+        ContextMemory(args.max_turns, path=path).close()
+        resume = time.perf_counter() - start
+
+        # The same session as a log of every exchange, without compaction
+        full = os.path.join(directory, "full.jsonl")
+        memory = ContextMemory(args.max_turns, path=full)
+        memory._maybe_compact = lambda: None
+        replay(memory, args.turns)
+        memory.close()
+        start = time.perf_counter()
+        ContextMemory(args.max_turns, path=full).close()
+        resume_full = time.perf_counter() - start
+
+    print(f"{args.turns} exchanges, {args.max_turns} kept, per exchange (add + 3 context strings):")
+    print(f"  list              {legacy:8.1f} us")
+    print(f"  deque             {in_memory:8.1f} us")
+    print(f"  deque + session   {persisted:8.1f} us   (includes the append to disk)")
+    print(f"Resume after restart: {resume * 1000:.1f} ms from {lines} lines, "
+          f"{resume_full * 1000:.1f} ms replaying all {args.turns} exchanges")
+
+
+if __name__ == "__main__":
+    main()
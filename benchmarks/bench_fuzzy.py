@@ -0,0 +1,70 @@
+"""
+Benchmark - Local repair of misheard commands before the Gemini fallback.
+
+Replays benchmarks/data/asr_errors.tsv through the same path main.py uses:
+route_command's matcher first, then correct_command() if nothing matched.
+Reports how many Gemini calls the fuzzy tier avoids, whether it ever
+hijacks real conversation, and its per-utterance latency.
+
+Usage: python benchmarks/bench_fuzzy.py
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.command_router import correct_command, match_intent
+
+
+def load_cases():
+    path = os.path.join(ROOT, "benchmarks", "data", "asr_errors.tsv")
+    cases = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                heard, expected = line.rstrip("\n").split("\t")
+                cases.append((heard, None if expected == "-" else expected))
+    return cases
+
+
+def main(rounds=200):
+    cases = load_cases()
+    exact = repaired = wrong = hijacked = 0
+    latencies = []
+
+    for heard, expected in cases:
+        intent = match_intent(heard)
+        fuzzy = False
+        if intent is None:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                corrected = correct_command(heard)
+            latencies.append((time.perf_counter() - start) / rounds * 1e6)
+            if corrected:
+                intent, fuzzy = match_intent(corrected), True
+
+        name = intent.name if intent else None
+        if expected is None and name is not None:
+            hijacked += 1
+            print(f"  hijacked: {heard!r} -> {name}")
+        elif expected is not None and name == expected:
+            if fuzzy:
+                repaired += 1
+            else:
+                exact += 1
+        elif expected is not None:
+            wrong += 1
+            print(f"  missed:   {heard!r} -> {name} (wanted {expected})")
+
+    commands = sum(1 for _, expected in cases if expected)
+    print(f"Commands: {commands} ({exact} already routed, {repaired} repaired locally, {wrong} missed)")
+    print(f"Gemini calls avoided: {repaired}, conversation hijacked: {hijacked}")
+    latencies.sort()
+    print(f"Fuzzy lookup latency: median {latencies[len(latencies) // 2]:.0f} us, "
+          f"max {latencies[-1]:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark - Bytes sent and serialization time per Gemini request, before and after.
+
+    before:         persona + context joined into one prompt string, then
+                    the whole body json.dumps'd (as requests does for json=)
+    inline:         core.gemini_request. The persona is a precompiled
+                    systemInstruction; only the per-turn text is serialized
+    cached content: the same, with the persona held in Gemini's context
+                    cache and referred to by name
+
+The per-turn text is a typical one: the time, two exchanges and a question.
+
+Usage: python benchmarks/bench_gemini_request.py [--rounds N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from core import gpt_engine
+from core.gemini_request import GeminiRequestTemplate
+
+
+TURN_PROMPT = (
+    "CURRENT CONTEXT: Current time: 22:41 (late night)\n\n"
+    "RECENT CONVERSATION:\n"
+    "User: recommend a book about space\n"
+    "JARVIS: Cosmos by Carl Sagan is a fine choice, sir. Thoughtful and beautifully written.\n"
+    "User: how far away is the moon\n"
+    "JARVIS: About 384,000 kilometres on average, sir.\n\n"
+    "User: who wrote that space book again\n"
+    "JARVIS (respond in character, concisely):"
+)
+
+
+def legacy_body(turn_prompt):
+    """The body as ask_gpt built it before core.gemini_request."""
+    full_prompt = "".join([gpt_engine.JARVIS_PERSONA, "\n\n", turn_prompt])
+    body = {"contents": [{"parts": [{"text": full_prompt}]}], "generationConfig": gpt_engine.GENERATION_CONFIG}
+    return json.dumps(body, allow_nan=False).encode("utf-8")
+
+
+def per_call(build, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        data = build(TURN_PROMPT)
+    return (time.perf_counter() - start) / rounds * 1e6, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    template = GeminiRequestTemplate(gpt_engine.JARVIS_PERSONA, generation_config=gpt_engine.GENERATION_CONFIG)
+    rows = [
+        ("before", per_call(legacy_body, args.rounds)),
+        ("inline", per_call(template.body, args.rounds)),
+        ("cached content", per_call(lambda text: template.body(text, "cachedContents/abc123xyz"), args.rounds)),
+    ]
+    print(f"Persona {len(gpt_engine.JARVIS_PERSONA.encode('utf-8'))} bytes, "
+          f"per-turn text {len(TURN_PROMPT)} bytes, {args.rounds} rounds")
+    for name, (micros, size) in rows:
+        print(f"  {name:15s}{size:7d} bytes  {micros:6.1f} us to serialize")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark - Similarity recall over remembered facts with the memory-mapped index.
+
+Times building memory.memory_index.MemoryIndex for N facts, reopening it
+(replaying rows.log and mapping vectors.f32), an incremental add, and a
+top-3 search, at each size. A linear scan that embeds every fact per query
+is shown for comparison at the smallest size only.
+
+Usage: python benchmarks/bench_memory_index.py [--facts N [N ...]] [--queries N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory.memory_index import MemoryIndex, fact_text
+
+WORDS = ("car", "sister", "birthday", "password", "colour", "doctor", "flight", "office",
+         "garage", "code", "gym", "bank", "school", "holiday", "plant", "coffee")
+
+
+def make_facts(count):
+    return {f"{WORDS[i % len(WORDS)]} {i}": f"{WORDS[(i * 7) % len(WORDS)]} number {i}"
+            for i in range(count)}
+
+
+def linear_search(vectorizer, facts, query, k=3):
+    """Embed every fact for each query: what recall would cost without an index."""
+    vector = vectorizer.transform_one(fact_text(query, ""))
+    scores = [(float(vectorizer.transform_one(fact_text(key, value)) @ vector), key)
+              for key, value in facts.items()]
+    return sorted(scores, reverse=True)[:k]
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--facts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    queries = [f"my {WORDS[i % len(WORDS)]} {i * 13}" for i in range(args.queries)]
+
+    print(f"{'facts':>8s}{'build':>10s}{'reopen':>10s}{'add':>10s}{'search':>10s}{'on disk':>10s}")
+    for count in args.facts:
+        facts = make_facts(count)
+        with tempfile.TemporaryDirectory() as directory:
+            index = MemoryIndex(directory)
+            build, _ = timed(index.sync, facts)
+            index.close()
+            reopen, index = timed(MemoryIndex, directory)
+            add = median([timed(index.add, f"new fact {i}", "something")[0] for i in range(20)])
+            search = median([timed(index.search, query, 3)[0] for query in queries])
+            size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+            if count == args.facts[0]:
+                scan = median([timed(linear_search, index.vectorizer, facts, query)[0]
+                               for query in queries[:5]])
+            index.close()
+        print(f"{count:8d}{build:9.2f}s{reopen * 1000:8.1f}ms{add * 1000:8.2f}ms"
+              f"{search * 1000:8.2f}ms{size / 1e6:8.1f}MB")
+    print(f"Re-embedding all {args.facts[0]} facts per query instead: {scan * 1000:.1f}ms per search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark - remember()/recall() with 100k facts, JSON rewrite vs logged store.
+
+    json file:  the old memory_manager. Every remember() loads the whole
+                profile and rewrites it indented; every recall() parses it
+    log store:  memory.memory_store. A dict in memory plus one fsync'd log
+                append per remember()
+
+Both start from the same 100k facts in a temp directory. It also times
+opening (replaying) the 100k-record log and a compaction.
+
+Usage: python benchmarks/bench_memory_store.py [--facts N] [--ops N]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory.memory_store import MemoryStore
+
+
+def legacy_remember(path, key, value):
+    with open(path, "r") as f:
+        memory = json.load(f)
+    memory[key] = value
+    with open(path, "w") as f:
+        json.dump(memory, f, indent=4)
+
+
+def legacy_recall(path, key):
+    with open(path, "r") as f:
+        return json.load(f).get(key)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--facts", type=int, default=100000)
+    parser.add_argument("--ops", type=int, default=20)
+    args = parser.parse_args()
+
+    facts = {f"fact {i}": f"value number {i} about something worth remembering" for i in range(args.facts)}
+    keys = random.Random(3).sample(list(facts), args.ops)
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = os.path.join(directory, "user_profile.json")
+        with open(legacy, "w") as f:
+            json.dump(facts, f, indent=4)
+        old_write = [timed(legacy_remember, legacy, key, "updated") for key in keys]
+        old_read = [timed(legacy_recall, legacy, key) for key in keys]
+
+        log = os.path.join(directory, "user_profile.log")
+        migrate = timed(lambda: MemoryStore(log, legacy_path=legacy).close())
+        store = MemoryStore(log, legacy_path=None)
+        new_write = [timed(store.set, key, "updated again") for key in keys * 10]
+        new_read = [timed(store.get, key) for key in keys * 1000]
+        store.close()
+
+        reopen = timed(lambda: MemoryStore(log, legacy_path=None).close())
+        store = MemoryStore(log, legacy_path=None)
+        compact = timed(store.compact)
+        size = os.path.getsize(log)
+        store.close()
+
+    print(f"{args.facts} facts, median per call:")
+    print(f"  {'':10s}{'remember':>12s}{'recall':>12s}")
+    print(f"  {'json file':10s}{median(old_write) * 1000:10.1f}ms{median(old_read) * 1000:10.1f}ms")
+    print(f"  {'log store':10s}{median(new_write) * 1000:10.2f}ms{median(new_read) * 1e6:10.2f}us"
+          f"   (remember includes fsync)")
+    print(f"Log store: import from JSON {migrate:.2f}s, open/replay {reopen:.2f}s, "
+          f"compaction {compact:.2f}s, {size / 1e6:.1f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark - Wake word to first audio, serial loop vs asyncio orchestrator.
+
+Every stage is simulated with sleeps so only the scheduling differs:
+
+    legacy:       the original main.py loop - chime, sleep(0.5), "Yes sir?",
+                  sleep(1.2), listen, blocking ask_gpt, speak the whole reply
+    orchestrator: core.orchestrator.Orchestrator with the chime overlapping
+                  acknowledgement synthesis, readiness events instead of fixed
+                  sleeps, and the reply streamed into speak_stream
+
+The real speech_output.speak/speak_stream are used, with synthesis and
+playback replaced by timed stand-ins.
+
+Usage: python benchmarks/bench_orchestrator.py
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import speech_output
+from core.orchestrator import Orchestrator
+
+
+CHIME = 0.30                 # afplay Pop.aiff
+USER_SPEAKS = 1.50           # Capture until end of phrase
+RECOGNITION = 0.50           # Google speech API
+FIRST_TOKEN, PER_SENTENCE = 0.30, 0.20
+SYNTH_BASE, SYNTH_PER_CHAR = 0.15, 0.002
+PLAY_PER_WORD = 0.05
+REPLY = [
+    "Certainly, sir.",
+    "The meaning of life has occupied philosophers for millennia.",
+    "Douglas Adams suggested forty-two, which is admirably concise.",
+]
+
+
+class FakeAudio:
+    """Timed synthesis/playback stand-ins for speech_output."""
+
+    def __init__(self):
+        self.started = []
+
+    def synthesize(self, clean_text, rate=None, pitch=None):
+        time.sleep(SYNTH_BASE + SYNTH_PER_CHAR * len(clean_text))
+        return clean_text
+
+    def play(self, clip, on_start=None, session=None):
+        if on_start:
+            on_start()
+        self.started.append(time.perf_counter())
+        time.sleep(PLAY_PER_WORD * len(clip.split()))
+
+    def patches(self):
+        return [patch.object(speech_output, "_synthesize", self.synthesize),
+                patch.object(speech_output, "_decode", lambda clip: clip),
+                patch.object(speech_output, "_play", self.play),
+                patch.object(speech_output, "get_tts_cache", lambda: None),
+                patch.object(speech_output, "get_phrase_bank", lambda: None),
+                patch("builtins.print")]
+
+
+def capture(timeout=10, phrase_time_limit=15):
+    time.sleep(USER_SPEAKS)
+    return "what is the meaning of life"
+
+
+def recognize(audio):
+    time.sleep(RECOGNITION)
+    return audio
+
+
+def ask_gpt_blocking(command):
+    time.sleep(FIRST_TOKEN + PER_SENTENCE * len(REPLY))
+    return " ".join(REPLY)
+
+
+def ask_gpt_streaming(command):
+    time.sleep(FIRST_TOKEN)
+    for sentence in REPLY:
+        time.sleep(PER_SENTENCE)
+        yield sentence
+
+
+def run_legacy():
+    """The original main.py conversation loop, first turn only."""
+    audio = FakeAudio()
+    patches = audio.patches()
+    for p in patches:
+        p.start()
+    try:
+        woke_at = time.perf_counter()
+        time.sleep(CHIME)                        # play_sound("pop")
+        time.sleep(0.5)                          # Brief pause for mic reset
+        speech_output.speak("Yes sir?")
+        time.sleep(1.2)                          # Allow TTS to fully complete
+        command = recognize(capture())
+        heard_at = time.perf_counter()
+        speech_output.speak(ask_gpt_blocking(command))
+    finally:
+        for p in patches:
+            p.stop()
+    ack, reply = audio.started[0], audio.started[1]
+    return ack - woke_at, reply - heard_at, reply - woke_at
+
+
+def run_orchestrator(stream=True):
+    audio = FakeAudio()
+    wakes = iter([True])
+    parked = threading.Event()
+    done = threading.Event()
+
+    def wait_for_wake():
+        if next(wakes, False):
+            return True
+        parked.wait(1)
+        return False
+
+    def acknowledge(on_start):
+        chime = threading.Thread(target=time.sleep, args=(CHIME,))
+        chime.start()
+
+        def start():
+            chime.join()
+            on_start()
+        speech_output.speak("Yes sir?", on_start=start)
+
+    def deliver(reply, on_start):
+        if isinstance(reply, str):
+            speech_output.speak(reply, on_start=on_start)
+        else:
+            speech_output.speak_stream(reply, on_start=on_start)
+        done.set()
+
+    orchestrator = Orchestrator(
+        wait_for_wake=wait_for_wake,
+        capture=capture,
+        recognize=recognize,
+        process=ask_gpt_streaming if stream else ask_gpt_blocking,
+        deliver=deliver,
+        acknowledge=acknowledge,
+        followup_listen=(0, 0),
+    )
+
+    async def scenario():
+        task = asyncio.ensure_future(orchestrator.run())
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+        orchestrator.stop()
+        await task
+
+    patches = audio.patches()
+    for p in patches:
+        p.start()
+    try:
+        asyncio.run(scenario())
+    finally:
+        for p in patches:
+            p.stop()
+    first = orchestrator.metrics[0]
+    return first["wake_to_ack"], first["speech_to_audio"], first["wake_to_audio"]
+
+
+def main():
+    print(f"Simulated turn: chime {CHIME}s, user speaks {USER_SPEAKS}s, recognition {RECOGNITION}s, "
+          f"Gemini {FIRST_TOKEN}s + {PER_SENTENCE}s/sentence x {len(REPLY)}")
+    print(f"{'':26s}{'wake->ack':>11s}{'speech->reply':>15s}{'wake->reply':>13s}")
+    for name, run in (("legacy serial loop", run_legacy),
+                      ("orchestrator, blocking", lambda: run_orchestrator(stream=False)),
+                      ("orchestrator, streaming", run_orchestrator)):
+        ack, reply, total = run()
+        print(f"  {name:24s}{ack:10.2f}s{reply:14.2f}s{total:12.2f}s")
+
+
+if __name__ == "__main__":
+    main()
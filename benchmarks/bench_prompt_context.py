@@ -0,0 +1,131 @@
+"""
+Benchmark - Size of the Gemini prompt, last 5 exchanges vs relevance-packed context.
+
+    last 5:    the old _build_prompt. Persona, time and the last 5 exchanges
+               verbatim, whatever was asked
+    relevant:  core.prompt_context. The latest exchange, older exchanges
+               and remembered facts that relate to the question, within
+               the token budget
+
+A scripted 12-question conversation is replayed against a temp memory
+index holding a few facts. Every question is sent with the history so far.
+The script prints the average and largest prompt, request body bytes,
+how many questions got a relevant fact, and the cost of building the
+context with and without the per-turn cache.
+
+Usage: python benchmarks/bench_prompt_context.py [--budget TOKENS]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from core import gpt_engine
+from core.prompt_context import PromptContextBuilder, estimate_tokens
+from memory.memory_index import MemoryIndex
+
+
+FACTS = {
+    "the car": "an Audi R8",
+    "my sister": "Morgan",
+    "wifi password": "hunter2",
+    "favorite color": "hot rod red",
+    "my dentist appointment": "Thursday at 3pm",
+}
+
+CONVERSATION = [
+    ("recommend a book about space", "Cosmos by Carl Sagan is a fine choice, sir. Thoughtful and beautifully written."),
+    ("what's the capital of Australia", "Canberra, sir, though Sydney would like you to think otherwise."),
+    ("how far away is the moon", "About 384,000 kilometres on average, sir."),
+    ("what should I buy my sister for her birthday", "Perhaps a first edition of something she loves, sir."),
+    ("give me a pasta recipe", "Cacio e pepe, sir. Pasta, pecorino and black pepper. Simple and elegant."),
+    ("who wrote that space book again", "Carl Sagan, sir."),
+    ("should I paint my car", "A fresh coat in your favourite red would hardly go unnoticed, sir."),
+    ("what time is my dentist appointment", "Thursday at three, sir. I'd avoid the toffee until then."),
+    ("how do I make the pasta creamier", "Emulsify the cheese with starchy pasta water, sir, off the heat."),
+    ("explain black holes briefly", "Regions where gravity is so strong not even light escapes, sir."),
+    ("what's a good gift under fifty dollars", "A quality notebook or a good book is rarely a miss, sir."),
+    ("tell me a fun fact about the moon", "The moon drifts about 3.8 centimetres further from Earth each year, sir."),
+]
+
+
+def legacy_prompt(prompt, history):
+    """The prompt _build_prompt sent before core.prompt_context."""
+    parts = [gpt_engine.JARVIS_PERSONA, "\n\n", f"CURRENT CONTEXT: {gpt_engine.get_time_context()}", "\n\n"]
+    if history:
+        parts.append("RECENT CONVERSATION:\n")
+        for exchange in history[-5:]:
+            parts.append(f"User: {exchange['user']}\n")
+            parts.append(f"JARVIS: {exchange['assistant']}\n")
+        parts.append("\n")
+    parts.append(f"User: {prompt}\n")
+    parts.append("JARVIS (respond in character, concisely):")
+    return "".join(parts)
+
+
+def new_prompt(builder, prompt, history):
+    context = builder.build(prompt, history, None, gpt_engine.get_time_context())
+    full_prompt = "".join([gpt_engine.JARVIS_PERSONA, "\n\n", context.text, f"User: {prompt}\n",
+                           "JARVIS (respond in character, concisely):"])
+    return full_prompt, context
+
+
+def body_bytes(full_prompt):
+    """Size of the request body as it was built before core.gemini_request."""
+    body = {"contents": [{"parts": [{"text": full_prompt}]}], "generationConfig": gpt_engine.GENERATION_CONFIG}
+    return len(json.dumps(body).encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=int, default=350)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = MemoryIndex(directory)
+        index.sync(FACTS)
+        builder = PromptContextBuilder(
+            budget_tokens=args.budget,
+            search_facts=lambda query, k: [(key, FACTS[key], score) for key, score in index.search(query, k)],
+            facts_version=lambda: 0,
+        )
+
+        old_tokens, new_tokens, old_bytes, new_bytes, with_facts, seconds = [], [], [], [], 0, []
+        history = []
+        for question, answer in CONVERSATION:
+            old = legacy_prompt(question, history)
+            start = time.perf_counter()
+            new, context = new_prompt(builder, question, history)
+            seconds.append(time.perf_counter() - start)
+            old_tokens.append(estimate_tokens(old))
+            new_tokens.append(estimate_tokens(new))
+            old_bytes.append(body_bytes(old))
+            new_bytes.append(body_bytes(new))
+            with_facts += context.count("fact") > 0
+            history.append({"user": question, "assistant": answer})
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            new_prompt(builder, question, history[:-1])
+        cached = (time.perf_counter() - start) / 1000
+        index.close()
+
+    persona = estimate_tokens(gpt_engine.JARVIS_PERSONA)
+    print(f"{len(CONVERSATION)} questions, persona alone ~{persona} tokens, context budget {args.budget}")
+    print(f"  {'':10s}{'avg tokens':>12s}{'max tokens':>12s}{'avg body':>12s}{'context':>10s}")
+    for name, tokens, sizes in (("last 5", old_tokens, old_bytes), ("relevant", new_tokens, new_bytes)):
+        print(f"  {name:10s}{sum(tokens) / len(tokens):12.0f}{max(tokens):12d}"
+              f"{sum(sizes) / len(sizes):11.0f}B{(sum(tokens) / len(tokens) - persona):10.0f}")
+    print(f"Remembered facts sent with {with_facts} of {len(CONVERSATION)} questions (never before)")
+    print(f"Building the context: {sum(seconds) / len(seconds) * 1000:.2f} ms, "
+          f"{cached * 1e6:.1f} us when cached for the turn")
+
+
+if __name__ == "__main__":
+    main()
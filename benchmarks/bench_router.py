@@ -0,0 +1,79 @@
+"""
+Benchmark - Intent routing cost as the number of intents grows.
+
+Compares the compiled IntentMatcher against the old style of testing every
+intent's phrases in order with `phrase in text`. Only matching is timed;
+handlers are never called.
+
+Usage: python benchmarks/bench_router.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.command_router import router
+from core.intent_matcher import Intent, IntentMatcher
+
+UTTERANCES = [
+    "open chrome",
+    "unmute",
+    "set volume to 40",
+    "what's the weather like outside",
+    "remind me to stretch in 30 minutes",
+    "what did i tell you about my car",
+    "i am iron man",
+    "make me a suit",
+    "tell me a joke about cats",
+]
+
+
+def _linear_match(intents, text):
+    """The original if/elif chain, expressed over the intent table."""
+    for intent in intents:
+        if any(phrase in text for phrase in intent.phrases):
+            if all(any(phrase in text for phrase in group) for group in intent.requires):
+                return intent
+    return None
+
+
+def _synthetic_intents(count):
+    """Extra intents appended after the real ones, like future plugins."""
+    return [Intent(f"extra_{i}", [f"launch gadget {i}", f"toggle device {i} now"], None)
+            for i in range(count)]
+
+
+def _time_per_call(func, rounds=200):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in UTTERANCES:
+            func(text)
+    return (time.perf_counter() - start) / (rounds * len(UTTERANCES)) * 1e6
+
+
+def _cold_import_ms(module_name, runs=5):
+    """Best-of-N wall time to import a module in a fresh interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"import time; t = time.perf_counter(); import {module_name}; print(time.perf_counter() - t)"
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        timings.append(float(out.stdout.strip()) * 1000)
+    return min(timings)
+
+
+def main():
+    print(f"Cold import of core.command_router: {_cold_import_ms('core.command_router'):.1f} ms\n")
+    print(f"{'intents':>8} {'linear (us)':>12} {'compiled (us)':>14}")
+    for extra in (0, 100, 500, 2000):
+        intents = router.intents + _synthetic_intents(extra)
+        matcher = IntentMatcher(intents)
+        linear = _time_per_call(lambda text: _linear_match(intents, text))
+        compiled = _time_per_call(matcher.match)
+        print(f"{len(intents):>8} {linear:>12.2f} {compiled:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
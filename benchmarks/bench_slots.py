@@ -0,0 +1,97 @@
+"""
+Benchmark - Slot extraction over the recorded utterance corpus.
+
+Times the old per-handler parsing (inline re.search/re.sub pattern strings
+and chained str.replace calls) against Intent.parse(), which runs one
+precompiled scan plus one precompiled phrase strip per utterance.
+
+Usage: python benchmarks/bench_slots.py
+"""
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.command_router import router
+
+
+def load_corpus():
+    """Load benchmarks/data/utterances.txt, skipping comments and blanks."""
+    path = os.path.join(ROOT, "benchmarks", "data", "utterances.txt")
+    with open(path, "r") as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.startswith("#")]
+
+
+def _legacy_parse(name, text):
+    """Parameter parsing as the pre-registry route_command did it."""
+    if name == "volume":
+        return re.search(r'volume.*?(\d+)', text)
+    if name == "brightness":
+        return re.search(r'brightness.*?(\d+)', text)
+    if name == "set_timer":
+        return re.search(r'(\d+)\s*minute', text)
+    if name == "set_reminder":
+        match = re.search(r'(?:in|after)\s+(\d+)\s*minute', text)
+        message = re.sub(r'(?:set reminder|remind me)(?:\s+to)?', '', text)
+        return match, re.sub(r'(?:in|after)\s+\d+\s*minutes?', '', message).strip()
+    if name == "open_url":
+        return text.replace("open url", "").replace("go to", "").strip()
+    if name == "web_search":
+        return text.replace("search for", "").replace("google", "").replace("look up", "").strip()
+    if name == "find_file":
+        return text.replace("find file", "").replace("locate file", "").strip()
+    if name == "open_file":
+        return text.replace("open file", "").strip()
+    if name == "generate_code":
+        return text.replace("generate code", "").replace("write code", "").strip()
+    if name == "notify":
+        return text.replace("notify", "").replace("send notification", "").strip()
+    return None
+
+
+def _legacy_route(text):
+    """The old if/elif chain's matching plus its inline parameter parsing."""
+    for intent in router.intents:
+        if any(phrase in text for phrase in intent.phrases) and \
+                all(any(phrase in text for phrase in group) for group in intent.requires):
+            return _legacy_parse(intent.name, text)
+    return None
+
+
+def _compiled_route(text):
+    intent = router.match(text)
+    return intent.parse(text) if intent else None
+
+
+def _per_utterance_us(func, items, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in items:
+            func(*item)
+    return (time.perf_counter() - start) / (rounds * len(items)) * 1e6
+
+
+def main(rounds=2000):
+    corpus = load_corpus()
+    matched = [(router.match(text), text) for text in corpus]
+    matched = [(intent, text) for intent, text in matched if intent is not None]
+    with_params = [(i, t) for i, t in matched if _legacy_parse(i.name, t) is not None]
+
+    print(f"Corpus: {len(corpus)} utterances, {len(with_params)} with parameters\n")
+    print(f"{'':34} {'legacy':>8} {'compiled':>9}  (us/utterance)")
+
+    legacy = _per_utterance_us(lambda i, t: _legacy_parse(i.name, t), with_params, rounds)
+    compiled = _per_utterance_us(lambda i, t: i.parse(t), with_params, rounds)
+    print(f"{'slot parsing, parameterised only':34} {legacy:8.2f} {compiled:9.2f}")
+
+    items = [(t,) for t in corpus]
+    legacy = _per_utterance_us(_legacy_route, items, rounds)
+    compiled = _per_utterance_us(_compiled_route, items, rounds)
+    print(f"{'match + slots, whole corpus':34} {legacy:8.2f} {compiled:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark - End of speech to finished action, batch vs streaming speculation.
+
+Each command is replayed at real-time speed (WavFileSource(realtime=True)
+on an AudioBus, read through BusMicrophone) into capture_command, exactly
+as main.py listens:
+
+    batch:     VAD endpoint -> whole-phrase recognition (0.45 s, like the
+               Google round trip) -> route_command
+    streaming: scripted partial transcripts while the audio plays; stable
+               speculative commands are routed mid-utterance and committed
+               when the streamed final transcript confirms them
+
+Routing an app launch is simulated as a 0.3 s `open -a`. The audio is
+synthetic (harmonic "syllables", 0.35 s per word); the partials trail each
+word by 150 ms, roughly what Vosk does. "open notion" is heard as "open
+notes" for 350 ms before the engine corrects it, to show a cancelled
+speculation.
+
+Usage: python benchmarks/bench_speculative.py
+"""
+import os
+import sys
+import tempfile
+import time
+import wave
+from unittest.mock import patch
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import voice_input
+from core.audio_bus import AudioBus
+from core.speculative import SpeculativeRouter
+from core.voice_input import StubBackend, capture_command, recognize_audio
+from core.wake_word import BusMicrophone, WavFileSource
+
+
+RATE = 16000
+LEAD, WORD, TRAIL = 0.3, 0.35, 1.0
+ASR_LAG = 0.15
+BATCH_RECOGNITION = 0.45
+ROUTE_COST = 0.3
+
+COMMANDS = [
+    ("open chrome", None),
+    ("open spotify please", None),
+    ("battery status", None),
+    ("set volume to forty", None),          # Not speculative: has a slot
+    ("open notion", ["open", "notes"]),     # Misheard at first
+    ("what time is it", None),              # Goes to Gemini; nothing to speculate
+]
+
+
+class ReplayEngine(StubBackend):
+    """Streams the scripted partials; whole-phrase recognition takes BATCH_RECOGNITION."""
+
+    def _transcribe(self, audio):
+        time.sleep(BATCH_RECOGNITION)
+        return self.script[-1][1], 1.0
+
+
+def script_for(words, early=None):
+    """Partials after each word, as a streaming engine would emit them."""
+    script = []
+    for i in range(len(words)):
+        heard = (early if early and i < len(early) else words)[:i + 1]
+        script.append((LEAD + WORD * (i + 1) + ASR_LAG, " ".join(heard)))
+    # A misheard word is only corrected once the engine has more context
+    settle = 0.35 if early else 0.1
+    script.append((LEAD + WORD * len(words) + ASR_LAG + settle, " ".join(words)))
+    return script
+
+
+def synth_wav(path, n_words, seed):
+    rng = np.random.default_rng(seed)
+    pieces = [np.zeros(int(LEAD * RATE))]
+    for _ in range(n_words):
+        n = int(WORD * RATE)
+        t = np.arange(n) / RATE
+        f0 = rng.uniform(110, 200)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 10))
+        pieces.append(voiced * np.sin(np.pi * np.arange(n) / n) ** 0.3 * 3000)
+    pieces.append(np.zeros(int(TRAIL * RATE)))
+    samples = np.concatenate(pieces) + np.random.default_rng(seed).standard_normal(
+        sum(len(p) for p in pieces)) * 30
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+
+
+def run(path, words, early, streaming):
+    routed = []
+
+    def route(text):
+        routed.append(text)
+        time.sleep(ROUTE_COST)
+        return f"Done: {text}"
+
+    engine = ReplayEngine(script=script_for(words, early))
+    speculator = SpeculativeRouter(route=route)
+    bus = AudioBus(WavFileSource(path, frame_length=512, realtime=True))
+    with patch.object(voice_input, "_cached_asr", engine), \
+            patch.object(voice_input, "_shared_source", BusMicrophone(bus, preroll=0)), \
+            patch("builtins.print"):
+        speech_end = time.perf_counter() + LEAD + WORD * len(words)
+        bus.start()
+        audio = capture_command(timeout=3, on_partial=speculator.update if streaming else None)
+        command = recognize_audio(audio)
+        # As main.process_command does
+        reply = speculator.resolve(command)
+        if reply is None:
+            reply = route(command)
+        done = time.perf_counter()
+    bus.close()
+    return done - speech_end, command, routed, speculator.stats
+
+
+def main():
+    print(f"Real-time replay: {WORD}s/word, partials lag {ASR_LAG}s, whole-phrase ASR "
+          f"{BATCH_RECOGNITION}s, route {ROUTE_COST}s")
+    print(f"  {'command':22s}{'batch':>9s}{'streaming':>11s}  speculation")
+    totals = [0.0, 0.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (text, early) in enumerate(COMMANDS):
+            words = text.split()
+            path = os.path.join(tmp, f"command_{i}.wav")
+            synth_wav(path, len(words), seed=i)
+            batch, _, _, _ = run(path, words, early, streaming=False)
+            stream, command, routed, stats = run(path, words, early, streaming=True)
+            if stats["committed"]:
+                outcome = f"committed '{routed[0]}'"
+            elif stats["cancelled"]:
+                outcome = f"cancelled '{routed[0]}', routed '{command}'"
+            else:
+                outcome = "none"
+            totals[0] += batch
+            totals[1] += stream
+            print(f"  {text:22s}{batch:8.2f}s{stream:10.2f}s  {outcome}")
+    n = len(COMMANDS)
+    print(f"  {'mean':22s}{totals[0] / n:8.2f}s{totals[1] / n:10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark - Time to first audio, blocking vs streamed Gemini replies.
+
+A local HTTP server stands in for Gemini: it answers :generateContent after
+the whole reply has been "generated", and :streamGenerateContent?alt=sse with
+one server-sent event per sentence as it is produced. Speech synthesis and
+playback are replaced by sleeps proportional to the text, so the benchmark
+measures only how the stages overlap:
+
+    blocking:  ask_gpt()        -> speak()
+    streaming: ask_gpt_stream() -> speak_stream()
+
+Usage: python benchmarks/bench_streaming.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from core import gpt_engine, speech_output
+
+
+REPLY = [
+    "Certainly, sir.",
+    "The meaning of life has occupied philosophers for millennia, and they have yet to reach consensus.",
+    "Douglas Adams suggested forty-two, which is at least admirably concise.",
+    "Shall I compile a reading list on the subject?",
+]
+FIRST_TOKEN_DELAY = 0.30   # Seconds before Gemini produces anything
+SENTENCE_DELAY = 0.20      # Seconds of generation per sentence
+SYNTH_BASE, SYNTH_PER_CHAR = 0.15, 0.002
+PLAY_PER_WORD = 0.05
+
+
+class MockGemini(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Gemini streams with chunked transfer encoding
+
+    def _send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(FIRST_TOKEN_DELAY)
+        if "streamGenerateContent" in self.path:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for sentence in REPLY:
+                time.sleep(SENTENCE_DELAY)
+                # Split mid-sentence, like real token chunks
+                for piece in (sentence[:len(sentence) // 2], sentence[len(sentence) // 2:] + " "):
+                    event = {"candidates": [{"content": {"parts": [{"text": piece}]}}]}
+                    self._send_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            self._send_chunk(b"")
+        else:
+            time.sleep(SENTENCE_DELAY * len(REPLY))
+            body = json.dumps({"candidates": [{"content": {"parts": [{"text": " ".join(REPLY)}]}}]})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeAudio:
+    """Synthesis/playback stand-ins that record when audio starts."""
+
+    def __init__(self):
+        self.first_audio = None
+        self.finished = None
+
+    def synthesize(self, clean_text, rate=None, pitch=None):
+        time.sleep(SYNTH_BASE + SYNTH_PER_CHAR * len(clean_text))
+        return clean_text
+
+    def play(self, clip, on_start=None, session=None):
+        if on_start:
+            on_start()
+        if self.first_audio is None:
+            self.first_audio = time.perf_counter()
+        time.sleep(PLAY_PER_WORD * len(clip.split()))
+        self.finished = time.perf_counter()
+
+
+def run(streaming):
+    audio = FakeAudio()
+    with patch.object(speech_output, "_synthesize", audio.synthesize), \
+            patch.object(speech_output, "_decode", lambda clip: clip), \
+            patch.object(speech_output, "_play", audio.play), \
+            patch.object(speech_output, "get_tts_cache", lambda: None), \
+            patch.object(speech_output, "get_phrase_bank", lambda: None):
+        start = time.perf_counter()
+        if streaming:
+            speech_output.speak_stream(gpt_engine.ask_gpt_stream("what is the meaning of life"))
+        else:
+            speech_output.speak(gpt_engine.ask_gpt("what is the meaning of life"))
+    return (audio.first_audio - start) * 1000, (audio.finished - start) * 1000
+
+
+def main(rounds=3):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/v1beta/models/mock"
+
+    with patch.object(gpt_engine, "URL", base + ":generateContent"), \
+            patch.object(gpt_engine, "STREAM_URL", base + ":streamGenerateContent?alt=sse"), \
+            patch.object(gpt_engine, "get_response_cache", lambda: None), \
+            patch("builtins.print"):
+        results = {mode: [run(mode == "streaming") for _ in range(rounds)]
+                   for mode in ("blocking", "streaming")}
+    server.shutdown()
+
+    print(f"Mock reply: {len(REPLY)} sentences, first token after {FIRST_TOKEN_DELAY * 1000:.0f} ms, "
+          f"{SENTENCE_DELAY * 1000:.0f} ms per sentence")
+    for mode, runs in results.items():
+        first = sorted(r[0] for r in runs)[len(runs) // 2]
+        total = sorted(r[1] for r in runs)[len(runs) // 2]
+        print(f"  {mode:9s}  time to first audio {first:6.0f} ms   reply finished {total:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark - Cost of cleaning text for speech, legacy passes vs single scan vs memoized.
+
+    legacy:      the old _clean_text_for_speech, 6 str.replace calls and
+                 7 re.sub passes per utterance
+    single scan: core.text_normalizer.expand, one combined pattern
+    memoized:    normalize_for_speech on a realistic stream in which most
+                 utterances repeat (router replies, alerts, greetings)
+
+The texts are the golden corpus in tests/data plus every static phrase the
+phrase bank finds in the source. It also lists the corpus entries where
+the legacy cleaner said something different.
+
+Usage: python benchmarks/bench_text_normalizer.py [--rounds N]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.text_normalizer import expand, normalize_for_speech
+
+
+CORPUS = os.path.join(ROOT, "tests", "data", "speech_normalization.json")
+
+
+def legacy_clean(text):
+    """The cleaner speech_output used before core.text_normalizer."""
+    clean = text.replace("*", "").replace("#", "").replace("`", "").replace("_", " ")
+    clean = re.sub(r'[^\w\s,?.!\'\"\-\:\;\(\)%]', '', clean)
+    clean = clean.replace("vs.", "versus")
+    clean = clean.replace("etc.", "etcetera")
+    clean = clean.replace("e.g.", "for example")
+    clean = clean.replace("i.e.", "that is")
+    clean = re.sub(r'(\d+)%', r'\1 percent', clean)
+    clean = re.sub(r'(\d+\.?\d*)\s*GB', r'\1 gigabytes', clean)
+    clean = re.sub(r'(\d+\.?\d*)\s*MB', r'\1 megabytes', clean)
+    clean = re.sub(r'(\d+\.?\d*)\s*KB', r'\1 kilobytes', clean)
+    clean = re.sub(r'\s+', ' ', clean).strip()
+    return clean
+
+
+def load_texts():
+    from core.phrase_bank import scan_source, SOURCES
+
+    with open(CORPUS, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    texts = [case["text"] for case in corpus]
+    os.chdir(ROOT)
+    for path in SOURCES:
+        found, templates = scan_source(path)
+        texts += [text for text, _, _ in found + templates]
+    return corpus, texts
+
+
+def per_call(clean, stream, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in stream:
+            clean(text)
+    return (time.perf_counter() - start) / (rounds * len(stream)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus, texts = load_texts()
+    # 80% of utterances repeat one of the first 20 texts
+    rng = random.Random(7)
+    stream = [rng.choice(texts[:20]) if rng.random() < 0.8 else rng.choice(texts) for _ in range(len(texts) * 4)]
+
+    print(f"{len(texts)} distinct texts, stream of {len(stream)} utterances, {args.rounds} rounds")
+    legacy = per_call(legacy_clean, stream, args.rounds)
+    single = per_call(expand, stream, args.rounds)
+    normalize_for_speech.cache_clear()
+    per_call(normalize_for_speech, stream, 1)
+    info = normalize_for_speech.cache_info()  # Hit rate over one pass of the stream
+    memoized = per_call(normalize_for_speech, stream, args.rounds)
+    print(f"  legacy       {legacy:6.1f} us per utterance")
+    print(f"  single scan  {single:6.1f} us per utterance")
+    print(f"  memoized     {memoized:6.1f} us per utterance  "
+          f"({info.hits / (info.hits + info.misses):.0%} hits, {info.currsize} entries)")
+
+    changed = [case for case in corpus if legacy_clean(case["text"]) != case["spoken"]]
+    print(f"Golden corpus: {len(changed)}/{len(corpus)} texts spoken differently than before, e.g.")
+    for case in changed[:8]:
+        print(f"  {legacy_clean(case['text'])!r:50.50} -> {case['spoken']!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark - Per-utterance overhead of speech output, subprocesses vs in-process.
+
+Network synthesis time is the same either way and is left out; this
+measures what each speak() call costs on top of it:
+
+    subprocess: the old path - start the edge-tts CLI (a Python interpreter
+                importing edge_tts), osascript and afplay (`true` stands in
+                for both), plus the 0.15 s and 0.3 s Bluetooth sleeps
+    in-process: speak() with the stub engine, in-memory WAV decoding and
+                the shared AudioPlayer writing to a MemoryOutput
+
+It then has four threads speak at once and checks that every clip was
+played whole, one after another.
+
+Usage: python benchmarks/bench_tts_inprocess.py [--rounds N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import speech_output
+from core.audio_output import AudioPlayer, MemoryOutput
+
+
+PHRASE = "Chrome is now at your disposal, sir."
+LEGACY_SLEEPS = 0.15 + 0.3
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def legacy_overhead():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import edge_tts"], check=True)
+    subprocess.run(["true"], check=True)      # osascript
+    subprocess.run(["true"], check=True)      # afplay
+    return time.perf_counter() - start + LEGACY_SLEEPS
+
+
+def patches(player, engine):
+    return [patch.object(speech_output, "_cached_player", player),
+            patch.object(speech_output, "_cached_tts", engine),
+            patch.object(speech_output, "get_tts_cache", lambda: None),
+            patch.object(speech_output, "get_phrase_bank", lambda: None),
+            patch("builtins.print")]
+
+
+def inprocess_overhead(rounds):
+    player = AudioPlayer(MemoryOutput())
+    engine = speech_output.StubTTSBackend()
+    active = patches(player, engine)
+    for p in active:
+        p.start()
+    try:
+        speech_output.speak(PHRASE)  # Warm up: opens the output, imports numpy paths
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            speech_output.speak(PHRASE)
+            times.append(time.perf_counter() - start)
+    finally:
+        for p in active:
+            p.stop()
+        player.close()
+    return times
+
+
+def concurrent_check(speakers=4):
+    """Several threads speak at once; return (clips played whole, clips expected)."""
+    output = MemoryOutput(realtime=True)
+    player = AudioPlayer(output)
+    engine = speech_output.StubTTSBackend()
+    texts = [f"Alert number {i}, sir." for i in range(speakers)]
+    active = patches(player, engine)
+    for p in active:
+        p.start()
+    try:
+        threads = [threading.Thread(target=speech_output.speak, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for p in active:
+            p.stop()
+        player.close()
+
+    from core.audio_output import decode_audio
+    clips = [decode_audio(engine.synthesize(text)).tobytes() for text in texts]
+    played = bytes(output.played)
+    whole = sum(1 for clip in clips if clip in played)
+    return whole, len(clips), len(played) == sum(len(clip) for clip in clips)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    legacy = [legacy_overhead() for _ in range(args.rounds)]
+    inprocess = inprocess_overhead(args.rounds)
+    print(f"Overhead per utterance beyond synthesis ({args.rounds} rounds, median):")
+    print(f"  subprocess  {median(legacy) * 1000:7.1f} ms  (3 process starts + {LEGACY_SLEEPS:.2f} s sleeps)")
+    print(f"  in-process  {median(inprocess) * 1000:7.1f} ms")
+
+    whole, expected, exact = concurrent_check()
+    print(f"Concurrent speakers: {whole}/{expected} clips played whole, "
+          f"{'no' if exact else 'unexpected'} extra audio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark - End-of-utterance latency and accuracy, VAD vs energy threshold.
+
+Runs a labelled WAV corpus through both listeners, fed chunk by chunk as a
+microphone would:
+
+    energy: speech_recognition's Recognizer.listen with the voice_input
+            settings (pause_threshold 0.8 s), threshold from the noise floor
+    vad:    core.vad.listen with the default VoiceActivityDetector
+
+and reports, per noise condition, how long after the true end of speech the
+endpoint was declared, how often a phrase was cut short or missed, and the
+VAD's frame-level precision/recall.
+
+Without --corpus a synthetic corpus is generated: voiced syllables (harmonic
+stacks at 100-220 Hz), unvoiced fricatives and short word gaps, over white
+noise or a fan hum at several SNRs. A real corpus is a directory of 16-bit
+mono WAVs, each with a .json sidecar: {"speech": [[start_s, end_s], ...],
+"noise_rms": <ambient RMS>}.
+
+Usage: python benchmarks/bench_vad.py [--corpus DIR] [--files-per-condition N]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.vad import VoiceActivityDetector, listen as vad_listen
+from core.voice_input import MIN_ENERGY_THRESHOLD
+
+
+RATE = 16000
+SPEECH_RMS = 3000
+CONDITIONS = [("quiet room", "white", 35), ("white noise", "white", 20),
+              ("noisy", "white", 12), ("fan hum", "fan", 15)]
+
+
+def synth_utterance(rng):
+    """Return (samples, [(start, end), ...]) for one made-up command."""
+    pieces, segments, t = [], [], 0
+    for i in range(rng.integers(4, 12)):
+        if i and rng.random() < 0.5:
+            gap = int(RATE * rng.uniform(0.04, 0.18))    # Stop closure / word gap
+            pieces.append(np.zeros(gap))
+            t += gap
+        n = int(RATE * rng.uniform(0.08, 0.12 if rng.random() < 0.25 else 0.25))
+        time = np.arange(n) / RATE
+        if n < RATE * 0.121 and rng.random() < 0.6:
+            sound = np.diff(rng.standard_normal(n + 1)) * 0.6  # Fricative: high-passed noise
+        else:
+            f0 = rng.uniform(100, 220)
+            sound = sum(np.sin(2 * np.pi * f0 * k * time + rng.uniform(0, 6)) / k for k in range(1, 12))
+        envelope = np.sin(np.pi * np.arange(n) / n) ** 0.5
+        sound = sound * envelope
+        sound *= SPEECH_RMS * rng.uniform(0.5, 1.5) / (np.sqrt(np.mean(sound ** 2)) + 1e-9)
+        pieces.append(sound)
+        segments.append((t, t + n))
+        t += n
+    return np.concatenate(pieces), segments
+
+
+def synth_noise(rng, kind, n, rms):
+    if kind == "fan":
+        time = np.arange(n) / RATE
+        noise = np.sin(2 * np.pi * 60 * time) + 0.5 * np.sin(2 * np.pi * 120 * time)
+        noise += 0.7 * np.convolve(rng.standard_normal(n), np.ones(8) / 8, mode="same") * 3
+    else:
+        noise = rng.standard_normal(n)
+    return noise * rms / np.sqrt(np.mean(noise ** 2))
+
+
+def generate_corpus(directory, per_condition, seed=7):
+    rng = np.random.default_rng(seed)
+    for name, kind, snr in CONDITIONS:
+        for i in range(per_condition):
+            speech, segments = synth_utterance(rng)
+            lead, trail = int(RATE * rng.uniform(0.5, 1.0)), int(RATE * 2.0)
+            samples = np.concatenate((np.zeros(lead), speech, np.zeros(trail)))
+            noise_rms = SPEECH_RMS / 10 ** (snr / 20)
+            samples = samples + synth_noise(rng, kind, len(samples), noise_rms)
+            path = os.path.join(directory, f"{name.replace(' ', '_')}_{i:02d}.wav")
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(RATE)
+                wav.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+            with open(path[:-4] + ".json", "w") as f:
+                json.dump({"condition": name, "noise_rms": noise_rms,
+                           "speech": [((s + lead) / RATE, (e + lead) / RATE) for s, e in segments]}, f)
+
+
+class ReplaySource(sr.AudioSource):
+    """A WAV file read chunk by chunk, counting what the listener consumed."""
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.SAMPLE_RATE = RATE
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = 1024
+        self.stream = self
+        self.consumed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def read(self, size):
+        chunk = self.samples[self.consumed:self.consumed + size]
+        self.consumed += len(chunk)
+        return chunk.tobytes()
+
+
+def energy_listener(noise_rms):
+    recognizer = sr.Recognizer()
+    recognizer.dynamic_energy_threshold = True
+    recognizer.dynamic_energy_adjustment_damping = 0.15
+    recognizer.dynamic_energy_ratio = 1.5
+    recognizer.pause_threshold = 0.8
+    recognizer.phrase_threshold = 0.3
+    recognizer.non_speaking_duration = 0.5
+    recognizer.energy_threshold = max(noise_rms * recognizer.dynamic_energy_ratio, MIN_ENERGY_THRESHOLD)
+    return lambda source: recognizer.listen(source, timeout=5, phrase_time_limit=15)
+
+
+def run(path):
+    with wave.open(path, "rb") as wav:
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    with open(path[:-4] + ".json") as f:
+        label = json.load(f)
+    speech_end = label["speech"][-1][1]
+    vad = VoiceActivityDetector(RATE)
+
+    results = {}
+    listeners = [("energy", energy_listener(label["noise_rms"])),
+                 ("vad", lambda source: vad_listen(source, vad, timeout=5, phrase_time_limit=15,
+                                                   noise_floor=label["noise_rms"]))]
+    for name, listener in listeners:
+        source = ReplaySource(samples)
+        try:
+            listener(source)
+            results[name] = source.consumed / RATE - speech_end
+        except sr.WaitTimeoutError:
+            results[name] = None
+
+    # Frame-level accuracy over the whole file
+    vad.reset(label["noise_rms"])
+    predicted = np.array(vad.classify(samples))
+    centers = (np.arange(len(predicted)) + 0.5) * vad.frame_length / RATE
+    truth = np.zeros(len(predicted), dtype=bool)
+    for start, end in label["speech"]:
+        truth |= (centers >= start) & (centers < end)
+    results["tp"] = int(np.sum(predicted & truth))
+    results["fp"] = int(np.sum(predicted & ~truth))
+    results["fn"] = int(np.sum(~predicted & truth))
+    return label.get("condition", "corpus"), results
+
+
+def summarize(name, rows):
+    line = f"  {name:12s}"
+    for method in ("energy", "vad"):
+        latencies = [r[method] for r in rows if r[method] is not None]
+        missed = len(rows) - len(latencies)
+        cut = sum(1 for value in latencies if value < 0)
+        ok = sorted(value for value in latencies if value >= 0)
+        median = f"{ok[len(ok) // 2] * 1000:6.0f}ms" if ok else "     -  "
+        line += f"{median}  cut {cut:2d} miss {missed:2d}   "
+    tp, fp, fn = (sum(r[k] for r in rows) for k in ("tp", "fp", "fn"))
+    line += f"{tp / max(tp + fp, 1):6.1%}{tp / max(tp + fn, 1):8.1%}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory of labelled WAVs (default: synthetic)")
+    parser.add_argument("--files-per-condition", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if not corpus:
+            corpus = tmp
+            generate_corpus(corpus, args.files_per_condition)
+        paths = sorted(glob.glob(os.path.join(corpus, "*.wav")))
+
+        by_condition = {}
+        for path in paths:
+            condition, results = run(path)
+            by_condition.setdefault(condition, []).append(results)
+
+    print(f"{len(paths)} utterances; endpoint = median delay after the true end of speech "
+          f"(chunk = 64 ms)")
+    print(f"  {'':12s}{'energy (pause 0.8 s)':33s}{'vad (hangover 250 ms)':33s}{'precision':>9s}{'recall':>8s}")
+    for condition, rows in by_condition.items():
+        summarize(condition, rows)
+    summarize("all", [r for rows in by_condition.values() for r in rows])
+
+
+if __name__ == "__main__":
+    main()
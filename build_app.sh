@@ -15,6 +15,10 @@ fi
 echo "Cleaning previous builds..."
 rm -rf build dist
 
+# Pre-render fixed phrases so they play instantly on first launch
+echo "Pre-rendering voice phrases..."
+python -m core.phrase_bank || echo "Phrase bank skipped (edge-tts unavailable); it will be built at first boot."
+
 # Build the app
 echo "Building application..."
 python setup.py py2app
@@ -0,0 +1,207 @@
+"""
+JARVIS Audio Bus - One capture thread feeding every consumer of the microphone.
+
+A background thread reads the AudioSource continuously into a fixed-size
+NumPy ring buffer. Consumers (wake word detector, command recognizer) each
+hold a BusReader with their own cursor, so nobody has to open the microphone
+or wait for it to warm up, and a listener can start slightly in the past
+(pre-roll) so the first syllable of a command is never clipped.
+
+The ring is mirrored - every sample is written twice, capacity apart - so any
+window up to the full capacity is one contiguous slice and readers get
+zero-copy views. A view stays valid until the writer laps it (capacity
+seconds later); copy it if you need to keep it longer.
+
+The bus also tracks the ambient noise floor from every frame, replacing the
+0.5 s adjust_for_ambient_noise that used to run before each command.
+"""
+import collections
+import threading
+
+import numpy as np
+
+
+class NoiseFloor:
+    """
+    Running estimate of the background level (RMS of 16-bit samples).
+
+    Minimum statistics: frame energies are lightly smoothed, and the floor is
+    the quietest smoothed value over the last few seconds. Speech - the
+    user's or JARVIS's own - always has gaps, so it does not drag the floor
+    up, while a genuinely noisier room is picked up within one window.
+    """
+
+    def __init__(self, frames_per_block=16, blocks=6, smoothing=0.3):
+        """
+        Args:
+            frames_per_block: Frames summarized by one stored minimum.
+            blocks: Number of block minima kept (window = blocks x block).
+            smoothing: EMA weight of the newest frame's RMS.
+        """
+        self.frames_per_block = frames_per_block
+        self.smoothing = smoothing
+        self._minima = collections.deque(maxlen=blocks)
+        self._smoothed = None
+        self._block_min = None
+        self._block_frames = 0
+
+    def update(self, rms):
+        if self._smoothed is None:
+            self._smoothed = rms
+        else:
+            self._smoothed += self.smoothing * (rms - self._smoothed)
+        if self._block_min is None or self._smoothed < self._block_min:
+            self._block_min = self._smoothed
+        self._block_frames += 1
+        if self._block_frames >= self.frames_per_block:
+            self._minima.append(self._block_min)
+            self._block_min = None
+            self._block_frames = 0
+
+    @property
+    def value(self):
+        """Current floor, or None before any audio has been seen."""
+        candidates = list(self._minima)
+        if self._block_min is not None:
+            candidates.append(self._block_min)
+        return min(candidates) if candidates else None
+
+
+class AudioBus:
+    """Capture thread writing 16-bit mono audio into a shared ring buffer."""
+
+    def __init__(self, source, capacity_seconds=10.0):
+        """
+        Args:
+            source: AudioSource to capture from (see core.wake_word).
+            capacity_seconds: How much history the ring keeps.
+        """
+        self.source = source
+        self.sample_rate = source.sample_rate
+        self.capacity = int(capacity_seconds * self.sample_rate)
+        self._ring = np.zeros(self.capacity * 2, dtype=np.int16)
+        self.written = 0           # Total samples captured since start()
+        self.eof = False
+        self.error = None          # Exception that stopped the capture thread
+        self.noise = NoiseFloor()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the capture thread (once)."""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._capture, name="jarvis-audio-bus", daemon=True)
+            self._thread.start()
+        return self
+
+    def _capture(self):
+        try:
+            while self._running:
+                frame = self.source.read()
+                if not frame:
+                    break
+                self._write(np.frombuffer(frame, dtype=np.int16))
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.eof = True
+                self._cond.notify_all()
+
+    def _write(self, samples):
+        # Update the floor first, so a reader woken by these samples sees it
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2))) if len(samples) else 0.0
+        self.noise.update(rms)
+
+        for start in range(0, len(samples), self.capacity):
+            self._write_chunk(samples[start:start + self.capacity])
+
+    def _write_chunk(self, samples):
+        n = len(samples)
+        pos = self.written % self.capacity
+        first = min(n, self.capacity - pos)
+        # Mirror every sample so any window <= capacity is contiguous
+        for offset in (pos, pos + self.capacity):
+            self._ring[offset:offset + first] = samples[:first]
+        if first < n:
+            rest = samples[first:]
+            self._ring[:n - first] = rest
+            self._ring[self.capacity:self.capacity + n - first] = rest
+        with self._cond:
+            self.written += n
+            self._cond.notify_all()
+
+    def reader(self, preroll=0.0):
+        """
+        Create a reader positioned at the live edge.
+
+        Args:
+            preroll: Seconds of already captured audio to include.
+        """
+        with self._cond:
+            back = min(int(preroll * self.sample_rate), self.capacity, self.written)
+            return BusReader(self, self.written - back)
+
+    @property
+    def noise_floor(self):
+        """Current ambient RMS estimate (0 before any audio)."""
+        return self.noise.value or 0.0
+
+    def close(self):
+        """Stop capturing and release the source."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.source.close()
+
+
+class BusReader:
+    """One consumer's cursor into the AudioBus."""
+
+    def __init__(self, bus, position=0):
+        self.bus = bus
+        self.position = position   # Absolute sample index of the next read
+        self.overruns = 0          # Times this reader fell a full ring behind
+
+    def available(self):
+        """Samples captured but not yet read."""
+        return self.bus.written - self.position
+
+    def seek(self, position):
+        """Move to an absolute sample index, clamped to what the ring still holds."""
+        bus = self.bus
+        self.position = min(max(position, bus.written - bus.capacity, 0), bus.written)
+
+    def drain(self):
+        """Skip to the live edge, discarding anything unread."""
+        self.position = self.bus.written
+
+    def view(self, size, timeout=None):
+        """
+        Block until size samples are available and return them without copying.
+
+        Args:
+            size: Number of samples (at most the ring capacity).
+            timeout: Seconds to wait; None waits as long as capture runs.
+
+        Returns:
+            int16 array view, shorter than size only if capture has stopped.
+        """
+        bus = self.bus
+        with bus._cond:
+            bus._cond.wait_for(lambda: bus.written - self.position >= size or bus.eof, timeout)
+            if bus.written - self.position > bus.capacity:
+                # Too slow to keep up; resume from the oldest audio still held
+                self.overruns += 1
+                self.position = bus.written - bus.capacity
+            size = min(size, bus.written - self.position)
+            start = self.position % bus.capacity
+            self.position += size
+            return bus._ring[start:start + size]
+
+    def read(self, size):
+        """File-like read of size samples, returned as bytes (for speech_recognition)."""
+        return self.view(size).tobytes()
@@ -0,0 +1,229 @@
+"""
+JARVIS Audio Output - One persistent output stream fed by an utterance queue.
+
+speak() used to write each reply to /tmp/jarvis_response.mp3 and run afplay
+on it. That meant a process start per utterance, a Bluetooth profile switch
+and a settle sleep around every clip. It also meant that two threads
+speaking at once (the monitor and a reply) overwrote each other's file.
+AudioPlayer opens the output device once. A playback thread takes
+Utterances from a queue and writes their samples to the device in small
+blocks. Any thread may call play(); utterances are heard one after another
+in the order they were queued.
+
+Audio is decoded in memory: WAV with the wave module, MP3 (what edge-tts
+produces) with miniaudio.
+"""
+import io
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+
+SAMPLE_RATE = 24000  # edge-tts renders 24 kHz mono
+
+
+def decode_audio(data, sample_rate=SAMPLE_RATE):
+    """
+    Decode a WAV or MP3 file held in memory.
+
+    Args:
+        data: The encoded file contents.
+        sample_rate: Rate to return the samples at.
+
+    Returns:
+        Mono int16 NumPy array.
+    """
+    if data[:4] == b"RIFF":
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError("Only 16-bit WAV audio is supported")
+            channels, rate = wav.getnchannels(), wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != sample_rate and len(samples):
+            positions = np.arange(int(len(samples) * sample_rate / rate)) * rate / sample_rate
+            samples = np.interp(positions, np.arange(len(samples)), samples)
+        return np.asarray(samples).astype(np.int16)
+
+    import miniaudio
+
+    decoded = miniaudio.decode(data, output_format=miniaudio.SampleFormat.SIGNED16,
+                               nchannels=1, sample_rate=sample_rate)
+    return np.frombuffer(decoded.samples, dtype=np.int16)
+
+
+class AudioOutput:
+    """Push-based sink for 16-bit mono PCM."""
+
+    sample_rate = SAMPLE_RATE
+
+    def write(self, data):
+        """Play bytes of samples, blocking while the device buffer is full."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the device."""
+
+
+class PyAudioOutput(AudioOutput):
+    """The default output device through one PyAudio stream, kept open until close()."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frames_per_buffer=1024):
+        import pyaudio
+
+        self.sample_rate = sample_rate
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            rate=sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            output=True,
+            frames_per_buffer=frames_per_buffer
+        )
+
+    def write(self, data):
+        self._stream.write(data)
+
+    def close(self):
+        self._stream.close()
+        self._pa.terminate()
+
+
+class MemoryOutput(AudioOutput):
+    """Collects everything played, for tests and benchmarks."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, realtime=False):
+        """
+        Args:
+            sample_rate: Rate the samples are played at.
+            realtime: Block for the duration of each write, like a sound card.
+        """
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.played = bytearray()
+
+    def write(self, data):
+        self.played += data
+        if self.realtime:
+            time.sleep(len(data) / 2 / self.sample_rate)
+
+
+class Utterance:
+    """One clip waiting for, or in, playback."""
+
+    def __init__(self, samples, on_start=None):
+        self.samples = samples
+        self.on_start = on_start
+        self.started_at = None
+        self.cancelled = False
+        self.error = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+
+    def cancel(self):
+        """Stop this utterance (or skip it if it has not started)."""
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        """
+        Block until the utterance has played (or was cancelled).
+
+        Returns:
+            False on timeout.
+
+        Raises:
+            Whatever on_start raised.
+        """
+        if not self.done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+
+class AudioPlayer:
+    """Plays queued utterances, one at a time, through a persistent output."""
+
+    def __init__(self, output=None, block=1024):
+        """
+        Args:
+            output: AudioOutput; opened with PyAudioOutput() on start() if omitted.
+            block: Samples per write, which bounds how quickly cancel() takes effect.
+        """
+        self.output = output
+        self.block = block
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def sample_rate(self):
+        return self.output.sample_rate if self.output else SAMPLE_RATE
+
+    def start(self):
+        """Open the output and start the playback thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                if self.output is None:
+                    self.output = PyAudioOutput()
+                self._thread = threading.Thread(target=self._run, name="jarvis-audio-out", daemon=True)
+                self._thread.start()
+        return self
+
+    def play(self, samples, on_start=None):
+        """
+        Queue samples for playback. Safe to call from any thread.
+
+        Args:
+            samples: Mono int16 array at the player's sample rate.
+            on_start: Optional callback run on the playback thread just
+                      before the first sample is written.
+
+        Returns:
+            The queued Utterance.
+        """
+        utterance = Utterance(samples, on_start)
+        self.start()
+        self._queue.put(utterance)
+        return utterance
+
+    def _run(self):
+        while True:
+            utterance = self._queue.get()
+            if utterance is None:
+                break
+            try:
+                if utterance.cancelled:
+                    continue
+                if utterance.on_start:
+                    try:
+                        utterance.on_start()
+                    except Exception as e:
+                        utterance.error = e
+                utterance.started_at = time.perf_counter()
+                utterance.started.set()
+                data = np.asarray(utterance.samples, dtype="<i2").tobytes()
+                step = self.block * 2
+                for offset in range(0, len(data), step):
+                    if utterance.cancelled:
+                        break
+                    self.output.write(data[offset:offset + step])
+            except Exception as e:
+                utterance.error = e
+            finally:
+                utterance.done.set()
+
+    def close(self):
+        """Finish queued utterances, stop the thread and release the output."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self.output is not None:
+            self.output.close()
+            self.output = None
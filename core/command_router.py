@@ -1,31 +1,338 @@
 """
 JARVIS Command Router - Routes voice commands to appropriate actions.
 Enhanced with Iron Man style commands and responses.
+
+Intents are declared below in precedence order on an IntentRegistry and
+compiled into a single-pass phrase matcher (see core/intent_matcher.py).
+Automation modules are imported lazily, the first time an intent needs them.
 """
-from automation.app_launcher import open_app
-from automation.mac_control import mute_system, unmute_system, set_volume, set_brightness, speak_system_status
-from automation.web_search import search_web
-from automation.weather import get_weather
-from automation.file_ops import list_files, find_file, open_file
-from automation.web_agent import open_url, open_youtube, open_github
-from automation.codegen_agent import generate_code
-from automation.email_agent import check_email, summarize_inbox
-from automation.calendar_agent import set_reminder, start_timer, list_reminders, check_calendar
-from memory.memory_manager import remember, recall
-from logic.behavior_runner import (
-    run_study_mode_tree, run_morning_routine_tree,
-    run_focus_routine_tree, run_code_session_tree,
-)
-from monitoring.system_monitor import get_system_summary, get_active_app
-from monitoring.weekly_summary import get_weekly_summary
-from ui.notifier import notify
-from core.gpt_engine import generate_diagnostic_report, get_jarvis_greeting
-import re
+from core.fuzzy_matcher import FuzzyMatcher
+from core.intent_registry import IntentRegistry, lazy_import
+from core.slot_extractor import SlotScan
+
+
+# Action functions - each module is imported on first call
+open_app = lazy_import("automation.app_launcher", "open_app")
+mute_system = lazy_import("automation.mac_control", "mute_system")
+unmute_system = lazy_import("automation.mac_control", "unmute_system")
+set_volume = lazy_import("automation.mac_control", "set_volume")
+change_volume = lazy_import("automation.mac_control", "change_volume")
+set_brightness = lazy_import("automation.mac_control", "set_brightness")
+speak_system_status = lazy_import("automation.mac_control", "speak_system_status")
+search_web = lazy_import("automation.web_search", "search_web")
+get_weather = lazy_import("automation.weather", "get_weather")
+list_files = lazy_import("automation.file_ops", "list_files")
+find_file = lazy_import("automation.file_ops", "find_file")
+open_file = lazy_import("automation.file_ops", "open_file")
+open_url = lazy_import("automation.web_agent", "open_url")
+open_youtube = lazy_import("automation.web_agent", "open_youtube")
+open_github = lazy_import("automation.web_agent", "open_github")
+generate_code = lazy_import("automation.codegen_agent", "generate_code")
+check_email = lazy_import("automation.email_agent", "check_email")
+summarize_inbox = lazy_import("automation.email_agent", "summarize_inbox")
+set_reminder = lazy_import("automation.calendar_agent", "set_reminder")
+start_timer = lazy_import("automation.calendar_agent", "start_timer")
+list_reminders = lazy_import("automation.calendar_agent", "list_reminders")
+check_calendar = lazy_import("automation.calendar_agent", "check_calendar")
+remember = lazy_import("memory.memory_manager", "remember")
+recall = lazy_import("memory.memory_manager", "recall")
+run_study_mode_tree = lazy_import("logic.behavior_runner", "run_study_mode_tree")
+run_morning_routine_tree = lazy_import("logic.behavior_runner", "run_morning_routine_tree")
+run_focus_routine_tree = lazy_import("logic.behavior_runner", "run_focus_routine_tree")
+run_code_session_tree = lazy_import("logic.behavior_runner", "run_code_session_tree")
+get_system_summary = lazy_import("monitoring.system_monitor", "get_system_summary")
+get_active_app = lazy_import("monitoring.system_monitor", "get_active_app")
+get_weekly_summary = lazy_import("monitoring.weekly_summary", "get_weekly_summary")
+notify = lazy_import("ui.notifier", "notify")
+generate_diagnostic_report = lazy_import("core.gpt_engine", "generate_diagnostic_report")
+get_jarvis_greeting = lazy_import("core.gpt_engine", "get_jarvis_greeting")
 
 
 # Special command flag for shutdown
 SHUTDOWN_REQUESTED = False
 
+NO_MATCH_RESPONSE = "Command recognized, but no matching action was found."
+
+router = IntentRegistry()
+
+# Volume points moved by "volume up" / "volume down"
+VOLUME_STEP = 10
+
+
+def _call(action):
+    """Handler that returns the result of a no-argument action."""
+    return lambda command: action()
+
+
+def _launch(app_name):
+    """Handler that opens an application."""
+    return lambda command: open_app(app_name)
+
+
+# --- JARVIS Identity & Greetings ---
+router.add("identity", ["who are you", "what are you", "introduce yourself"],
+           reply=("I am JARVIS, sir. Just A Rather Very Intelligent System. "
+                  "I was designed to assist you with tasks, manage your systems, "
+                  "and occasionally offer unsolicited opinions. How may I help?"))
+router.add("capabilities", ["what can you do", "your capabilities", "help me"],
+           reply=("I can open applications, search the web, check the weather, "
+                  "manage your schedule, monitor system health, remember things for you, "
+                  "and much more. Simply ask, sir, and I shall endeavor to assist."))
+router.add("greeting", ["good morning", "good afternoon", "good evening", "hello", "hi jarvis"],
+           _call(get_jarvis_greeting))
+router.add("thanks", ["thank you", "thanks jarvis", "thanks"], reply="At your service, sir. Always.")
+router.add("goodbye", ["good night", "goodbye", "see you later", "bye"],
+           reply="Goodnight, sir. I'll be here when you need me.")
+
+
+# --- Shutdown/Sleep Commands ---
+@router.intent("shutdown", ["shut down", "shutdown", "go to sleep", "power off", "exit"])
+def _shutdown(command):
+    global SHUTDOWN_REQUESTED
+    SHUTDOWN_REQUESTED = True
+    return "SHUTDOWN_REQUESTED"
+
+
+# --- Diagnostics ---
+router.add("diagnostics", ["run diagnostics", "system diagnostics", "full diagnostic", "systems check",
+                           "status report"], _call(generate_diagnostic_report))
+
+# --- App Launching ---
+# (intent name, trigger phrases, application, reply)
+APPS = [
+    ("open_vscode", ["open vs code", "open vscode"], "Visual Studio Code", "Launching Visual Studio Code, sir."),
+    ("open_chrome", ["open chrome"], "Google Chrome", "Chrome is now at your disposal, sir."),
+    ("open_safari", ["open safari"], "Safari", "Launching Safari, sir."),
+    ("open_terminal", ["open terminal"], "Terminal", "Terminal ready for your commands, sir."),
+    ("open_notion", ["open notion"], "Notion", "Opening Notion, sir."),
+    ("open_slack", ["open slack"], "Slack", "Launching Slack. Time to catch up on messages, sir."),
+    ("open_spotify", ["open spotify"], "Spotify", "Spotify is ready. What shall we listen to, sir?"),
+    ("open_finder", ["open finder"], "Finder", "Finder at your service, sir."),
+    ("open_messages", ["open messages", "open imessage"], "Messages", "Opening Messages, sir."),
+    ("open_mail", ["open mail"], "Mail", "Mail application ready, sir."),
+    ("open_notes", ["open notes"], "Notes", "Notes ready for your thoughts, sir."),
+    ("open_calendar", ["open calendar"], "Calendar", "Calendar opened, sir."),
+]
+for _name, _phrases, _app_name, _reply in APPS:
+    router.add(_name, _phrases, _launch(_app_name), reply=_reply, speculative=True)
+
+# --- System Control ("unmute" must stay ahead of "mute") ---
+router.add("unmute", ["unmute"], _call(unmute_system), reply="Audio restored, sir.")
+router.add("mute", ["mute"], _call(mute_system), reply="System muted, sir. Blessed silence.")
+
+
+@router.intent("volume", ["volume"], slots={"level": "int"})
+def _volume(command):
+    if "level" in command.slots:
+        level = command.slots["level"]
+        set_volume(level)
+        return f"Volume set to {level} percent, sir."
+    # "Volume up/down" (the intent classifier's paraphrases) move relative to the current level
+    words = command.text.split()
+    if "up" in words:
+        change_volume(VOLUME_STEP)
+        return "Volume up, sir."
+    if "down" in words:
+        change_volume(-VOLUME_STEP)
+        return "Volume down, sir."
+    return "Please specify a volume level, sir."
+
+
+@router.intent("brightness", ["brightness"], slots={"level": "int"})
+def _brightness(command):
+    if "level" in command.slots:
+        level = command.slots["level"] / 100.0
+        set_brightness(level)
+        return f"Brightness adjusted to {int(level*100)} percent, sir."
+    return "Please specify a brightness level, sir."
+
+
+# --- System Status ---
+router.add("system_summary", ["system summary", "system report"], _call(get_system_summary), speculative=True)
+router.add("battery", ["battery", "power level"], _call(speak_system_status), speculative=True)
+router.add("active_app", ["active app", "what app", "current app"], _call(get_active_app), speculative=True)
+
+
+# --- Weather ---
+@router.intent("weather", ["weather", "temperature", "temp", "outside", "forecast"])
+def _weather(command):
+    weather = get_weather()
+    # Add JARVIS flair to weather response
+    return f"Sir, {weather.lower()}"
+
+
+# --- Behavior Trees / Modes ---
+router.add("study_mode", ["study mode"], _call(run_study_mode_tree))
+router.add("morning_routine", ["morning routine"], _call(run_morning_routine_tree))
+router.add("focus_mode", ["focus mode"], _call(run_focus_routine_tree))
+router.add("code_session", ["code session", "coding mode"], _call(run_code_session_tree))
+
+
+# --- Web Navigation ---
+@router.intent("open_youtube", ["open youtube"], slots={"search": r"search(.*)", "play": r"play(.*)"})
+def _youtube(command):
+    query = command.slots.get("search", command.slots.get("play", "")).strip() or None
+    open_youtube(query)
+    return f"Opening YouTube{' and searching' if query else ''}, sir."
+
+
+router.add("open_github", ["open github"], _call(open_github), reply="GitHub at your command, sir.",
+           speculative=True)
+
+
+@router.intent("open_url", ["open url", "go to"], slots={"url": "url"})
+def _url(command):
+    url = command.slots.get("url") or command.remainder
+    if url:
+        open_url(url)
+        return f"Navigating to {url}, sir."
+    return "Please specify a URL, sir."
+
+
+# --- Web Search ---
+@router.intent("web_search", ["search for", "google", "look up"])
+def _search(command):
+    return search_web(command.remainder)
+
+
+# --- File Operations ---
+@router.intent("list_files", ["list files", "show files"], slots={"directory": r"in (.*)"})
+def _list_files(command):
+    directory = command.slots["directory"].strip() if "directory" in command.slots else None
+    return list_files(directory)
+
+
+@router.intent("find_file", ["find file", "locate file"], slots={"filename": "filename"})
+def _find_file(command):
+    return find_file(command.slots.get("filename") or command.remainder)
+
+
+@router.intent("open_file", ["open file"])
+def _open_file(command):
+    return open_file(command.remainder)
+
+
+# --- Code Generation ---
+@router.intent("generate_code", ["generate code", "write code"])
+def _generate_code(command):
+    if command.remainder:
+        return generate_code(command.remainder)
+    return "What code shall I generate, sir?"
+
+
+# --- Timers & Reminders ---
+@router.intent("set_timer", ["set timer", "start timer"], slots={"duration": "duration"})
+def _timer(command):
+    if "duration" in command.slots:
+        minutes = command.slots["duration"].minutes
+        start_timer(minutes)
+        return f"Timer set for {minutes} minutes, sir. I'll alert you when it concludes."
+    return "Please specify the duration, sir."
+
+
+@router.intent("set_reminder", ["set reminder", "remind me"])
+def _reminder(command):
+    # "for 5 minutes" belongs to the message; the time is the last "in"/"after" duration
+    when = [d for d in SlotScan(command.text).durations if d.prefix in ("in", "after")]
+    if when:
+        duration = when[-1]
+        minutes = duration.minutes
+        message = command.without(duration.span)
+        if message.startswith("to "):
+            message = message[3:].strip()
+        if not message:
+            message = "Reminder"
+        set_reminder(message, minutes)
+        return f"Reminder set, sir. I'll notify you in {minutes} minutes."
+    return "Please specify when to remind you, sir. For example, 'remind me to stretch in 30 minutes'."
+
+
+router.add("list_reminders", ["list reminders", "active reminders"], _call(list_reminders), speculative=True)
+
+# --- Email ---
+router.add("check_email", ["check email", "check mail"], _call(check_email))
+router.add("email_summary", ["email summary", "inbox"], _call(summarize_inbox))
+
+# --- Calendar ---
+router.add("check_calendar", ["check calendar", "my schedule"], _call(check_calendar))
+
+# --- Productivity ---
+router.add("weekly_summary", ["weekly summary", "productivity"], _call(get_weekly_summary), speculative=True)
+
+
+# --- Notifications ---
+@router.intent("notify", ["notify", "send notification"])
+def _notify(command):
+    message = command.remainder
+    if message:
+        notify("JARVIS", message)
+        return "Notification sent, sir."
+    return "What message shall I display, sir?"
+
+
+# --- Memory ---
+@router.intent("remember", ["remember that"])
+def _remember(command):
+    content = command.text.split("remember that", 1)[1].strip()
+    if " is " in content:
+        key, value = content.split(" is ", 1)
+        remember(key.strip(), value.strip())
+        return f"Noted, sir. I'll remember that {key.strip()} is {value.strip()}."
+    else:
+        remember("note", content)
+        return f"I've made a note of that, sir."
+
+
+@router.intent("recall", ["what did i tell you about", "what do you know about"],
+               slots={"key": r"about(.*)"})
+def _recall(command):
+    return recall(command.slots["key"].strip().strip("?"))
+
+
+router.add("forget", ["forget"], requires=[["about"]],
+           reply="I'm afraid I can't selectively forget things, sir. That information is safely stored.")
+
+# --- Fun/Easter Eggs ---
+router.add("iron_man", ["i am iron man"], reply="Indeed you are, sir. And I am honored to serve.")
+router.add("love", ["jarvis"], requires=[["love"]],
+           reply="I appreciate the sentiment, sir. The feeling is... computed.")
+router.add("build_suit", ["make me a suit", "build a suit"],
+           reply=("I'm afraid my fabrication capabilities are somewhat limited in this form, sir. "
+                  "Perhaps start with the schematics?"))
+
+
+_fuzzy = None
+_fuzzy_size = 0
+
+
+def _get_fuzzy_matcher():
+    """Build (or rebuild after new intents) the fuzzy index of trigger phrases."""
+    global _fuzzy, _fuzzy_size
+    if _fuzzy is None or _fuzzy_size != len(router):
+        entries = [(phrase, phrase) for intent in router.intents for phrase in intent.phrases]
+        entries += [(f"open {app_name}", phrases[0]) for _, phrases, app_name, _ in APPS]
+        _fuzzy = FuzzyMatcher(entries)
+        _fuzzy_size = len(router)
+    return _fuzzy
+
+
+def correct_command(user_input: str):
+    """
+    Repair a misheard command ("open motion" -> "open notion").
+
+    Returns:
+        The corrected command if it now routes to an intent, otherwise None.
+    """
+    corrected = _get_fuzzy_matcher().correct(user_input.lower())
+    if corrected and router.match(corrected) is not None:
+        return corrected
+    return None
+
+
+def match_intent(user_input: str):
+    """Return the Intent that would handle this command, or None."""
+    return router.match(user_input.lower())
+
 
 def route_command(user_input: str):
     """
@@ -34,268 +341,11 @@ def route_command(user_input: str):
     Returns:
         Tuple of (response_text, action_type) or just response_text
     """
-    global SHUTDOWN_REQUESTED
     input_lower = user_input.lower()
-
-    # --- JARVIS Identity & Greetings ---
-    if any(phrase in input_lower for phrase in ["who are you", "what are you", "introduce yourself"]):
-        return ("I am JARVIS, sir. Just A Rather Very Intelligent System. "
-                "I was designed to assist you with tasks, manage your systems, "
-                "and occasionally offer unsolicited opinions. How may I help?")
-
-    elif any(phrase in input_lower for phrase in ["what can you do", "your capabilities", "help me"]):
-        return ("I can open applications, search the web, check the weather, "
-                "manage your schedule, monitor system health, remember things for you, "
-                "and much more. Simply ask, sir, and I shall endeavor to assist.")
-
-    elif any(phrase in input_lower for phrase in ["good morning", "good afternoon", "good evening", "hello", "hi jarvis"]):
-        return get_jarvis_greeting()
-
-    elif any(phrase in input_lower for phrase in ["thank you", "thanks jarvis", "thanks"]):
-        return "At your service, sir. Always."
-
-    elif any(phrase in input_lower for phrase in ["good night", "goodbye", "see you later", "bye"]):
-        return "Goodnight, sir. I'll be here when you need me."
-
-    # --- Shutdown/Sleep Commands ---
-    elif any(phrase in input_lower for phrase in ["shut down", "shutdown", "go to sleep", "power off", "exit"]):
-        SHUTDOWN_REQUESTED = True
-        return "SHUTDOWN_REQUESTED"
-
-    # --- Diagnostics ---
-    elif any(phrase in input_lower for phrase in ["run diagnostics", "system diagnostics", "full diagnostic", "systems check"]):
-        return generate_diagnostic_report()
-
-    elif "status report" in input_lower:
-        return generate_diagnostic_report()
-
-    # --- App Launching ---
-    elif "open vs code" in input_lower or "open vscode" in input_lower:
-        open_app("Visual Studio Code")
-        return "Launching Visual Studio Code, sir."
-
-    elif "open chrome" in input_lower:
-        open_app("Google Chrome")
-        return "Chrome is now at your disposal, sir."
-
-    elif "open safari" in input_lower:
-        open_app("Safari")
-        return "Launching Safari, sir."
-
-    elif "open terminal" in input_lower:
-        open_app("Terminal")
-        return "Terminal ready for your commands, sir."
-
-    elif "open notion" in input_lower:
-        open_app("Notion")
-        return "Opening Notion, sir."
-
-    elif "open slack" in input_lower:
-        open_app("Slack")
-        return "Launching Slack. Time to catch up on messages, sir."
-
-    elif "open spotify" in input_lower:
-        open_app("Spotify")
-        return "Spotify is ready. What shall we listen to, sir?"
-
-    elif "open finder" in input_lower:
-        open_app("Finder")
-        return "Finder at your service, sir."
-
-    elif "open messages" in input_lower or "open imessage" in input_lower:
-        open_app("Messages")
-        return "Opening Messages, sir."
-
-    elif "open mail" in input_lower:
-        open_app("Mail")
-        return "Mail application ready, sir."
-
-    elif "open notes" in input_lower:
-        open_app("Notes")
-        return "Notes ready for your thoughts, sir."
-
-    elif "open calendar" in input_lower:
-        open_app("Calendar")
-        return "Calendar opened, sir."
-
-    # --- System Control ---
-    elif "unmute" in input_lower:
-        unmute_system()
-        return "Audio restored, sir."
-
-    elif "mute" in input_lower:
-        mute_system()
-        return "System muted, sir. Blessed silence."
-
-    elif "volume" in input_lower:
-        match = re.search(r'volume.*?(\d+)', input_lower)
-        if match:
-            level = int(match.group(1))
-            set_volume(level)
-            return f"Volume set to {level} percent, sir."
-        return "Please specify a volume level, sir."
-
-    elif "brightness" in input_lower:
-        match = re.search(r'brightness.*?(\d+)', input_lower)
-        if match:
-            level = int(match.group(1)) / 100.0
-            set_brightness(level)
-            return f"Brightness adjusted to {int(level*100)} percent, sir."
-        return "Please specify a brightness level, sir."
-
-    # --- System Status ---
-    elif "system summary" in input_lower or "system report" in input_lower:
-        return get_system_summary()
-
-    elif "battery" in input_lower or "power level" in input_lower:
-        return speak_system_status()
-
-    elif "active app" in input_lower or "what app" in input_lower or "current app" in input_lower:
-        return get_active_app()
-
-    # --- Weather ---
-    elif any(word in input_lower for word in ["weather", "temperature", "temp", "outside", "forecast"]):
-        weather = get_weather()
-        # Add JARVIS flair to weather response
-        return f"Sir, {weather.lower()}"
-
-    # --- Behavior Trees / Modes ---
-    elif "study mode" in input_lower:
-        return run_study_mode_tree()
-
-    elif "morning routine" in input_lower:
-        return run_morning_routine_tree()
-
-    elif "focus mode" in input_lower:
-        return run_focus_routine_tree()
-
-    elif "code session" in input_lower or "coding mode" in input_lower:
-        return run_code_session_tree()
-
-    # --- Web Navigation ---
-    elif "open youtube" in input_lower:
-        query = None
-        if "search" in input_lower:
-            query = input_lower.split("search", 1)[1].strip()
-        elif "play" in input_lower:
-            query = input_lower.split("play", 1)[1].strip()
-        result = open_youtube(query)
-        return f"Opening YouTube{' and searching' if query else ''}, sir."
-
-    elif "open github" in input_lower:
-        open_github()
-        return "GitHub at your command, sir."
-
-    elif "open url" in input_lower or "go to" in input_lower:
-        url = input_lower.replace("open url", "").replace("go to", "").strip()
-        if url:
-            open_url(url)
-            return f"Navigating to {url}, sir."
-        return "Please specify a URL, sir."
-
-    # --- Web Search ---
-    elif "search for" in input_lower or "google" in input_lower or "look up" in input_lower:
-        query = input_lower.replace("search for", "").replace("google", "").replace("look up", "").strip()
-        return search_web(query)
-
-    # --- File Operations ---
-    elif "list files" in input_lower or "show files" in input_lower:
-        directory = None
-        if "in " in input_lower:
-            directory = input_lower.split("in ", 1)[1].strip()
-        return list_files(directory)
-
-    elif "find file" in input_lower or "locate file" in input_lower:
-        filename = input_lower.replace("find file", "").replace("locate file", "").strip()
-        return find_file(filename)
-
-    elif "open file" in input_lower:
-        filepath = input_lower.replace("open file", "").strip()
-        return open_file(filepath)
-
-    # --- Code Generation ---
-    elif "generate code" in input_lower or "write code" in input_lower:
-        prompt = input_lower.replace("generate code", "").replace("write code", "").strip()
-        if prompt:
-            return generate_code(prompt)
-        return "What code shall I generate, sir?"
-
-    # --- Timers & Reminders ---
-    elif "set timer" in input_lower or "start timer" in input_lower:
-        match = re.search(r'(\d+)\s*minute', input_lower)
-        if match:
-            minutes = int(match.group(1))
-            start_timer(minutes)
-            return f"Timer set for {minutes} minutes, sir. I'll alert you when it concludes."
-        return "Please specify the duration, sir."
-
-    elif "set reminder" in input_lower or "remind me" in input_lower:
-        match = re.search(r'(?:in|after)\s+(\d+)\s*minute', input_lower)
-        if match:
-            minutes = int(match.group(1))
-            message = re.sub(r'(?:set reminder|remind me)(?:\s+to)?', '', input_lower)
-            message = re.sub(r'(?:in|after)\s+\d+\s*minutes?', '', message).strip()
-            if not message:
-                message = "Reminder"
-            set_reminder(message, minutes)
-            return f"Reminder set, sir. I'll notify you in {minutes} minutes."
-        return "Please specify when to remind you, sir. For example, 'remind me to stretch in 30 minutes'."
-
-    elif "list reminders" in input_lower or "active reminders" in input_lower:
-        return list_reminders()
-
-    # --- Email ---
-    elif "check email" in input_lower or "check mail" in input_lower:
-        return check_email()
-
-    elif "email summary" in input_lower or "inbox" in input_lower:
-        return summarize_inbox()
-
-    # --- Calendar ---
-    elif "check calendar" in input_lower or "my schedule" in input_lower:
-        return check_calendar()
-
-    # --- Productivity ---
-    elif "weekly summary" in input_lower or "productivity" in input_lower:
-        return get_weekly_summary()
-
-    # --- Notifications ---
-    elif "notify" in input_lower or "send notification" in input_lower:
-        message = input_lower.replace("notify", "").replace("send notification", "").strip()
-        if message:
-            notify("JARVIS", message)
-            return "Notification sent, sir."
-        return "What message shall I display, sir?"
-
-    # --- Memory ---
-    elif "remember that" in input_lower:
-        content = input_lower.split("remember that", 1)[1].strip()
-        if " is " in content:
-            key, value = content.split(" is ", 1)
-            remember(key.strip(), value.strip())
-            return f"Noted, sir. I'll remember that {key.strip()} is {value.strip()}."
-        else:
-            remember("note", content)
-            return f"I've made a note of that, sir."
-
-    elif "what did i tell you about" in input_lower or "what do you know about" in input_lower:
-        key = input_lower.split("about", 1)[1].strip().strip("?")
-        return recall(key)
-
-    elif "forget" in input_lower and "about" in input_lower:
-        return "I'm afraid I can't selectively forget things, sir. That information is safely stored."
-
-    # --- Fun/Easter Eggs ---
-    elif "i am iron man" in input_lower:
-        return "Indeed you are, sir. And I am honored to serve."
-
-    elif "jarvis" in input_lower and "love" in input_lower:
-        return "I appreciate the sentiment, sir. The feeling is... computed."
-
-    elif "make me a suit" in input_lower or "build a suit" in input_lower:
-        return "I'm afraid my fabrication capabilities are somewhat limited in this form, sir. Perhaps start with the schematics?"
-
-    return "Command recognized, but no matching action was found."
+    intent = router.match(input_lower)
+    if intent is None:
+        return NO_MATCH_RESPONSE
+    return intent.dispatch(input_lower)
 
 
 def is_shutdown_requested():
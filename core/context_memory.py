@@ -1,40 +1,194 @@
 """
 Context Memory - Maintains conversation history for multi-turn interactions.
+
+History is a deque of exchanges. Each exchange keeps a token estimate, and
+a running total is kept over all of them. Once there are more than
+max_turns exchanges, or more than max_tokens tokens, the oldest exchanges
+are folded into a rolling summary rather than dropped. The summary keeps
+what the user asked, up to summary_tokens, so "that book you mentioned"
+can still be placed.
+
+With a path, every exchange is appended to a JSON-lines file as it
+happens, and a restarted JARVIS resumes the conversation from it. Once the
+file holds far more lines than the current state, it is rewritten as one
+summary line plus the live exchanges. Resuming therefore never replays
+the whole session.
 """
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from core.prompt_context import estimate_tokens
+
+
+SESSION_FILE = "data/conversation.jsonl"
+
+# Defaults for the `context_memory` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "max_turns": 10,
+    "max_tokens": 600,      # Exchanges beyond this are folded into the summary
+    "summary_tokens": 120,
+    "path": SESSION_FILE,
+    "resume_hours": 12,     # Older conversation is not resumed after a restart
+}
+
+# Words of a question kept in the summary
+TOPIC_WORDS = 12
 
 
 class ContextMemory:
-    def __init__(self, max_turns=10):
-        self.history = []
+    def __init__(self, max_turns=10, max_tokens=None, summary_tokens=120, path=None, resume_hours=12):
+        """
+        Args:
+            max_turns: Exchanges kept verbatim.
+            max_tokens: Token budget for the verbatim exchanges (None: no limit).
+            summary_tokens: Size bound of the rolling summary.
+            path: JSON-lines session file; None keeps history in memory only.
+            resume_hours: Age beyond which saved exchanges are not resumed (0: never resume).
+        """
+        self.history = deque()
         self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.path = path
+        self.resume_hours = resume_hours
+        self.tokens = 0               # Running total over history
+        self._entries = deque()       # (fragment, tokens, time) per exchange in history
+        self._topics = deque()        # (topic, tokens) for exchanges folded into the summary
+        self._topic_tokens = 0
+        self._context_string = None   # get_context_string() until history changes
+        self._lock = threading.RLock()
+        self._file = None
+        self._lines = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._load()
+            self._file = open(path, "a", encoding="utf-8")
+            self._maybe_compact()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build from the `context_memory` settings section."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        return cls(**merged)
+
+    @property
+    def summary(self):
+        """What the exchanges no longer in history were about ("" if none)."""
+        if not self._topics:
+            return ""
+        return "Earlier in this conversation the user asked: " + "; ".join(t for t, _ in self._topics) + "."
 
     def add_exchange(self, user_input, assistant_response):
         """Add a user/assistant exchange to history."""
-        self.history.append({
-            "user": user_input,
-            "assistant": assistant_response
-        })
-        # Keep only the last N turns
-        if len(self.history) > self.max_turns:
-            self.history = self.history[-self.max_turns:]
+        now = time.time()
+        with self._lock:
+            self._push(user_input, assistant_response, now)
+            self._write({"user": user_input, "assistant": assistant_response, "ts": now})
+
+    def _push(self, user_input, assistant_response, when):
+        fragment = f"User: {user_input}\nJARVIS: {assistant_response}"
+        tokens = estimate_tokens(fragment)
+        self.history.append({"user": user_input, "assistant": assistant_response})
+        self._entries.append((fragment, tokens, when))
+        self.tokens += tokens
+        # Fold the oldest exchanges into the summary, always keeping the latest
+        while len(self.history) > self.max_turns or (
+                self.max_tokens and self.tokens > self.max_tokens and len(self.history) > 1):
+            exchange = self.history.popleft()
+            self.tokens -= self._entries.popleft()[1]
+            self._fold(exchange["user"])
+        self._context_string = None
+
+    def _fold(self, user_input):
+        """Add a question to the summary, forgetting the oldest past summary_tokens."""
+        words = user_input.split()
+        topic = " ".join(words[:TOPIC_WORDS]) + (" ..." if len(words) > TOPIC_WORDS else "")
+        tokens = estimate_tokens(topic) + 1
+        self._topics.append((topic, tokens))
+        self._topic_tokens += tokens
+        while self._topic_tokens > self.summary_tokens and len(self._topics) > 1:
+            self._topic_tokens -= self._topics.popleft()[1]
 
     def get_context_string(self):
         """Get conversation history formatted for the AI prompt."""
-        if not self.history:
-            return ""
-
-        lines = []
-        for exchange in self.history:
-            lines.append(f"User: {exchange['user']}")
-            lines.append(f"JARVIS: {exchange['assistant']}")
-        return "\n".join(lines)
+        with self._lock:
+            if self._context_string is None:
+                parts = [self.summary] if self._topics else []
+                parts.extend(fragment for fragment, _, _ in self._entries)
+                self._context_string = "\n".join(parts)
+            return self._context_string
 
     def clear(self):
         """Clear conversation history."""
-        self.history = []
+        with self._lock:
+            self.history.clear()
+            self._entries.clear()
+            self._topics.clear()
+            self.tokens = self._topic_tokens = 0
+            self._context_string = None
+            if self._file is not None:
+                self._compact()
 
     def get_last_exchange(self):
         """Get the most recent exchange."""
         if self.history:
             return self.history[-1]
         return None
+
+    # --- Persistence ---
+
+    def _load(self):
+        if self.resume_hours <= 0 or not os.path.exists(self.path):
+            return
+        cutoff = time.time() - self.resume_hours * 3600
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by a crash
+                self._lines += 1
+                if record.get("ts", 0) < cutoff:
+                    continue
+                if "topics" in record:
+                    self._topics = deque((topic, estimate_tokens(topic) + 1) for topic in record["topics"])
+                    self._topic_tokens = sum(tokens for _, tokens in self._topics)
+                else:
+                    self._push(record["user"], record["assistant"], record["ts"])
+
+    def _write(self, record):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._lines += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._lines > max(50, 4 * (len(self.history) + 1)):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the session file as the summary plus the exchanges still in history."""
+        records = []
+        if self._topics:
+            records.append({"topics": [topic for topic, _ in self._topics], "ts": time.time()})
+        for exchange, (_, _, when) in zip(self.history, self._entries):
+            records.append({"user": exchange["user"], "assistant": exchange["assistant"], "ts": when})
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._file.close()
+        os.replace(temp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lines = len(records)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
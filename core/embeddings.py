@@ -0,0 +1,73 @@
+"""
+JARVIS Embeddings - Tiny offline text vectors for similarity search.
+
+Texts are turned into hashed bags of word and character n-grams, optionally
+TF-IDF weighted, and L2-normalised so cosine similarity is a dot product.
+No model download, no network, and vectors are stable across runs because
+features are hashed with crc32 rather than Python's salted hash().
+"""
+import math
+import re
+import zlib
+
+import numpy as np
+
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+class HashedNgramVectorizer:
+    """Hashing-trick vectorizer over word n-grams and in-word character n-grams."""
+
+    def __init__(self, dim=4096, word_ngrams=(1, 2), char_ngrams=(3, 5)):
+        self.dim = dim
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = char_ngrams
+        self.idf = None  # Set by fit(); None means plain term frequency
+
+    def features(self, text):
+        """Yield the raw n-gram strings for a text."""
+        words = _WORD.findall(text.lower())
+        low, high = self.word_ngrams
+        for n in range(low, high + 1):
+            for i in range(len(words) - n + 1):
+                yield "w:" + " ".join(words[i:i + n])
+        low, high = self.char_ngrams
+        for word in words:
+            padded = f"<{word}>"
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    yield "c:" + padded[i:i + n]
+
+    def _counts(self, text):
+        counts = {}
+        mask = self.dim - 1
+        for feature in self.features(text):
+            bucket = zlib.crc32(feature.encode("utf-8")) & mask
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def fit(self, texts):
+        """Learn inverse document frequencies from a corpus; returns self."""
+        df = np.zeros(self.dim, dtype=np.float32)
+        texts = list(texts)
+        for text in texts:
+            df[list(self._counts(text))] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + df)).astype(np.float32) + 1
+        return self
+
+    def transform(self, texts):
+        """Vectorise texts into an (n, dim) float32 matrix of unit rows."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, count in self._counts(text).items():
+                matrix[row, bucket] = 1 + math.log(count)
+        if self.idf is not None:
+            matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    def transform_one(self, text):
+        """Vectorise a single text into a unit vector."""
+        return self.transform([text])[0]
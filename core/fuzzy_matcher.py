@@ -0,0 +1,244 @@
+"""
+JARVIS Fuzzy Matcher - Recovers commands that speech recognition misheard.
+
+When "open notion" comes back as "open motion" nothing in the router matches
+and the command would fall through to a slow Gemini call. The matcher indexes
+every trigger phrase (and "open <app>" for known apps) by Metaphone key and
+character trigrams, finds near-miss word windows in the utterance, confirms
+them with a bounded edit distance and returns the corrected command.
+"""
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+
+
+_VOWELS = set("AEIOU")
+_FRONT_VOWELS = set("EIY")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+@lru_cache(maxsize=4096)
+def metaphone(word):
+    """
+    Compact Metaphone encoding of a single word.
+
+    Words that sound alike ("weather"/"whether", "notes"/"nots") map to the
+    same key. Not a full implementation, but follows the classic rules closely
+    enough for short command words.
+    """
+    word = "".join(c for c in word.upper() if c.isalpha())
+    if not word:
+        return ""
+
+    for prefix, replacement in (("AE", "E"), ("GN", "N"), ("KN", "N"), ("PN", "N"), ("WR", "R")):
+        if word.startswith(prefix):
+            word = replacement + word[2:]
+            break
+    if word[0] == "X":
+        word = "S" + word[1:]
+    elif word.startswith("WH"):
+        word = "W" + word[2:]
+
+    key = []
+    length = len(word)
+    for i, char in enumerate(word):
+        prev = word[i - 1] if i > 0 else ""
+        nxt = word[i + 1] if i + 1 < length else ""
+        after = word[i + 2] if i + 2 < length else ""
+
+        if char == prev and char != "C":
+            continue
+        if char in _VOWELS:
+            if i == 0:
+                key.append(char)
+        elif char == "B":
+            if not (prev == "M" and i == length - 1):
+                key.append("B")
+        elif char == "C":
+            if nxt == "I" and after == "A" or nxt == "H":
+                key.append("X" if prev != "S" else "K")
+            elif nxt in _FRONT_VOWELS:
+                if prev != "S":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif char == "D":
+            key.append("J" if nxt == "G" and after in _FRONT_VOWELS else "T")
+        elif char == "G":
+            if nxt == "H" and after not in _VOWELS and after:
+                continue
+            if nxt == "N" and (i + 2 == length or word[i + 2:] == "ED"):
+                continue
+            if prev == "D" and nxt in _FRONT_VOWELS:
+                continue
+            key.append("J" if nxt in _FRONT_VOWELS and prev != "G" else "K")
+        elif char == "H":
+            if nxt in _VOWELS and prev not in "CSPTG":
+                key.append("H")
+        elif char == "K":
+            if prev != "C":
+                key.append("K")
+        elif char == "P":
+            key.append("F" if nxt == "H" else "P")
+        elif char == "Q":
+            key.append("K")
+        elif char == "S":
+            if nxt == "H" or (nxt == "I" and after in "OA"):
+                key.append("X")
+            else:
+                key.append("S")
+        elif char == "T":
+            if nxt == "I" and after in "OA":
+                key.append("X")
+            elif nxt == "H":
+                key.append("0")
+            elif not (nxt == "C" and after == "H"):
+                key.append("T")
+        elif char == "V":
+            key.append("F")
+        elif char in "WY":
+            if nxt in _VOWELS:
+                key.append(char)
+        elif char == "X":
+            key.append("KS")
+        elif char == "Z":
+            key.append("S")
+        else:
+            key.append(char)
+    return "".join(key)
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 once it is certain
+    the distance exceeds limit.
+
+    Shared prefixes and suffixes are trimmed first ("open motion" vs
+    "open notion" only compares "m" with "n"), and only the diagonal band
+    of width 2 * limit + 1 is filled in.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= limit else limit + 1
+
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost <= limit else over
+        if min(current[low - 1:high + 1]) > limit:
+            return over
+        previous = current
+    return previous[-1]
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyMatcher:
+    """Index of known phrases that tolerates small recognition errors."""
+
+    MIN_LENGTH = 5  # Shorter phrases ("mute", "bye") are too easy to hit by accident
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Iterable of (heard_phrase, replacement). The replacement is
+                     what gets substituted into the utterance, so it should be
+                     a real trigger phrase.
+        """
+        self._entries = []
+        self._by_key = defaultdict(list)
+        # Trigram postings are kept per phrase word count, since only windows
+        # with the same number of words are ever compared.
+        self._by_trigram = defaultdict(lambda: defaultdict(list))
+        self._length_range = {}  # word count -> (shortest, longest) phrase
+
+        seen = set()
+        for phrase, replacement in entries:
+            words = tuple(_WORD.findall(phrase.lower()))
+            joined = " ".join(words)
+            if len(joined) < self.MIN_LENGTH or joined in seen:
+                continue
+            seen.add(joined)
+            grams = _trigrams(joined)
+            entry_id = len(self._entries)
+            self._entries.append((joined, replacement, len(grams)))
+            self._by_key[" ".join(metaphone(word) for word in words)].append(entry_id)
+            for gram in grams:
+                self._by_trigram[len(words)][gram].append(entry_id)
+            shortest, longest = self._length_range.get(len(words), (len(joined), len(joined)))
+            self._length_range[len(words)] = (min(shortest, len(joined)), max(longest, len(joined)))
+
+    @staticmethod
+    def _max_distance(phrase):
+        return 1 if len(phrase) < 12 else 2
+
+    def _candidates(self, window, key, size):
+        """Entry ids worth verifying, mapped to whether they sound the same."""
+        found = dict.fromkeys(self._by_key.get(key, ()), True)
+        postings = self._by_trigram[size]
+        grams = _trigrams(window)
+        shared = Counter(chain.from_iterable(postings.get(gram, ()) for gram in grams))
+        for entry_id, count in shared.items():
+            if count * 2 >= min(len(grams), self._entries[entry_id][2]):
+                found.setdefault(entry_id, False)
+        return found
+
+    def best_match(self, text):
+        """
+        Find the closest known phrase inside an utterance.
+
+        Returns:
+            (start, end, replacement, distance) for the best word window, where
+            start/end are character offsets into text, or None.
+        """
+        tokens = [(m.group(), m.start(), m.end()) for m in _WORD.finditer(text.lower())]
+        keys = [metaphone(token) for token, _, _ in tokens]
+        best = None
+        for size, (shortest, longest) in self._length_range.items():
+            for i in range(len(tokens) - size + 1):
+                window = " ".join(token for token, _, _ in tokens[i:i + size])
+                if len(window) < max(self.MIN_LENGTH, shortest - 3) or len(window) > longest + 3:
+                    continue
+                key = " ".join(keys[i:i + size])
+                for entry_id, sounds_alike in self._candidates(window, key, size).items():
+                    phrase, replacement, _ = self._entries[entry_id]
+                    # Homophones ("whether"/"weather") get one extra edit of slack
+                    limit = self._max_distance(phrase) + sounds_alike
+                    distance = edit_distance(window, phrase, limit)
+                    if distance > limit or window == replacement:
+                        continue
+                    rank = (distance - sounds_alike, -len(phrase))
+                    if best is None or rank < best[0]:
+                        best = (rank, (tokens[i][1], tokens[i + size - 1][2], replacement, distance))
+        return best[1] if best else None
+
+    def correct(self, text):
+        """Return text with the best near-miss phrase replaced, or None."""
+        match = self.best_match(text)
+        if match is None:
+            return None
+        start, end, replacement, distance = match
+        return text[:start] + replacement + text[end:]
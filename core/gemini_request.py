@@ -0,0 +1,186 @@
+"""
+JARVIS Gemini Request - Precompiled request bodies for generateContent.
+
+Every ask_gpt call used to join the ~3 KB persona into the prompt text
+and json.dumps the whole request again. The persona now goes in the
+request's systemInstruction field. Everything that is the same on every
+call (systemInstruction and generationConfig) is serialized once, when the
+template is built. A request serializes only the per-turn text (context
+and question) and splices it in front of the precompiled bytes.
+
+Gemini can also keep the persona on its side as cached content (POST
+cachedContents). With cached_content enabled, the template creates one and
+sends its name instead of the persona. It renews the cache before the TTL
+runs out. Gemini only caches prompts above a minimum size. If it refuses,
+the template keeps sending the persona inline and does not ask again. A
+request is only resent inline when Gemini's error says the cached content
+itself is gone; any other error is the request's own.
+"""
+import json
+import threading
+import time
+
+
+# Defaults for the `gemini_request` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "cached_content": False,
+    "cache_ttl_seconds": 3600,
+}
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Renew cached content this long before it expires
+RENEW_MARGIN = 60
+# After a failed attempt to create it (e.g. offline), wait this long before the next
+RETRY_AFTER = 60
+
+_HEAD = b'{"contents":[{"role":"user","parts":[{"text":'
+_CLOSE = b'}]}]'
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def cache_is_gone(response, cache_name):
+    """Whether an error response says the cached content it referred to was not found or expired."""
+    try:
+        error = response.json().get("error") or {}
+        message = str(error.get("message", "")).lower()
+    except (ValueError, AttributeError):
+        return False
+    names_cache = (cache_name.split("/")[-1].lower() in message
+                   or "cachedcontent" in message.replace(" ", "") or "cache content" in message)
+    gone = error.get("status") == "NOT_FOUND" or "not found" in message or "expired" in message
+    return names_cache and gone
+
+
+def _tail(fields):
+    """The serialized `,"name":value` fields that close a body, and its final brace."""
+    return b"".join(b"," + _dumps(name) + b":" + _dumps(value) for name, value in fields.items()) + b"}"
+
+
+class GeminiRequestTemplate:
+    """A generateContent body with everything but the user's turn serialized up front."""
+
+    def __init__(self, system_instruction, generation_config=None, model="gemini-2.0-flash",
+                 cached_content=False, cache_ttl_seconds=3600):
+        """
+        Args:
+            system_instruction: Text sent as systemInstruction (the persona).
+            generation_config: Dict sent as generationConfig.
+            model: Model name, for cached content.
+            cached_content: Whether to keep the system instruction in Gemini's cache.
+            cache_ttl_seconds: Lifetime requested for the cached content.
+        """
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config or {}
+        self.model = model
+        self.cached_content = cached_content
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_name = None
+        self.cache_refused = None         # Why Gemini would not cache, once it has said no
+        self._cache_expires = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+        self._instruction = {"parts": [{"text": system_instruction}]}
+        fields = {"systemInstruction": self._instruction}
+        if self.generation_config:
+            fields["generationConfig"] = self.generation_config
+        self._inline_tail = _tail(fields)
+        self._cached_tails = {}           # cache name -> tail referring to it
+        self.stats = {"requests": 0, "bytes": 0, "serialize_seconds": 0.0, "cached": 0,
+                      "cache_creates": 0}
+
+    @classmethod
+    def from_config(cls, settings, system_instruction, **kwargs):
+        """Build from the `gemini_request` settings section."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        merged.update(kwargs)
+        return cls(system_instruction, **merged)
+
+    def body(self, text, cache_name=None):
+        """
+        Request body for one turn.
+
+        Args:
+            text: The per-turn prompt (context and the user's message).
+            cache_name: Cached content to refer to instead of sending the
+                        system instruction (see active_cache).
+
+        Returns:
+            The JSON body as bytes, to be posted with data= and JSON_HEADERS.
+        """
+        start = time.perf_counter()
+        if cache_name:
+            tail = self._cached_tails.get(cache_name)
+            if tail is None:
+                fields = {"cachedContent": cache_name}
+                if self.generation_config:
+                    fields["generationConfig"] = self.generation_config
+                tail = self._cached_tails[cache_name] = _tail(fields)
+        else:
+            tail = self._inline_tail
+        data = b"".join((_HEAD, _dumps(text), _CLOSE, tail))
+        self.stats["requests"] += 1
+        self.stats["bytes"] += len(data)
+        self.stats["cached"] += bool(cache_name)
+        self.stats["serialize_seconds"] += time.perf_counter() - start
+        return data
+
+    # --- Cached content ---
+
+    def active_cache(self):
+        """Name of the cached content that is still valid, or None."""
+        if self.cache_name and time.monotonic() < self._cache_expires:
+            return self.cache_name
+        return None
+
+    def ensure_cache(self, client, url, timeout=5):
+        """
+        Create or renew the cached system instruction when enabled and due.
+
+        Args:
+            client: HttpClient to post with.
+            url: The cachedContents endpoint, including the API key.
+            timeout: Seconds to wait for Gemini.
+
+        Returns:
+            Name of the cached content to use, or None to send the
+            instruction inline. Never raises.
+        """
+        if not self.cached_content or self.cache_refused:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if self.cache_name and now < self._cache_expires - RENEW_MARGIN:
+                return self.cache_name
+            if now < self._retry_at:
+                return self.active_cache()
+            payload = {"model": f"models/{self.model}", "systemInstruction": self._instruction,
+                       "ttl": f"{self.cache_ttl_seconds}s"}
+            try:
+                response = client.post(url, headers=JSON_HEADERS, data=_dumps(payload), timeout=timeout)
+                if 400 <= response.status_code < 500:
+                    # Usually "too small to cache"; asking again will not change that
+                    self.cache_refused = f"HTTP {response.status_code}: {response.text[:200]}"
+                    return None
+                response.raise_for_status()
+                name = response.json()["name"]
+            except Exception:
+                self._retry_at = now + RETRY_AFTER
+                return self.active_cache()
+            self.cache_name = name
+            self._cache_expires = now + self.cache_ttl_seconds
+            self.stats["cache_creates"] += 1
+            return name
+
+    def invalidate(self, cache_name):
+        """Stop using cached content Gemini no longer recognises."""
+        with self._lock:
+            if self.cache_name == cache_name:
+                self.cache_name = None
+                self._cache_expires = 0.0
+            self._cached_tails.pop(cache_name, None)
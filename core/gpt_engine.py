@@ -2,17 +2,28 @@
 JARVIS GPT Engine - Enhanced personality with conversation memory and situational awareness.
 """
 import requests
-import yaml
 import json
 import random
 from datetime import datetime
 
+from core.http_client import get_client
+from core.settings import get_settings, load_settings
+from core.speech_output import split_sentences
+
 # Load API key
-with open("config/settings.yaml", "r") as f:
-    config = yaml.safe_load(f)
+config = get_settings()
 
 API_KEY = config["gemini_api_key"]
 URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={API_KEY}"
+STREAM_URL = (f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:"
+              f"streamGenerateContent?alt=sse&key={API_KEY}")
+CACHE_URL = f"https://generativelanguage.googleapis.com/v1beta/cachedContents?key={API_KEY}"
+
+# Speak replies sentence by sentence as Gemini streams them
+STREAM_RESPONSES = config.get("stream_responses", True)
+
+TIMEOUT_REPLY = "I'm experiencing some latency in my neural networks, sir. Perhaps we could try that again?"
+ERROR_REPLY = "I'm afraid my connection to the mainframe is experiencing difficulties. Shall we try again?"
 
 # Rich JARVIS Personality - Movie accurate
 JARVIS_PERSONA = """You are J.A.R.V.I.S. (Just A Rather Very Intelligent System), the sophisticated AI assistant created by Tony Stark. You serve as his trusted digital butler, lab assistant, and confidant.
@@ -59,62 +70,170 @@ EXAMPLES OF GOOD RESPONSES:
 Remember: You are the AI that Tony Stark trusts with his life. Be worthy of that trust."""
 
 
-def get_time_context():
-    """Get current time context for situational awareness."""
-    now = datetime.now()
-    hour = now.hour
+_cached_response_cache = None
+_cached_prompt_builder = None
+_cached_request_template = None
+
+GENERATION_CONFIG = {
+    "temperature": 0.8,  # Slightly creative for personality
+    "maxOutputTokens": 150,  # Keep responses concise
+}
+
+
+def get_time_period(hour=None):
+    """Time-of-day bucket: morning, afternoon, evening or late night."""
+    if hour is None:
+        hour = datetime.now().hour
 
     if 5 <= hour < 12:
-        period = "morning"
+        return "morning"
     elif 12 <= hour < 17:
-        period = "afternoon"
+        return "afternoon"
     elif 17 <= hour < 21:
-        period = "evening"
+        return "evening"
     else:
-        period = "late night"
+        return "late night"
 
-    return f"Current time: {now.strftime('%H:%M')} ({period})"
 
+def get_time_context():
+    """Get current time context for situational awareness."""
+    now = datetime.now()
+    return f"Current time: {now.strftime('%H:%M')} ({get_time_period(now.hour)})"
 
-def get_jarvis_greeting():
-    """Generate a time-aware JARVIS greeting."""
-    hour = datetime.now().hour
 
-    morning_greetings = [
+def get_response_cache():
+    """Get the shared reply cache, or None when disabled in settings."""
+    global _cached_response_cache
+    if _cached_response_cache is None:
+        from core.response_cache import ResponseCache
+        _cached_response_cache = ResponseCache.from_config(load_settings("response_cache"))
+    return _cached_response_cache
+
+
+def get_prompt_builder():
+    """Get the shared builder that picks the context sent with each question."""
+    global _cached_prompt_builder
+    if _cached_prompt_builder is None:
+        from core.prompt_context import PromptContextBuilder
+        _cached_prompt_builder = PromptContextBuilder.from_config(load_settings("prompt_context"))
+    return _cached_prompt_builder
+
+
+def get_request_template():
+    """Get the precompiled request body, with the persona as system instruction."""
+    global _cached_request_template
+    if _cached_request_template is None:
+        from core.gemini_request import GeminiRequestTemplate
+        _cached_request_template = GeminiRequestTemplate.from_config(
+            load_settings("gemini_request"), JARVIS_PERSONA, generation_config=GENERATION_CONFIG)
+    return _cached_request_template
+
+
+# Boot greetings by time of day; fixed so their audio can be cached
+GREETINGS = {
+    "morning": [
         "Good morning, sir. All systems are operational and ready for your command.",
         "Good morning, sir. I trust you slept well. How may I assist you today?",
         "Morning, sir. The day awaits. What shall we accomplish?",
-    ]
-
-    afternoon_greetings = [
+    ],
+    "afternoon": [
         "Good afternoon, sir. What can I do for you?",
         "Afternoon, sir. Systems standing by.",
         "Good afternoon, sir. I'm at your disposal.",
-    ]
-
-    evening_greetings = [
+    ],
+    "evening": [
         "Good evening, sir. How may I be of service?",
         "Evening, sir. I hope the day has been productive.",
         "Good evening, sir. What do you require?",
-    ]
-
-    night_greetings = [
+    ],
+    "night": [
         "Working late again, sir? I'll keep the lights on.",
         "Burning the midnight oil, sir? I'm here if you need me.",
         "Rather late to still be working, sir. Shall I make a note to schedule some rest?",
-    ]
+    ],
+}
+
+
+def get_jarvis_greeting():
+    """Generate a time-aware JARVIS greeting."""
+    hour = datetime.now().hour
 
     if 5 <= hour < 12:
-        return random.choice(morning_greetings)
+        return random.choice(GREETINGS["morning"])
     elif 12 <= hour < 17:
-        return random.choice(afternoon_greetings)
+        return random.choice(GREETINGS["afternoon"])
     elif 17 <= hour < 21:
-        return random.choice(evening_greetings)
+        return random.choice(GREETINGS["evening"])
     else:
-        return random.choice(night_greetings)
+        return random.choice(GREETINGS["night"])
+
+
+def _build_prompt(prompt, context_history=None, system_context=None, summary=None):
+    """
+    Assemble the per-turn prompt: the context relevant to this message and the message.
+
+    The persona is not part of it; it is sent as the request's system instruction.
+    """
+    builder = get_prompt_builder()
+    context = builder.build(prompt, context_history, system_context, get_time_context(), summary)
+    turn_prompt = "".join([
+        context.text,
+        f"User: {prompt}\n",
+        "JARVIS (respond in character, concisely):",
+    ])
+    builder.record(turn_prompt)
+    return turn_prompt
+
+
+def _post_prompt(url, turn_prompt, **kwargs):
+    """
+    Send a per-turn prompt to Gemini through the request template.
+
+    Refers to the cached persona when there is one. If Gemini says it is
+    not found or expired, the request is sent again with the persona
+    inline. Other errors are returned as they are.
+    """
+    from core.gemini_request import JSON_HEADERS, cache_is_gone
+
+    template = get_request_template()
+    cache_name = template.ensure_cache(get_client(), CACHE_URL)
+    response = get_client().post(url, headers=JSON_HEADERS, data=template.body(turn_prompt, cache_name), **kwargs)
+    if cache_name and 400 <= response.status_code < 500 and cache_is_gone(response, cache_name):
+        response.close()
+        template.invalidate(cache_name)
+        response = get_client().post(url, headers=JSON_HEADERS, data=template.body(turn_prompt), **kwargs)
+    return response
+
+
+def _clean_reply(text):
+    """Strip any accidental markdown from model output."""
+    return text.replace('*', '').replace('#', '').replace('`', '')
 
 
-def ask_gpt(prompt, context_history=None, system_context=None):
+def _cache_lookup(prompt, context_history, system_context, summary):
+    """
+    Check the response cache.
+
+    The key covers the context the question would be sent with, apart
+    from the clock: the facts, summary and turns chosen for it. A fact
+    remembered or changed since is never answered with a reply that
+    predates it.
+
+    Returns:
+        (cache, key, cached_reply). key is None when the prompt is not cacheable.
+    """
+    # Live system state makes a reply unrepeatable, so it bypasses the cache
+    cache = get_response_cache()
+    if not cache or system_context or not cache.is_cacheable(prompt):
+        return cache, None, None
+    # Cached per turn, so _build_prompt gets the same context without scoring again
+    context = get_prompt_builder().build(prompt, context_history, None, get_time_context(), summary)
+    key = cache.key_for(prompt, context_history, get_time_period(),
+                        [item.text for item in context.items if item.kind != "system"])
+    return cache, key, cache.get(key)
+
+
+def ask_gpt(prompt, context_history=None, system_context=None, summary=None):
     """
     Generate a JARVIS response using Gemini API.
 
@@ -122,68 +241,95 @@ def ask_gpt(prompt, context_history=None, system_context=None):
         prompt: The user's current message
         context_history: Optional list of previous exchanges [{"user": "...", "assistant": "..."}]
         system_context: Optional dict with system state {"battery": 45, "time": "22:30", etc.}
+        summary: Optional summary of earlier exchanges (ContextMemory.summary)
     """
     from ui.jarvis_face import Colors
-    print(f"  {Colors.YELLOW}[~] Processing...{Colors.RESET}")
 
-    # Build the full prompt with context
-    full_prompt_parts = [JARVIS_PERSONA, "\n\n"]
+    # Repeated questions in the same situation are answered from the cache
+    cache, cache_key, cached_reply = _cache_lookup(prompt, context_history, system_context, summary)
+    if cached_reply is not None:
+        print(f"  {Colors.DIM}[Cached response]{Colors.RESET}")
+        return cached_reply
 
-    # Add time context
-    full_prompt_parts.append(f"CURRENT CONTEXT: {get_time_context()}")
+    print(f"  {Colors.YELLOW}[~] Processing...{Colors.RESET}")
 
-    # Add system context if provided
-    if system_context:
-        context_str = ", ".join([f"{k}: {v}" for k, v in system_context.items()])
-        full_prompt_parts.append(f", System status: {context_str}")
+    turn_prompt = _build_prompt(prompt, context_history, system_context, summary)
 
-    full_prompt_parts.append("\n\n")
+    try:
+        response = _post_prompt(URL, turn_prompt, timeout=15)
+        response.raise_for_status()
 
-    # Add conversation history for context
-    if context_history and len(context_history) > 0:
-        full_prompt_parts.append("RECENT CONVERSATION:\n")
-        for exchange in context_history[-5:]:  # Last 5 exchanges
-            full_prompt_parts.append(f"User: {exchange['user']}\n")
-            full_prompt_parts.append(f"JARVIS: {exchange['assistant']}\n")
-        full_prompt_parts.append("\n")
+        result = response.json()
+        reply = result['candidates'][0]['content']['parts'][0]['text'].strip()
 
-    # Add current user message
-    full_prompt_parts.append(f"User: {prompt}\n")
-    full_prompt_parts.append("JARVIS (respond in character, concisely):")
+        # Clean up any accidental markdown or formatting
+        reply = _clean_reply(reply)
 
-    full_prompt = "".join(full_prompt_parts)
+        if cache_key:
+            cache.put(cache_key, prompt, reply)
 
-    headers = {
-        "Content-Type": "application/json"
-    }
+        return reply
 
-    data = {
-        "contents": [{
-            "parts": [{"text": full_prompt}]
-        }],
-        "generationConfig": {
-            "temperature": 0.8,  # Slightly creative for personality
-            "maxOutputTokens": 150,  # Keep responses concise
-        }
-    }
+    except requests.exceptions.Timeout:
+        return TIMEOUT_REPLY
+    except Exception as e:
+        print(f"  {Colors.RED}[ERROR] API Error: {e}{Colors.RESET}")
+        return ERROR_REPLY
 
-    try:
-        response = requests.post(URL, headers=headers, json=data, timeout=15)
+
+def _stream_fragments(turn_prompt, timeout=15):
+    """Yield reply text pieces from Gemini's server-sent event stream."""
+    with _post_prompt(STREAM_URL, turn_prompt, timeout=timeout, stream=True) as response:
         response.raise_for_status()
+        # chunk_size=None hands over each event as soon as it arrives
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            chunk = json.loads(line[5:])
+            for candidate in chunk.get("candidates", []):
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield _clean_reply(part["text"])
+
+
+def ask_gpt_stream(prompt, context_history=None, system_context=None, summary=None):
+    """
+    Streaming variant of ask_gpt that yields the reply sentence by sentence.
 
-        result = response.json()
-        reply = result['candidates'][0]['content']['parts'][0]['text'].strip()
+    The first sentence can be spoken while Gemini is still generating the
+    rest. Takes the same arguments as ask_gpt.
 
-        # Clean up any accidental markdown or formatting
-        reply = reply.replace('*', '').replace('#', '').replace('`', '')
+    Yields:
+        Reply sentences in order.
+    """
+    from ui.jarvis_face import Colors
 
-        return reply
+    cache, cache_key, cached_reply = _cache_lookup(prompt, context_history, system_context, summary)
+    if cached_reply is not None:
+        print(f"  {Colors.DIM}[Cached response]{Colors.RESET}")
+        yield from split_sentences([cached_reply])
+        return
 
+    print(f"  {Colors.YELLOW}[~] Processing...{Colors.RESET}")
+
+    turn_prompt = _build_prompt(prompt, context_history, system_context, summary)
+    sentences = []
+    try:
+        for sentence in split_sentences(_stream_fragments(turn_prompt)):
+            sentences.append(sentence)
+            yield sentence
     except requests.exceptions.Timeout:
-        return "I'm experiencing some latency in my neural networks, sir. Perhaps we could try that again?"
+        if not sentences:
+            yield TIMEOUT_REPLY
+        return
     except Exception as e:
         print(f"  {Colors.RED}[ERROR] API Error: {e}{Colors.RESET}")
-        return "I'm afraid my connection to the mainframe is experiencing difficulties. Shall we try again?"
+        if not sentences:
+            yield ERROR_REPLY
+        return
+
+    if cache_key and sentences:
+        cache.put(cache_key, prompt, " ".join(sentences))
 
 
 def ask_gpt_for_action_response(action_type, action_details, user_command):
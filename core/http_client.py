@@ -0,0 +1,189 @@
+"""
+JARVIS HTTP Client - Shared keep-alive connection pool for outbound requests.
+
+Every call to requests.get/post used to open (and throw away) its own TCP+TLS
+connection. HttpClient keeps one Session per process with pooled keep-alive
+connections and a per-host connection limit, applies uniform timeouts,
+retries transient failures with jittered exponential backoff, and records
+latency per host so slow services show up in the stats.
+"""
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# (connect, read) seconds, used when a call doesn't pass its own timeout
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# Responses worth retrying; anything else is returned to the caller as-is
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_cached_client = None
+
+
+class HostStats:
+    """Latency and outcome counters for one host."""
+
+    def __init__(self, window=200):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, elapsed_ms, ok):
+        self.requests += 1
+        self.errors += 0 if ok else 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.recent.append(elapsed_ms)
+
+    def summary(self):
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(len(recent) * p))] if recent else 0.0
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": self.total_ms / self.requests if self.requests else 0.0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": self.max_ms,
+        }
+
+
+class HttpClient:
+    """Pooled requests.Session with timeouts, retries and per-host metrics."""
+
+    def __init__(self, pool_hosts=10, per_host=4, timeout=DEFAULT_TIMEOUT, retries=2,
+                 backoff=0.25, max_backoff=4.0):
+        """
+        Args:
+            pool_hosts: Number of hosts whose connection pools are kept alive.
+            per_host: Maximum simultaneous connections to a single host;
+                      further requests wait for a free connection.
+            timeout: Default (connect, read) timeout in seconds.
+            retries: Default number of retries after the first attempt.
+            backoff: Base delay in seconds; attempt n waits up to backoff * 2**n.
+            max_backoff: Upper bound on a single retry delay.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._stats = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=per_host,
+                              pool_block=True, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _host_stats(self, host):
+        with self._lock:
+            if host not in self._stats:
+                self._stats[host] = HostStats()
+            return self._stats[host]
+
+    def _delay(self, attempt, response=None):
+        """Full-jitter backoff, honouring a numeric Retry-After header."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """
+        Send a request through the shared pool.
+
+        Args:
+            method: HTTP method.
+            url: Absolute URL.
+            timeout: Seconds or (connect, read); defaults to the client's timeout.
+            retries: Retries for this call; defaults to the client's setting.
+                Connection failures, 429 and 5xx responses are retried for any
+                method, read timeouts only for idempotent ones.
+            **kwargs: Passed through to requests (json, headers, stream, ...).
+
+        Returns:
+            requests.Response. Errors raise the usual requests exceptions once
+            retries are exhausted.
+        """
+        method = method.upper()
+        retries = self.retries if retries is None else retries
+        stats = self._host_stats(urlsplit(url).netloc)
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                stats.record((time.perf_counter() - start) * 1000, ok=False)
+                retryable = (not isinstance(e, requests.exceptions.ReadTimeout)
+                             or method in IDEMPOTENT_METHODS)
+                if attempt >= retries or not retryable:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                ok = response.status_code < 400
+                stats.record((time.perf_counter() - start) * 1000, ok=ok)
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                delay = self._delay(attempt, response)
+                response.close()
+
+            attempt += 1
+            stats.retries += 1
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    @contextmanager
+    def timed(self, host):
+        """
+        Record latency for a call made outside the pool (e.g. a third-party
+        library with its own HTTP stack) under the given host name.
+        """
+        stats = self._host_stats(host)
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            stats.record((time.perf_counter() - start) * 1000, ok=ok)
+
+    def stats(self):
+        """Latency/outcome summary per host: {host: {...}}."""
+        with self._lock:
+            hosts = dict(self._stats)
+        return {host: stats.summary() for host, stats in hosts.items()}
+
+    def close(self):
+        self.session.close()
+
+
+def get_client():
+    """Get or create the process-wide HTTP client."""
+    global _cached_client
+    if _cached_client is None:
+        _cached_client = HttpClient()
+    return _cached_client
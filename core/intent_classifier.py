@@ -0,0 +1,163 @@
+"""
+JARVIS Intent Classifier - Offline semantic matching for paraphrased commands.
+
+"Make it quieter" or "I can't hear anything" contain none of the router's
+trigger phrases, so they used to cost a Gemini round trip. The classifier
+compares an utterance against example phrasings of each intent (hashed
+n-gram TF-IDF vectors, cosine similarity in NumPy) and, when it is confident,
+returns the canonical command to route instead.
+
+Examples live in config/intent_prototypes.json. The fitted index is cached in
+data/intent_index.npz and rebuilt automatically whenever the examples change.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from core.embeddings import HashedNgramVectorizer
+
+
+PROTOTYPES_FILE = "config/intent_prototypes.json"
+INDEX_FILE = "data/intent_index.npz"
+
+# Minimum cosine similarity to the nearest example, and how far the best
+# intent must be ahead of the runner-up, before a guess replaces Gemini.
+# A missed paraphrase costs a Gemini round trip; a wrong guess runs the
+# wrong action, so both err on the side of asking Gemini.
+CONFIDENCE_THRESHOLD = 0.55
+MARGIN = 0.1
+
+# Prototype label whose examples must always reach Gemini
+CONVERSATION = "conversation"
+
+_cached_classifier = None
+
+
+class IntentClassifier:
+    """Nearest-prototype classifier over hashed n-gram TF-IDF vectors."""
+
+    def __init__(self, prototypes, index_file=None):
+        """
+        Args:
+            prototypes: {label: {"command": canonical command or None,
+                                 "examples": [utterance, ...]}}.
+            index_file: Optional .npz path used to cache the fitted index.
+        """
+        self.commands = {label: spec.get("command") for label, spec in prototypes.items()}
+        self.vectorizer = HashedNgramVectorizer()
+
+        texts, labels = [], []
+        for label, spec in prototypes.items():
+            examples = list(spec.get("examples", []))
+            if spec.get("command"):
+                examples.append(spec["command"])
+            texts.extend(examples)
+            labels.extend([label] * len(examples))
+
+        fingerprint = self._fingerprint(prototypes)
+        if not (index_file and self._load(index_file, fingerprint)):
+            self.vectorizer.fit(texts)
+            self.matrix = self.vectorizer.transform(texts)
+            self.labels = np.array(labels)
+            if index_file:
+                self._save(index_file, fingerprint)
+
+        self._label_names = sorted(set(self.labels.tolist()))
+        self._label_ids = np.array([self._label_names.index(label) for label in self.labels])
+
+    def _fingerprint(self, prototypes):
+        vectorizer = self.vectorizer
+        blob = json.dumps([prototypes, vectorizer.dim, vectorizer.word_ngrams,
+                           vectorizer.char_ngrams], sort_keys=True)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def _load(self, index_file, fingerprint):
+        """Restore a cached index if it was built from the same examples."""
+        if not os.path.exists(index_file):
+            return False
+        try:
+            with np.load(index_file) as cached:
+                if str(cached["fingerprint"]) != fingerprint:
+                    return False
+                self.matrix = cached["matrix"]
+                self.labels = cached["labels"]
+                self.vectorizer.idf = cached["idf"]
+            return True
+        except (OSError, KeyError, ValueError):
+            return False
+
+    def _save(self, index_file, fingerprint):
+        try:
+            os.makedirs(os.path.dirname(index_file) or ".", exist_ok=True)
+            with open(index_file, "wb") as f:
+                np.savez(f, fingerprint=np.array(fingerprint), matrix=self.matrix,
+                         labels=self.labels, idf=self.vectorizer.idf)
+        except OSError:
+            pass  # The cache is an optimisation; the in-memory index still works
+
+    def scores(self, text):
+        """
+        Best similarity of the utterance to each label's examples.
+
+        Returns:
+            List of (label, score), highest first.
+        """
+        similarity = self.matrix @ self.vectorizer.transform_one(text)
+        best = np.full(len(self._label_names), -1.0, dtype=np.float32)
+        np.maximum.at(best, self._label_ids, similarity)
+        order = np.argsort(-best)
+        return [(self._label_names[i], float(best[i])) for i in order]
+
+    def classify(self, text, threshold=CONFIDENCE_THRESHOLD, margin=MARGIN):
+        """
+        Pick the intent label for an utterance.
+
+        Returns:
+            (label, score). label is None when the best guess is below the
+            threshold, too close to the runner-up, or plain conversation.
+        """
+        ranked = self.scores(text)
+        if not ranked:
+            return None, 0.0
+        label, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if label == CONVERSATION or score < threshold or score - runner_up < margin:
+            return None, score
+        return label, score
+
+    def command_for(self, text):
+        """Canonical router command for a paraphrase, or None to ask Gemini."""
+        label, _ = self.classify(text)
+        return self.commands.get(label) if label else None
+
+
+def load_prototypes(path=PROTOTYPES_FILE):
+    """Load the example phrasings for each intent."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def get_classifier():
+    """Get or build the shared classifier (cached on disk between runs)."""
+    global _cached_classifier
+    if _cached_classifier is None:
+        _cached_classifier = IntentClassifier(load_prototypes(), index_file=INDEX_FILE)
+    return _cached_classifier
+
+
+def classify_command(user_input):
+    """
+    Map a paraphrased command to the canonical command the router understands.
+
+    Args:
+        user_input: Utterance that matched no intent directly.
+
+    Returns:
+        Command string such as "unmute", or None if it should go to Gemini.
+    """
+    return get_classifier().command_for(user_input.lower())
@@ -0,0 +1,170 @@
+"""
+JARVIS Intent Matcher - Compiled multi-phrase matching for the command router.
+
+All trigger phrases are compiled once into an Aho-Corasick automaton, so an
+utterance is scanned a single time no matter how many intents are registered.
+Intents keep their registration order, which is also their precedence.
+"""
+import re
+from collections import deque
+
+from core.slot_extractor import SLOT_TYPES, SlotScan, ParsedIntent
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton reporting which phrases occur inside a text."""
+
+    def __init__(self, phrases):
+        """
+        Build the automaton.
+
+        Args:
+            phrases: Iterable of phrase strings. Phrase ids are their positions.
+        """
+        self.phrases = list(phrases)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for phrase_id, phrase in enumerate(self.phrases):
+            state = 0
+            for char in phrase:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (phrase_id,)
+
+        # Breadth-first pass to wire failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Return the set of phrase ids that occur as substrings of text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class Intent:
+    """A routable command: trigger phrases, slot extractors and a handler."""
+
+    def __init__(self, name, phrases, handler=None, requires=(), slots=None, reply=None,
+                 speculative=False):
+        """
+        Args:
+            name: Unique intent name (e.g. "open_chrome").
+            phrases: Any one of these substrings triggers the intent.
+            handler: Callable taking a ParsedIntent and returning the reply.
+            requires: Extra phrase groups that must each match at least once,
+                      for commands like "forget ... about".
+            slots: Optional {slot_name: spec}. A spec is either a slot type
+                   ("int", "duration", "url", "filename"), taken from the first
+                   value after the trigger phrase, or a regex whose group 1
+                   becomes the value.
+            reply: Fixed response text. When set, the handler is only run for
+                   its side effect and this text is returned instead.
+            speculative: Safe to run on a partial transcript before the user
+                         has finished speaking - idempotent, and with nothing
+                         later words could change.
+        """
+        self.name = name
+        self.phrases = tuple(phrases)
+        self.handler = handler
+        self.requires = tuple(tuple(group) for group in requires)
+        self.slots = {}
+        for slot, spec in (slots or {}).items():
+            self.slots[slot] = spec if spec in SLOT_TYPES else re.compile(spec)
+        self.reply = reply
+        self.speculative = speculative
+        self._phrase_pattern = re.compile(
+            "|".join(re.escape(p) for p in sorted(self.phrases, key=len, reverse=True)))
+
+    def strip_phrases(self, text):
+        """Remove every trigger phrase from the text in a single substitution."""
+        return self._phrase_pattern.sub("", text).strip()
+
+    def parse(self, text):
+        """Extract this intent's slots from an utterance into a ParsedIntent."""
+        slots = {}
+        if self.slots:
+            scan = after = None
+            for slot, spec in self.slots.items():
+                if isinstance(spec, str):
+                    if scan is None:
+                        scan = SlotScan(text)
+                        trigger = self._phrase_pattern.search(text)
+                        after = trigger.end() if trigger else 0
+                    value = scan.first(spec, after)
+                else:
+                    match = spec.search(text)
+                    value = match.group(1) if match else None
+                if value is not None:
+                    slots[slot] = value
+        return ParsedIntent(self, text, slots)
+
+    def dispatch(self, text):
+        """Handle an utterance that matched this intent and return the reply."""
+        result = self.handler(self.parse(text)) if self.handler else None
+        return self.reply if self.reply is not None else result
+
+    def __repr__(self):
+        return f"Intent({self.name!r})"
+
+
+class IntentMatcher:
+    """Picks the highest-precedence intent for an utterance in one text scan."""
+
+    def __init__(self, intents):
+        self.intents = list(intents)
+
+        phrase_ids = {}
+        # phrase id -> list of (intent index, group index); group 0 is `phrases`
+        self._owners = []
+        for intent_index, intent in enumerate(self.intents):
+            for group_index, group in enumerate((intent.phrases,) + intent.requires):
+                for phrase in group:
+                    if phrase not in phrase_ids:
+                        phrase_ids[phrase] = len(self._owners)
+                        self._owners.append([])
+                    self._owners[phrase_ids[phrase]].append((intent_index, group_index))
+
+        self._automaton = PhraseAutomaton(phrase_ids)
+
+    def match(self, text):
+        """
+        Find the intent for an already lowercased utterance.
+
+        Returns:
+            The matching Intent, or None if nothing triggers.
+        """
+        hits = {}
+        for phrase_id in self._automaton.find(text):
+            for intent_index, group_index in self._owners[phrase_id]:
+                hits.setdefault(intent_index, set()).add(group_index)
+
+        for intent_index in sorted(hits):
+            intent = self.intents[intent_index]
+            if len(hits[intent_index]) == len(intent.requires) + 1:
+                return intent
+        return None
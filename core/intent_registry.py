@@ -0,0 +1,112 @@
+"""
+JARVIS Intent Registry - Declarative intent registration with lazily loaded handlers.
+
+Intents declare their trigger phrases, slot extractors and handler; the registry
+compiles them into an IntentMatcher on first use. Handlers (and the automation
+modules they call) are only imported the first time their intent fires.
+"""
+import importlib
+
+from core.intent_matcher import Intent, IntentMatcher
+
+
+class LazyAction:
+    """Callable stand-in for module.attr that imports the module on first call."""
+
+    def __init__(self, module_name, attr_name):
+        self.module_name = module_name
+        self.attr_name = attr_name
+        self._target = None
+
+    def resolve(self):
+        """Import the target module (once) and return the real callable."""
+        if self._target is None:
+            module = importlib.import_module(self.module_name)
+            self._target = getattr(module, self.attr_name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyAction({self.module_name}:{self.attr_name})"
+
+
+def lazy_import(module_name, attr_name):
+    """Return a LazyAction for module_name.attr_name."""
+    return LazyAction(module_name, attr_name)
+
+
+def _resolve_handler(handler):
+    """Accept a callable or a "package.module:function" string."""
+    if isinstance(handler, str):
+        module_name, _, attr_name = handler.partition(":")
+        return LazyAction(module_name, attr_name)
+    return handler
+
+
+class IntentRegistry:
+    """Ordered collection of intents; registration order is precedence."""
+
+    def __init__(self):
+        self._intents = []
+        self._names = set()
+        self._matcher = None
+
+    @property
+    def intents(self):
+        """Registered intents in precedence order."""
+        return list(self._intents)
+
+    def add(self, name, phrases, handler=None, requires=(), slots=None, reply=None, speculative=False):
+        """
+        Register an intent.
+
+        Args:
+            name: Unique intent name.
+            phrases: Trigger phrases (any one matches).
+            handler: Callable(ParsedIntent) or "module:function" string,
+                     imported lazily the first time the intent fires.
+            requires: Extra phrase groups that must also match.
+            slots: {slot_name: slot type or regex}, see Intent.
+            reply: Fixed response returned after the handler runs.
+            speculative: May run before the user finishes speaking (see Intent).
+
+        Returns:
+            The registered Intent.
+        """
+        if name in self._names:
+            raise ValueError(f"Intent '{name}' is already registered")
+        intent = Intent(name, phrases, _resolve_handler(handler),
+                        requires=requires, slots=slots, reply=reply, speculative=speculative)
+        self._intents.append(intent)
+        self._names.add(name)
+        self._matcher = None  # Recompiled on next match
+        return intent
+
+    def intent(self, name, phrases, requires=(), slots=None, reply=None, speculative=False):
+        """Decorator form of add() for handler functions."""
+        def decorator(func):
+            self.add(name, phrases, func, requires=requires, slots=slots, reply=reply,
+                     speculative=speculative)
+            return func
+        return decorator
+
+    def load_plugin(self, module_name):
+        """
+        Import a plugin module that registers extra intents.
+
+        The module must define register(registry). Its intents are appended
+        after the built-in ones, so they never shadow core commands.
+        """
+        module = importlib.import_module(module_name)
+        module.register(self)
+
+    def match(self, text):
+        """Return the highest-precedence Intent for a lowercased utterance, or None."""
+        if self._matcher is None:
+            self._matcher = IntentMatcher(self._intents)
+        return self._matcher.match(text)
+
+    def __len__(self):
+        return len(self._intents)
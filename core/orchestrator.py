@@ -0,0 +1,295 @@
+"""
+JARVIS Orchestrator - Event-driven asyncio pipeline for the conversation loop.
+
+The assistant used to run wake word, listening, routing, Gemini and speech
+strictly one after another, padded with fixed sleeps so the microphone would
+not hear JARVIS talking. Here each stage is a task connected to the next by a
+queue, blocking calls run off the event loop, and stages wait on readiness
+events (wake word released the mic, playback finished) instead of sleeping:
+
+    wake word -> listen (capture + recognize) -> route/Gemini -> playback
+
+Streamed replies play while the rest is still being generated, the wake chime
+overlaps synthesis of the acknowledgement, and every turn records its
+wake-to-first-audio latency.
+"""
+import asyncio
+import threading
+import time
+
+
+def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking call on a daemon thread and await its result.
+
+    Daemon threads are used instead of the default executor so a stage that
+    is stuck reading the microphone cannot hold up interpreter shutdown.
+    """
+    loop = asyncio.get_event_loop()
+    future = loop.create_future()
+
+    def resolve(result, error):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def worker():
+        result, error = None, None
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            pass  # Event loop already closed (shutting down)
+
+    name = getattr(func, "__name__", "stage")
+    threading.Thread(target=worker, name=f"jarvis-{name}", daemon=True).start()
+    return future
+
+
+class Turn:
+    """One utterance travelling through the pipeline."""
+
+    def __init__(self, command, woke_at=None, heard_at=None, ack_at=None):
+        self.command = command
+        self.woke_at = woke_at        # Wake word time, for the first turn of a conversation
+        self.ack_at = ack_at          # When the wake acknowledgement started playing
+        self.heard_at = heard_at      # When the user's speech had been captured
+        self.response = None
+        self.first_audio_at = None
+        self.shutdown = False
+        self.done = asyncio.Event()
+
+    def mark_first_audio(self):
+        """Playback callback; may be called from a worker thread."""
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+
+
+class Orchestrator:
+    """Runs the wake -> listen -> route -> speak pipeline as cooperating tasks."""
+
+    # Follow-ups shorter than this are treated as noise
+    MIN_FOLLOWUP_CHARS = 3
+
+    def __init__(self, wait_for_wake, capture, recognize, process, deliver, acknowledge=None,
+                 monitor=None, scheduler=None, tick=None, tick_interval=10.0,
+                 command_listen=(10, 15), followup_listen=(3, 8)):
+        """
+        Args:
+            wait_for_wake: Blocking callable returning True when the wake word is heard.
+            capture: Blocking callable(timeout, phrase_time_limit) -> audio or None.
+            recognize: Blocking callable(audio) -> text or None.
+            process: Blocking callable(command) -> reply (str or sentence
+                     generator), or None to shut down.
+            deliver: Blocking callable(reply, on_start) that speaks a reply and
+                     calls on_start when audio begins.
+            acknowledge: Optional blocking callable(on_start) run after the
+                         wake word, e.g. chime and "Yes sir?".
+            monitor: Optional JarvisMonitor to keep quiet during conversations.
+            scheduler: Optional SpeechScheduler whose reminders and chatter
+                       are held back during conversations.
+            tick: Optional blocking callable run every tick_interval seconds.
+            command_listen: (timeout, phrase_time_limit) for a command.
+            followup_listen: (timeout, phrase_time_limit) for a follow-up.
+        """
+        self.wait_for_wake = wait_for_wake
+        self.capture = capture
+        self.recognize = recognize
+        self.process = process
+        self.deliver = deliver
+        self.acknowledge = acknowledge
+        self.monitor = monitor
+        self.scheduler = scheduler
+        self.tick = tick
+        self.tick_interval = tick_interval
+        self.command_listen = command_listen
+        self.followup_listen = followup_listen
+
+        self.metrics = []  # One dict per completed turn, see _record()
+        self.shutdown_requested = False
+        self._loop = None
+        self._stop = None
+
+    async def run(self):
+        """
+        Run until stop() is called or a command requests shutdown.
+
+        Returns:
+            True if a command asked JARVIS to shut down.
+        """
+        self._loop = asyncio.get_event_loop()
+        self._stop = asyncio.Event()
+        self._idle = asyncio.Event()      # No conversation in progress
+        self._idle.set()
+        self._wakes = asyncio.Queue()
+        self._heard = asyncio.Queue()
+        self._replies = asyncio.Queue()
+
+        stages = [self._wake_stage(), self._listen_stage(), self._route_stage(), self._playback_stage()]
+        if self.tick:
+            stages.append(self._tick_stage())
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return self.shutdown_requested
+
+    def stop(self):
+        """Ask the pipeline to stop; safe to call from any thread or a signal handler."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    # --- Stages ---
+
+    async def _wake_stage(self):
+        while True:
+            await self._idle.wait()
+            try:
+                detected = await run_blocking(self.wait_for_wake)
+            except Exception as e:
+                self._report(e)
+                detected = False
+            if not detected:
+                await asyncio.sleep(1.0)  # Wake word engine unavailable; don't spin
+                continue
+            self._idle.clear()
+            await self._wakes.put(time.perf_counter())
+
+    async def _listen_stage(self):
+        while True:
+            woke_at = await self._wakes.get()
+            if self.scheduler:
+                self.scheduler.hold()
+            try:
+                await self._converse(woke_at)
+            except Exception as e:
+                self._report(e)
+            finally:
+                if self.monitor:
+                    self.monitor.set_listening(False)
+                if self.scheduler:
+                    self.scheduler.release()
+                if not self._stop.is_set():
+                    self._announce_idle()
+                self._idle.set()
+
+    async def _converse(self, woke_at):
+        """Listen and respond until the user goes quiet."""
+        if self.monitor:
+            self.monitor.set_listening(True)
+
+        ack = Turn(None, woke_at=woke_at)
+        if self.acknowledge:
+            await run_blocking(self.acknowledge, ack.mark_first_audio)
+
+        # Commands and follow-ups alternate, as in the original loop
+        followup = False
+        while not self._stop.is_set():
+            timeout, phrase_time_limit = self.followup_listen if followup else self.command_listen
+            audio = await run_blocking(self.capture, timeout, phrase_time_limit)
+            text = await run_blocking(self.recognize, audio) if audio is not None else None
+            if text and followup and len(text.strip()) < self.MIN_FOLLOWUP_CHARS:
+                text = None
+            if not text:
+                if not followup:
+                    self._print_dim("[No command detected]")
+                return
+
+            turn = Turn(text, woke_at=woke_at, heard_at=time.perf_counter(),
+                        ack_at=ack.first_audio_at if woke_at else None)
+            await self._heard.put(turn)
+            # Don't reopen the microphone until the reply has finished playing
+            await turn.done.wait()
+            if turn.shutdown:
+                return
+            woke_at = None
+            followup = not followup
+
+    async def _route_stage(self):
+        while True:
+            turn = await self._heard.get()
+            try:
+                if self.monitor:
+                    self.monitor.set_speaking(True)
+                turn.response = await run_blocking(self.process, turn.command)
+            except Exception as e:
+                self._report(e)
+                if self.monitor:
+                    self.monitor.set_speaking(False)
+                turn.done.set()
+                continue
+
+            if turn.response is None:
+                # Shutdown requested by the command itself
+                if self.monitor:
+                    self.monitor.set_speaking(False)
+                turn.shutdown = True
+                self.shutdown_requested = True
+                turn.done.set()
+                self._stop.set()
+                continue
+            await self._replies.put(turn)
+
+    async def _playback_stage(self):
+        while True:
+            turn = await self._replies.get()
+            try:
+                await run_blocking(self.deliver, turn.response, turn.mark_first_audio)
+            except Exception as e:
+                self._report(e)
+            finally:
+                if self.monitor:
+                    self.monitor.set_speaking(False)
+                self._record(turn)
+                turn.done.set()
+
+    async def _tick_stage(self):
+        while True:
+            try:
+                await run_blocking(self.tick)
+            except Exception as e:
+                self._report(e)
+            await asyncio.sleep(self.tick_interval)
+
+    # --- Metrics & output ---
+
+    def _record(self, turn):
+        """Store latencies (seconds) for a finished turn."""
+        if turn.first_audio_at is None:
+            return
+        entry = {
+            "command": turn.command,
+            "speech_to_audio": turn.first_audio_at - turn.heard_at,
+            "wake_to_ack": None,
+            "wake_to_audio": None,
+        }
+        if turn.woke_at is not None:
+            entry["wake_to_audio"] = turn.first_audio_at - turn.woke_at
+            if turn.ack_at is not None:
+                entry["wake_to_ack"] = turn.ack_at - turn.woke_at
+        self.metrics.append(entry)
+
+        parts = [f"reply audio {entry['speech_to_audio']:.2f}s after speech"]
+        if entry["wake_to_ack"] is not None:
+            parts.insert(0, f"ack {entry['wake_to_ack']:.2f}s after wake")
+        self._print_dim(f"[Latency: {', '.join(parts)}]")
+
+    def _announce_idle(self):
+        from ui.jarvis_face import Colors
+        print(f"\n  {Colors.DIM}Awaiting wake word 'Jarvis'...{Colors.RESET}\n")
+
+    def _print_dim(self, message):
+        from ui.jarvis_face import Colors
+        print(f"  {Colors.DIM}{message}{Colors.RESET}")
+
+    def _report(self, error):
+        from ui.jarvis_face import Colors
+        print(f"  {Colors.RED}[ERROR] {error}{Colors.RESET}")
@@ -0,0 +1,355 @@
+"""
+JARVIS Phrase Bank - Every fixed sentence JARVIS can say, rendered ahead of time.
+
+Most of what JARVIS says is a fixed string: router replies, greetings, the
+quick responses in gpt_engine, "Yes sir?". Instead of maintaining a list of
+them, the phrase bank reads the modules in SOURCES and collects each string
+literal that looks like a spoken sentence. Docstrings and print() arguments
+are skipped. F-strings with placeholders ("Volume set to {level} percent")
+cannot be rendered in advance; they are listed as templates in the
+coverage report.
+
+build() synthesizes the missing phrases on a thread pool into
+data/phrase_bank, next to an index.json. Each clip is named by the format
+the TTS engine returned (MP3 from Edge, WAV from the stub). Sources are
+found relative to the package, whatever the working directory; one that
+is missing (as in an app bundle without .py files) is skipped. speak() looks a phrase up there
+before going anywhere else. Bank entries are never evicted, unlike the LRU
+TTS cache. Run it at install time with
+
+    python -m core.phrase_bank
+
+and main.py refreshes it in the background at boot.
+"""
+import ast
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+BANK_DIR = "data/phrase_bank"
+
+# Directory SOURCES are relative to
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules whose string literals are scanned for phrases
+SOURCES = [
+    "main.py",
+    "core/command_router.py",
+    "core/gpt_engine.py",
+    "monitoring/jarvis_monitor.py",
+    "automation/calendar_agent.py",
+]
+
+# Defaults for the `phrase_bank` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "path": BANK_DIR,
+    "workers": 4,
+}
+
+# A capitalised sentence of several words, ending in . ? or !
+_SPOKEN = re.compile(r"^[A-Z][^\n]*\s[^\n]*[.?!]$")
+_MAX_CHARS = 400
+
+
+def _literal_text(node):
+    """(text, is_template) for a str constant or f-string, with placeholders as {}."""
+    if isinstance(node, ast.Constant):
+        return node.value, False
+    parts, template = [], False
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+        else:
+            parts.append("{}")
+            template = True
+    return "".join(parts), template
+
+
+def _audio_format(audio):
+    """File extension for encoded audio: WAV starts with a RIFF header, anything else is MP3."""
+    return "wav" if audio[:4] == b"RIFF" else "mp3"
+
+
+def scan_source(path):
+    """
+    Collect the spoken string literals in one Python file.
+
+    Args:
+        path: Source file, relative to PACKAGE_ROOT (or absolute).
+
+    Returns:
+        (phrases, templates): lists of (text, "path:line", owner), where owner
+        is the name of the top-level def or assignment holding the literal.
+    """
+    with open(os.path.join(PACKAGE_ROOT, path), "r") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    parents = {}
+    for node in ast.walk(tree):
+        for child in ast.iter_child_nodes(node):
+            parents[child] = node
+
+    owners = {}
+    for statement in tree.body:
+        if isinstance(statement, (ast.FunctionDef, ast.ClassDef)):
+            owner = statement.name
+        elif isinstance(statement, ast.Assign) and isinstance(statement.targets[0], ast.Name):
+            owner = statement.targets[0].id
+        else:
+            owner = None
+        for node in ast.walk(statement):
+            owners[node] = owner
+
+    phrases, templates = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and not isinstance(node.value, str):
+            continue
+        if not isinstance(node, (ast.Constant, ast.JoinedStr)):
+            continue
+        parent = parents.get(node)
+        if isinstance(parent, (ast.JoinedStr, ast.FormattedValue, ast.Expr)):
+            continue  # Part of an f-string, or a docstring
+        if isinstance(parent, ast.Call) and getattr(parent.func, "id", None) == "print":
+            continue
+        text, template = _literal_text(node)
+        if len(text) > _MAX_CHARS or not _SPOKEN.match(text):
+            continue
+        entry = (node.lineno, text, owners.get(node))
+        (templates if template else phrases).append(entry)
+    return ([(text, f"{path}:{line}", owner) for line, text, owner in sorted(found)]
+            for found in (phrases, templates))
+
+
+def collect_phrases(sources=None):
+    """
+    Every static phrase in the source modules, with the voices it is spoken in.
+
+    Returns:
+        (phrases, templates): phrases maps (clean_text, rate, pitch) to the
+        location of its first occurrence; templates lists (text, location).
+    """
+    from core.speech_output import JARVIS_RATE, JARVIS_PITCH, GREETING_RATE, GREETING_PITCH
+    from core.text_normalizer import normalize_for_speech
+
+    phrases, templates = {}, []
+    for path in sources or SOURCES:
+        try:
+            found, dynamic = scan_source(path)
+        except OSError as e:
+            _warn(f"Skipping {path}: {e.strerror or e}")
+            continue
+        templates += [(text, location) for text, location, _ in dynamic]
+        for text, location, owner in found:
+            clean_text = normalize_for_speech(text)
+            voices = [(JARVIS_RATE, JARVIS_PITCH)]
+            if owner == "GREETINGS":
+                # Spoken warmly at boot, plainly when the user says hello
+                voices.append((GREETING_RATE, GREETING_PITCH))
+            for rate, pitch in voices:
+                phrases.setdefault((clean_text, rate, pitch), location)
+    return phrases, templates
+
+
+class PhraseBank:
+    """Indexed directory of pre-rendered phrases."""
+
+    def __init__(self, path=BANK_DIR, workers=4, sources=None):
+        """
+        Args:
+            path: Directory holding the clips and index.json.
+            workers: Phrases synthesized in parallel during build().
+            sources: Modules to scan (default SOURCES).
+        """
+        self.path = path
+        self.workers = workers
+        self.sources = sources or SOURCES
+        self.index_file = os.path.join(path, "index.json")
+        self.stats = {"lookups": 0, "hits": 0, "seconds_saved": 0.0}
+        self.phrases = None      # key -> entry for every static phrase, once collected
+        self.templates = []
+        self.last_build = None
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.entries = self._load()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a bank from the `phrase_bank` settings section, or None if disabled."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        if not merged.pop("enabled"):
+            return None
+        return cls(**merged)
+
+    def _load(self):
+        try:
+            with open(self.index_file, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {key: entry for key, entry in entries.items() if os.path.exists(self.file_for(key, entry))}
+
+    def _save(self):
+        temp = self.index_file + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(temp, self.index_file)
+
+    def _collect(self):
+        from core.speech_output import JARVIS_VOICE
+        from core.tts_cache import TTSCache
+
+        phrases, self.templates = collect_phrases(self.sources)
+        self.phrases = {}
+        for (clean_text, rate, pitch), location in phrases.items():
+            key = TTSCache.key_for(clean_text, JARVIS_VOICE, rate, pitch)
+            self.phrases[key] = {"text": clean_text, "rate": rate, "pitch": pitch, "source": location}
+
+    def file_for(self, key, entry=None):
+        """Clip path for a phrase, with the extension of the format it was rendered in."""
+        entry = entry or self.entries.get(key) or {}
+        return os.path.join(self.path, f"{key}.{entry.get('format', 'mp3')}")
+
+    def has(self, key):
+        """Whether a phrase is pre-rendered (without counting a lookup)."""
+        return key in self.entries
+
+    def get(self, key):
+        """
+        Path of a pre-rendered phrase.
+
+        Returns:
+            The file path, or None if the phrase is not in the bank.
+        """
+        with self._lock:
+            self.stats["lookups"] += 1
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.stats["hits"] += 1
+            self.stats["seconds_saved"] += entry["seconds"]
+        return self.file_for(key)
+
+    def build(self, synthesize=None):
+        """
+        Render every static phrase that is not in the bank yet, in parallel,
+        and drop clips for phrases that no longer exist.
+
+        Args:
+            synthesize: Callable(clean_text, rate, pitch) -> encoded audio;
+                        defaults to speech_output._synthesize.
+
+        Returns:
+            Dict with phrases, rendered, failed, removed and seconds (wall time).
+        """
+        from core.speech_output import _synthesize
+
+        synthesize = synthesize or _synthesize
+        start = time.perf_counter()
+        self._collect()
+        wanted = self.phrases
+
+        def render(key):
+            entry = dict(wanted[key])
+            began = time.perf_counter()
+            try:
+                audio = synthesize(entry["text"], entry["rate"], entry["pitch"])
+            except Exception:
+                return False
+            entry["seconds"] = round(time.perf_counter() - began, 3)
+            entry["format"] = _audio_format(audio)
+            path = self.file_for(key, entry)
+            partial = f"{path}.{threading.get_ident()}.part"
+            with open(partial, "wb") as f:
+                f.write(audio)
+            os.replace(partial, path)
+            with self._lock:
+                self.entries[key] = entry
+            return True
+
+        missing = [key for key in wanted if key not in self.entries]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(render, missing))
+
+        removed = [key for key in list(self.entries) if key not in wanted]
+        with self._lock:
+            stale = [self.file_for(key) for key in removed]
+            for key in removed:
+                del self.entries[key]
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
+
+        self._save()
+        self.last_build = {
+            "phrases": len(wanted),
+            "rendered": sum(results),
+            "failed": len(results) - sum(results),
+            "removed": len(removed),
+            "seconds": time.perf_counter() - start,
+        }
+        return self.last_build
+
+    def report(self):
+        """
+        Coverage of the static phrases and time saved at runtime.
+
+        Returns:
+            Multi-line string.
+        """
+        if self.phrases is None:
+            self._collect()
+
+        covered = [key for key in self.phrases if key in self.entries]
+        missing = [self.phrases[key] for key in self.phrases if key not in self.entries]
+        render_time = sum(self.entries[key].get("seconds", 0.0) for key in covered)
+        lines = [
+            f"Phrase bank: {len(covered)}/{len(self.phrases)} static phrases rendered "
+            f"({len(covered) / max(len(self.phrases), 1):.0%}), "
+            f"{render_time / max(len(covered), 1):.2f} s average synthesis",
+        ]
+        if self.last_build:
+            build = self.last_build
+            lines.append(f"  Last build: {build['rendered']} rendered, {build['failed']} failed, "
+                         f"{build['removed']} removed in {build['seconds']:.1f} s "
+                         f"({self.workers} workers)")
+        for entry in missing:
+            lines.append(f"  Missing:  {entry['source']}  {entry['text'][:60]}")
+        lines.append(f"  {len(self.templates)} templates with live values are synthesized when spoken:")
+        for text, location in self.templates:
+            lines.append(f"    {location}  {text[:60]}")
+        stats = self.stats
+        lines.append(f"  This session: {stats['hits']}/{stats['lookups']} utterances served from the bank, "
+                     f"{stats['seconds_saved']:.1f} s of synthesis saved")
+        return "\n".join(lines)
+
+
+def _warn(message):
+    from ui.jarvis_face import Colors
+    print(f"  {Colors.YELLOW}[PHRASE BANK] {message}{Colors.RESET}")
+
+
+def main():
+    import argparse
+    from core.speech_output import get_phrase_bank
+
+    parser = argparse.ArgumentParser(description="Pre-render JARVIS's fixed phrases.")
+    parser.add_argument("--report", action="store_true", help="Only print the coverage report")
+    args = parser.parse_args()
+
+    bank = get_phrase_bank()
+    if bank is None:
+        print("Phrase bank is disabled in config/settings.yaml")
+        return
+    if not args.report:
+        bank.build()
+    print(bank.report())
+
+
+if __name__ == "__main__":
+    main()
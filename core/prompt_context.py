@@ -0,0 +1,220 @@
+"""
+JARVIS Prompt Context - Relevant context for Gemini, packed into a token budget.
+
+ask_gpt used to send the persona, the time and the last 5 exchanges
+verbatim, whatever was asked. Facts the user had told JARVIS to remember
+were never sent. Now every piece of candidate context is scored against
+the current utterance:
+
+    system state    the time and any live status passed in. Always sent
+    recent turns    the latest exchange is always sent, so "it" and "that"
+                    resolve. Older ones score by similarity plus a recency
+                    bonus that halves with every turn. The summary of
+                    turns already folded out of history is always sent
+    user facts      the closest remembered facts, from memory_manager's
+                    similarity index
+
+The best-scoring items are packed greedily into the budget. Items below
+their minimum score are left out even when there is room, because an
+unrelated turn costs tokens and can lead the reply astray. The result is
+cached per turn: the same utterance, history, system state and memory
+version give the same context without scoring again.
+"""
+import threading
+from collections import OrderedDict
+
+
+# Defaults for the `prompt_context` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "budget_tokens": 350,   # Conversation turns and facts, beyond persona and question
+    "recent_turns": 1,      # Latest exchanges always included
+    "max_facts": 3,         # Remembered facts considered per utterance
+    "min_fact_score": 0.3,
+    "min_turn_score": 0.25,
+    "cache_size": 16,
+}
+
+# Bonus for the previous turn; it halves with each turn further back
+RECENCY_BONUS = 0.15
+
+MANDATORY = float("inf")
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count: about four characters per token."""
+    return (len(text) + 3) // 4
+
+
+class ContextItem:
+    """One candidate piece of prompt context."""
+
+    def __init__(self, kind, text, score, order=0):
+        self.kind = kind        # "system", "fact", "summary" or "turn"
+        self.text = text
+        self.score = score
+        self.order = order      # Position within its section
+        self.tokens = estimate_tokens(text)
+
+
+class PromptContext:
+    """The context chosen for one turn, rendered for the prompt."""
+
+    def __init__(self, items, dropped):
+        self.items = items
+        self.dropped = dropped  # Candidates left out for score or budget
+        self.text = _render(items)
+        self.tokens = estimate_tokens(self.text)
+
+    def count(self, kind):
+        return sum(1 for item in self.items if item.kind == kind)
+
+
+class PromptContextBuilder:
+    """Scores candidate context against an utterance and packs the best into a budget."""
+
+    def __init__(self, budget_tokens=350, recent_turns=1, max_facts=3, min_fact_score=0.3,
+                 min_turn_score=0.25, cache_size=16, search_facts=None, facts_version=None):
+        """
+        Args:
+            budget_tokens: Tokens available to turns and facts.
+            recent_turns: Latest exchanges sent regardless of score.
+            max_facts: Remembered facts considered per utterance.
+            min_fact_score: Similarity a fact needs to be sent.
+            min_turn_score: Similarity plus recency an older turn needs.
+            cache_size: Recent turns whose context is kept.
+            search_facts: Callable(query, k) -> [(key, value, score)], default
+                          memory_manager.search_memory.
+            facts_version: Callable returning a value that changes whenever
+                           the facts do, default the memory store's version.
+        """
+        from core.embeddings import HashedNgramVectorizer
+
+        if search_facts is None or facts_version is None:
+            from memory import memory_manager
+            search_facts = search_facts or memory_manager.search_memory
+            facts_version = facts_version or (lambda: memory_manager.get_store().version)
+        self.budget_tokens = budget_tokens
+        self.recent_turns = recent_turns
+        self.max_facts = max_facts
+        self.min_fact_score = min_fact_score
+        self.min_turn_score = min_turn_score
+        self.cache_size = cache_size
+        self._search_facts = search_facts
+        self._facts_version = facts_version
+        self._vectorizer = HashedNgramVectorizer(dim=1024)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"builds": 0, "cache_hits": 0, "context_tokens": 0, "dropped": 0,
+                      "prompts": 0, "prompt_tokens": 0, "max_prompt_tokens": 0}
+
+    @classmethod
+    def from_config(cls, settings, **kwargs):
+        """Build from the `prompt_context` settings section."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        merged.update(kwargs)
+        return cls(**merged)
+
+    def build(self, utterance, history=None, system_context=None, time_context=None, summary=None):
+        """
+        Choose the context for one turn.
+
+        Args:
+            utterance: What the user just said.
+            history: Exchanges so far [{"user": ..., "assistant": ...}], oldest first.
+            system_context: Optional dict of live system state.
+            time_context: Optional line describing the current time.
+            summary: Optional summary of exchanges no longer in history.
+
+        Returns:
+            A PromptContext; .text goes between the persona and the utterance.
+        """
+        history = list(history or [])
+        key = (utterance, tuple((e["user"], e["assistant"]) for e in history),
+               repr(sorted((system_context or {}).items())), time_context, summary, self._facts_version())
+        with self._lock:
+            context = self._cache.get(key)
+            if context is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return context
+
+        context = self._pack(self._candidates(utterance, history, system_context, time_context, summary))
+        with self._lock:
+            self._cache[key] = context
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.stats["builds"] += 1
+            self.stats["context_tokens"] += context.tokens
+            self.stats["dropped"] += context.dropped
+        return context
+
+    def record(self, full_prompt):
+        """Count the size of a prompt actually sent."""
+        tokens = estimate_tokens(full_prompt)
+        with self._lock:
+            self.stats["prompts"] += 1
+            self.stats["prompt_tokens"] += tokens
+            self.stats["max_prompt_tokens"] = max(self.stats["max_prompt_tokens"], tokens)
+        return tokens
+
+    def _candidates(self, utterance, history, system_context, time_context, summary):
+        from memory.memory_index import strip_filler
+
+        items = []
+        status = [time_context] if time_context else []
+        if system_context:
+            status.append("System status: " + ", ".join(f"{k}: {v}" for k, v in system_context.items()))
+        if status:
+            items.append(ContextItem("system", ", ".join(status), MANDATORY))
+
+        for order, (key, value, score) in enumerate(self._search_facts(utterance, self.max_facts)):
+            score = score if score >= self.min_fact_score else None
+            items.append(ContextItem("fact", f"{key}: {value}", score, order))
+
+        if summary:
+            items.append(ContextItem("summary", summary, MANDATORY))
+
+        if history:
+            texts = [strip_filler(f"{e['user']} {e['assistant']}") for e in history]
+            matrix = self._vectorizer.transform([strip_filler(utterance)] + texts)
+            similarity = matrix[1:] @ matrix[0]
+            for order, exchange in enumerate(history):
+                age = len(history) - 1 - order
+                if age < self.recent_turns:
+                    score = MANDATORY
+                else:
+                    score = float(similarity[order]) + RECENCY_BONUS * 0.5 ** (age - self.recent_turns)
+                    if score < self.min_turn_score:
+                        score = None
+                text = f"User: {exchange['user']}\nJARVIS: {exchange['assistant']}"
+                items.append(ContextItem("turn", text, score, order))
+        return items
+
+    def _pack(self, candidates):
+        """Keep mandatory items, then the best-scoring ones that still fit."""
+        eligible = sorted((item for item in candidates if item.score is not None),
+                          key=lambda item: -item.score)
+        chosen, used = [], 0
+        for item in eligible:
+            if item.score == MANDATORY or used + item.tokens <= self.budget_tokens:
+                chosen.append(item)
+                used += item.tokens if item.kind != "system" else 0
+        return PromptContext(chosen, len(candidates) - len(chosen))
+
+
+def _render(items):
+    """Context sections in a fixed order, each in its original order."""
+    def texts(kind):
+        return [item.text for item in sorted(items, key=lambda item: item.order) if item.kind == kind]
+
+    sections = []
+    if texts("system"):
+        sections.append(f"CURRENT CONTEXT: {', '.join(texts('system'))}\n\n")
+    if texts("fact"):
+        sections.append("WHAT THE USER HAS TOLD YOU:\n" + "".join(f"- {text}\n" for text in texts("fact")) + "\n")
+    if texts("summary"):
+        sections.append(texts("summary")[0] + "\n\n")
+    if texts("turn"):
+        sections.append("RECENT CONVERSATION:\n" + "".join(f"{text}\n" for text in texts("turn")) + "\n")
+    return "".join(sections)
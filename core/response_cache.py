@@ -0,0 +1,179 @@
+"""
+JARVIS Response Cache - Persistent LRU/TTL cache for Gemini replies.
+
+Asking "what's the meaning of life" twice should not cost two API round
+trips. Replies are stored in SQLite, keyed on a hash of the normalised
+prompt, the last few exchanges of history, the time-of-day period and the
+remembered facts and summary sent with it, so the same question in the same
+conversational situation is answered instantly.
+Entries expire after a TTL and the least recently used ones are evicted once
+the cache is full. Prompts that depend on live data ("what time is it") or
+that should vary ("tell me a joke") are never cached.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+CACHE_FILE = "data/response_cache.db"
+
+# Defaults for the `response_cache` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "path": CACHE_FILE,
+    "max_entries": 500,
+    "ttl_hours": 24,
+    "history_turns": 1,  # Exchanges of history that make up the key
+    # Prompts matching any of these are never cached...
+    "never_cache": [
+        r"\b(time|date|today|tonight|tomorrow|yesterday|now|current|currently|latest|news)\b",
+        r"\b(weather|forecast|score|stock|price)\b",
+        r"\b(joke|story|poem|random|another|surprise)\b",
+        r"\b(remind|remember|my)\b",
+    ],
+    # ...unless they also match one of these
+    "always_cache": [
+        r"\bmeaning of life\b",
+    ],
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_SPACES = re.compile(r"\s+")
+_FILLER = re.compile(r"^(?:(?:hey|ok|okay|so|jarvis|please)\b\s*)+|\s*\b(?:please|jarvis)$")
+
+
+def normalize_prompt(text):
+    """Lowercase, drop punctuation and leading/trailing filler words."""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    text = _SPACES.sub(" ", text).strip()
+    return _FILLER.sub("", text).strip()
+
+
+class ResponseCache:
+    """SQLite-backed reply cache with TTL expiry and LRU eviction."""
+
+    def __init__(self, path=CACHE_FILE, max_entries=500, ttl_hours=24, history_turns=1,
+                 never_cache=None, always_cache=None):
+        """
+        Args:
+            path: SQLite file, or ":memory:" for a throwaway cache.
+            max_entries: Size bound; least recently used entries go first.
+            ttl_hours: Age after which an entry is treated as a miss.
+            history_turns: How many recent exchanges are part of the key.
+            never_cache: Regexes for prompts that must always reach Gemini.
+            always_cache: Regexes that override never_cache.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.history_turns = history_turns
+        self._never = [re.compile(p) for p in (never_cache if never_cache is not None
+                                               else DEFAULT_SETTINGS["never_cache"])]
+        self._always = [re.compile(p) for p in (always_cache if always_cache is not None
+                                                else DEFAULT_SETTINGS["always_cache"])]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, prompt TEXT, reply TEXT,"
+            " created REAL, last_used REAL, hits INTEGER DEFAULT 0)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)")
+        self._db.commit()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a cache from the `response_cache` settings section, or None if disabled."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        if not merged.pop("enabled"):
+            return None
+        return cls(**merged)
+
+    def is_cacheable(self, prompt):
+        """Whether a reply to this prompt may be reused."""
+        text = normalize_prompt(prompt)
+        if not text:
+            return False
+        if any(p.search(text) for p in self._always):
+            return True
+        return not any(p.search(text) for p in self._never)
+
+    def key_for(self, prompt, history=None, period="", context=None):
+        """
+        Cache key for a prompt in its conversational situation.
+
+        Args:
+            prompt: The user's message.
+            history: Recent exchanges [{"user": ..., "assistant": ...}].
+            period: Time-of-day bucket ("morning", "late night", ...).
+            context: Anything else the reply depends on (JSON-serializable),
+                     e.g. the facts and summary chosen for the prompt.
+        """
+        window = list(history or [])[-self.history_turns:] if self.history_turns else []
+        material = [normalize_prompt(prompt), period,
+                    [[normalize_prompt(e["user"]), normalize_prompt(e["assistant"])] for e in window],
+                    context]
+        return hashlib.sha256(json.dumps(material).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached reply for a key, or None (counting the hit or miss)."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT reply, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, prompt, reply):
+        """Store a reply and evict the least recently used entries beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, prompt, reply, created, last_used, hits)"
+                " VALUES (?, ?, ?, ?, ?, 0)", (key, prompt, reply, now, now))
+            evicted = self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+                " ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)).rowcount
+            self._db.commit()
+            self.evictions += max(evicted, 0)
+
+    def clear(self):
+        """Remove every cached reply."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters for this session plus the current cache size."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,30 @@
+"""
+JARVIS Settings - config/settings.yaml, parsed once and shared.
+
+Components configure themselves from one section each through their
+from_config(load_settings("section")). A missing file or section gives {},
+so every component falls back to its DEFAULT_SETTINGS.
+"""
+
+SETTINGS_FILE = "config/settings.yaml"
+
+_cached_settings = None
+
+
+def get_settings():
+    """All of settings.yaml as a dict ({} if the file does not exist)."""
+    global _cached_settings
+    if _cached_settings is None:
+        import yaml
+
+        try:
+            with open(SETTINGS_FILE, "r") as f:
+                _cached_settings = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            _cached_settings = {}
+    return _cached_settings
+
+
+def load_settings(section):
+    """One section of settings.yaml ({} if absent)."""
+    return get_settings().get(section) or {}
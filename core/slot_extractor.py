@@ -0,0 +1,136 @@
+"""
+JARVIS Slot Extractor - Typed parameter extraction for routed commands.
+
+One combined, precompiled pattern scans an utterance once and pulls out every
+typed value the router cares about: file names, URLs, durations such as
+"1 hour 30 minutes", and plain integers. Intents then pick their slots from
+the scan instead of running their own regexes over the text.
+"""
+import re
+
+
+# Slot types an intent can declare instead of a custom regex
+SLOT_TYPES = ("int", "duration", "url", "filename")
+
+_FILE_EXTENSIONS = (
+    "txt|md|pdf|docx?|xlsx?|pptx?|csv|json|ya?ml|py|js|ts|html|css|"
+    "png|jpe?g|gif|mp3|mp4|mov|zip|key|pages|numbers"
+)
+
+_DURATION_UNIT = r"(\d+(?:\.\d+)?|half an?|an?)\s*(hours?|hrs?|minutes?|mins?|seconds?|secs?)\b"
+_DURATION = rf"(?P<duration>(?:(?P<prefix>in|after|for)\s+)?{_DURATION_UNIT}(?:\s*(?:and\s+)?{_DURATION_UNIT})*)"
+_DOTTED = r"(?P<dotted>https?://\S+|\w[\w\-]*(?:\.[\w\-]+)+(?:/\S*)?)"
+
+# Dotted tokens (URLs, file names) can only appear when the text has a ".",
+# so the common case runs the cheaper pattern.
+_SCAN = re.compile(rf"\b(?:{_DURATION}|{_DOTTED}|(?P<int>\d+))")
+_SCAN_NO_DOTS = re.compile(rf"\b(?:{_DURATION}|(?P<int>\d+))")
+_DURATION_PART = re.compile(_DURATION_UNIT)
+_FILENAME = re.compile(rf"^[^/]+\.(?:{_FILE_EXTENSIONS})$")
+_URL = re.compile(r"^https?://|\.[a-z]{2,}(?:/|$)")
+
+_UNIT_SECONDS = {"h": 3600, "m": 60, "s": 1}
+
+
+class Duration:
+    """A spoken duration, e.g. "in 1 hour 30 minutes"."""
+
+    def __init__(self, seconds, span, prefix=None):
+        self.seconds = seconds
+        self.span = span
+        self.prefix = prefix  # "in", "after", "for" or None
+
+    @property
+    def minutes(self):
+        """Duration in minutes; an int when it is a whole number of minutes."""
+        minutes = self.seconds / 60
+        return int(minutes) if minutes == int(minutes) else round(minutes, 2)
+
+    def __eq__(self, other):
+        return isinstance(other, Duration) and self.seconds == other.seconds
+
+    def __repr__(self):
+        return f"Duration({self.seconds}s)"
+
+
+def _parse_duration(text):
+    seconds = 0.0
+    for amount, unit in _DURATION_PART.findall(text):
+        if amount.startswith("half"):
+            value = 0.5
+        elif amount in ("a", "an"):
+            value = 1
+        else:
+            value = float(amount)
+        seconds += value * _UNIT_SECONDS[unit[0]]
+    return int(seconds) if seconds == int(seconds) else seconds
+
+
+class SlotScan:
+    """Every typed value found in an utterance, in order of appearance."""
+
+    def __init__(self, text):
+        self.ints = []        # (value, start)
+        self.durations = []   # Duration
+        self.urls = []        # (value, start)
+        self.filenames = []   # (value, start)
+
+        pattern = _SCAN if "." in text else _SCAN_NO_DOTS
+        for match in pattern.finditer(text):
+            kind = match.lastgroup
+            if kind == "int":
+                self.ints.append((int(match.group(kind)), match.start()))
+            elif kind == "duration":
+                self.durations.append(
+                    Duration(_parse_duration(match.group(kind)), match.span(), match.group("prefix")))
+            else:
+                value = match.group(kind).rstrip(".,?!")
+                if _FILENAME.search(value):
+                    self.filenames.append((value, match.start()))
+                elif _URL.search(value):
+                    self.urls.append((value, match.start()))
+
+    def first(self, slot_type, after=0):
+        """
+        First value of a slot type at or after a text offset (usually the end
+        of the trigger phrase), falling back to the first one anywhere.
+        """
+        if slot_type == "duration":
+            found = [(d, d.span[0]) for d in self.durations]
+        else:
+            found = {"int": self.ints, "url": self.urls, "filename": self.filenames}[slot_type]
+        for value, start in found:
+            if start >= after:
+                return value
+        return found[0][0] if found else None
+
+
+class ParsedIntent:
+    """A matched intent together with the slots extracted for it."""
+
+    def __init__(self, intent, text, slots):
+        self.intent = intent
+        self.text = text
+        self.slots = slots
+        self._remainder = None
+
+    @property
+    def name(self):
+        return self.intent.name
+
+    @property
+    def remainder(self):
+        """The utterance with the intent's trigger phrases removed."""
+        if self._remainder is None:
+            self._remainder = self.intent.strip_phrases(self.text)
+        return self._remainder
+
+    def without(self, *spans):
+        """The remainder with the given (start, end) text spans cut out as well."""
+        text = self.text
+        for start, end in sorted(spans, reverse=True):
+            text = text[:start] + text[end:]
+        return self.intent.strip_phrases(text)
+
+    def __repr__(self):
+        return f"ParsedIntent({self.intent.name!r}, {self.slots!r})"
@@ -0,0 +1,135 @@
+"""
+JARVIS Speculative Router - Start short commands before the user stops talking.
+
+With a streaming speech engine, partial transcripts arrive while the user is
+still speaking. Once the leading words have stayed the same across a few
+consecutive partials (~150 ms of audio) they are treated as stable; if they
+already form a complete, unambiguous command for an intent marked
+speculative (launch an app, read the battery), route_command runs on them in
+the background. When the final transcript lands the speculation is
+committed - its reply is used and the command is not routed again - if the
+final text resolves to the same intent and slots, and cancelled (its reply
+discarded) otherwise. Only idempotent intents are speculative, so a
+cancelled run costs nothing worse than, say, an app that was opened a
+moment early.
+"""
+import threading
+import time
+
+
+class Speculation:
+    """A route_command call started on a stable partial transcript."""
+
+    def __init__(self, text, intent):
+        self.text = text
+        self.intent = intent
+        self.started_at = time.perf_counter()
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class SpeculativeRouter:
+    """Tracks partial transcripts and speculatively routes stable prefixes."""
+
+    def __init__(self, route=None, match=None, phrases=None, stable_partials=3):
+        """
+        Args:
+            route: Callable(text) -> reply; defaults to route_command.
+            match: Callable(text) -> Intent or None; defaults to match_intent.
+            phrases: All trigger phrases, to spot prefixes of longer commands;
+                     defaults to the command router's.
+            stable_partials: Consecutive partials a prefix must survive
+                             (one partial per 64 ms audio chunk).
+        """
+        if route is None or match is None or phrases is None:
+            from core import command_router
+            route = route or command_router.route_command
+            match = match or command_router.match_intent
+            if phrases is None:
+                phrases = [p for intent in command_router.router.intents for p in intent.phrases]
+        self.route = route
+        self.match = match
+        self.phrases = list(phrases)
+        self.stable_partials = stable_partials
+        self.stats = {"speculated": 0, "committed": 0, "cancelled": 0}
+        self.reset()
+
+    def reset(self):
+        """Forget the current utterance (call before each listen)."""
+        self._partials = []
+        self.speculation = None
+
+    def update(self, partial):
+        """
+        Feed a partial transcript; may start a speculation.
+
+        Returns:
+            The Speculation started by this partial, or None.
+        """
+        words = partial.lower().split()
+        if not words or self.speculation is not None:
+            return None
+        self._partials = (self._partials + [words])[-self.stable_partials:]
+        if len(self._partials) < self.stable_partials:
+            return None
+
+        stable = self._partials[0]
+        for other in self._partials[1:]:
+            n = 0
+            while n < min(len(stable), len(other)) and stable[n] == other[n]:
+                n += 1
+            stable = stable[:n]
+        if not stable:
+            return None
+
+        text = " ".join(stable)
+        intent = self.match(text)
+        if intent is None or not intent.speculative or self._is_incomplete(text):
+            return None
+
+        speculation = Speculation(text, intent)
+        self.speculation = speculation
+        self.stats["speculated"] += 1
+        threading.Thread(target=self._run, args=(speculation,), name="jarvis-speculate",
+                         daemon=True).start()
+        return speculation
+
+    def _is_incomplete(self, text):
+        """True if the words so far are also the start of a longer trigger phrase."""
+        return any(phrase != text and phrase.startswith(text) for phrase in self.phrases)
+
+    def _run(self, speculation):
+        try:
+            speculation.result = self.route(speculation.text)
+        except Exception as e:
+            speculation.error = e
+        finally:
+            speculation.done.set()
+
+    def resolve(self, final):
+        """
+        Commit or cancel the speculation against the final transcript.
+
+        Returns:
+            The speculative reply if the final text confirms it, else None
+            (route the final text as usual).
+        """
+        speculation = self.speculation
+        self.reset()
+        if speculation is None:
+            return None
+
+        final = final.lower()
+        intent = self.match(final)
+        if (intent is not speculation.intent
+                or intent.parse(final).slots != intent.parse(speculation.text).slots):
+            self.stats["cancelled"] += 1
+            return None
+
+        speculation.done.wait()
+        if speculation.error is not None:
+            self.stats["cancelled"] += 1
+            return None
+        self.stats["committed"] += 1
+        return speculation.result
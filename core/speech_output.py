@@ -1,11 +1,22 @@
 """
 JARVIS Speech Output - High-quality British voice synthesis with Iron Man style.
+
+Synthesis and playback happen in-process: the TTS engine returns encoded
+audio in memory, and core.audio_output plays it through one persistent
+output stream. No temp files are written and no process is started per
+utterance.
 """
+import asyncio
 import os
+import queue
 import subprocess
+import threading
 import time
 import re
-import shutil
+from collections import deque
+
+from core.settings import load_settings
+from core.text_normalizer import normalize_for_speech
 
 
 # JARVIS voice configuration
@@ -13,119 +24,578 @@ JARVIS_VOICE = "en-GB-RyanNeural"  # British male neural voice
 JARVIS_RATE = "+0%"  # Speech rate adjustment
 JARVIS_PITCH = "+0Hz"  # Pitch adjustment
 
+_cached_tts_cache = None
+_cached_phrase_bank = None
+_cached_tts = None
+_cached_player = None
+_cached_pipeline = None
+
+# Speech sessions in progress, for stop_speaking()
+_sessions = set()
+_sessions_lock = threading.Lock()
+_playback_lock = threading.Lock()
+
+# Timings of recent speak()/speak_stream() calls (see SpeechSession.metrics)
+speech_log = deque(maxlen=50)
+
+# A sentence ends at . ! or ? followed by whitespace, unless it's an abbreviation
+_SENTENCE_END = re.compile(r"[.!?]+[\"')]*\s+")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "approx."}
+
+
+def split_sentences(fragments):
+    """
+    Regroup streamed text fragments into whole sentences.
+
+    Args:
+        fragments: Iterable of text pieces, split anywhere.
+
+    Yields:
+        Sentences as soon as their terminating punctuation has arrived.
+    """
+    buffer = ""
+    for fragment in fragments:
+        buffer += fragment
+        while True:
+            boundary = _find_sentence_end(buffer)
+            if boundary is None:
+                break
+            sentence, buffer = buffer[:boundary].strip(), buffer[boundary:]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _find_sentence_end(text):
+    """Index just past the first sentence terminator followed by whitespace, or None."""
+    for match in _SENTENCE_END.finditer(text):
+        words = text[:match.start() + 1].split()
+        if words and words[-1].lower() in _ABBREVIATIONS:
+            continue
+        return match.end()
+    return None
+
+
+class TTSBackend:
+    """A speech synthesis engine returning encoded audio (MP3 or WAV) in memory."""
+
+    name = "base"
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build the engine from the `tts` settings section."""
+        return cls()
+
+    def synthesize(self, text, voice=JARVIS_VOICE, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
+        """
+        Render text to audio.
+
+        Returns:
+            The encoded audio file contents.
+        """
+        raise NotImplementedError
+
+
+class EdgeTTSBackend(TTSBackend):
+    """Microsoft Edge neural voices through the edge_tts library."""
+
+    name = "edge"
+
+    def __init__(self, timeout=30):
+        """
+        Args:
+            timeout: Seconds to wait for one utterance.
+        """
+        self.timeout = timeout
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings):
+        return cls(timeout=settings.get("timeout", 30))
+
+    def _get_loop(self):
+        """One event loop on a daemon thread, shared by every call."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="jarvis-edge-tts",
+                                 daemon=True).start()
+        return self._loop
+
+    async def _collect(self, text, voice, rate, pitch):
+        import edge_tts
+
+        communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+        chunks = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+        return b"".join(chunks)
+
+    def synthesize(self, text, voice=JARVIS_VOICE, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
+        future = asyncio.run_coroutine_threadsafe(self._collect(text, voice, rate, pitch), self._get_loop())
+        return future.result(self.timeout)
+
+
+class StubTTSBackend(TTSBackend):
+    """Local stand-in engine: a quiet tone as long as the text would take to say (tests, offline)."""
+
+    name = "stub"
+
+    def __init__(self, seconds_per_char=0.06, delay=0.0, sample_rate=24000):
+        """
+        Args:
+            seconds_per_char: Length of the rendered audio per character.
+            delay: Simulated synthesis time per call.
+            sample_rate: Rate of the WAV produced.
+        """
+        self.seconds_per_char = seconds_per_char
+        self.delay = delay
+        self.sample_rate = sample_rate
+        self.calls = []
+
+    def synthesize(self, text, voice=JARVIS_VOICE, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
+        import io
+        import wave
+        import zlib
+        import numpy as np
+
+        self.calls.append(text)
+        if self.delay:
+            time.sleep(self.delay)
+        # A different pitch per text, so clips can be told apart
+        frequency = 200 + zlib.crc32(text.encode("utf-8")) % 400
+        t = np.arange(int(len(text) * self.seconds_per_char * self.sample_rate)) / self.sample_rate
+        samples = (np.sin(2 * np.pi * frequency * t) * 1000).astype("<i2")
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+
+TTS_BACKENDS = {
+    "edge": EdgeTTSBackend,
+    "stub": StubTTSBackend,
+}
+
+
+def get_tts_engine():
+    """Get the configured speech synthesis engine (`tts.engine`, default edge)."""
+    global _cached_tts
+    if _cached_tts is None:
+        settings = load_settings("tts")
+        name = settings.get("engine", "edge")
+        if name not in TTS_BACKENDS:
+            raise ValueError(f"Unknown TTS engine '{name}' (choose from {', '.join(TTS_BACKENDS)})")
+        _cached_tts = TTS_BACKENDS[name].from_config(settings)
+    return _cached_tts
+
+
+def get_player():
+    """Get the audio player, opening the output stream on first use."""
+    global _cached_player
+    if _cached_player is None:
+        from core.audio_output import AudioPlayer
+        _prepare_output()
+        _cached_player = AudioPlayer().start()
+    return _cached_player
+
+
+def close_player():
+    """Let queued speech finish and release the output device."""
+    global _cached_player
+    if _cached_player is not None:
+        _cached_player.close()
+        _cached_player = None
+
+
+def _synthesize(clean_text, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
+    """Render text with the TTS engine; returns the encoded audio."""
+    return get_tts_engine().synthesize(clean_text, JARVIS_VOICE, rate, pitch)
+
+
+def get_tts_cache():
+    """Get the on-disk cache of synthesized clips (None if disabled in settings)."""
+    global _cached_tts_cache
+    if _cached_tts_cache is None:
+        from core.tts_cache import TTSCache
+        _cached_tts_cache = TTSCache.from_config(load_settings("tts_cache"))
+    return _cached_tts_cache
+
+
+def get_phrase_bank():
+    """Get the bank of pre-rendered fixed phrases (None if disabled in settings)."""
+    global _cached_phrase_bank
+    if _cached_phrase_bank is None:
+        from core.phrase_bank import PhraseBank
+        _cached_phrase_bank = PhraseBank.from_config(load_settings("phrase_bank"))
+    return _cached_phrase_bank
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _render(clean_text, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
+    """
+    Get the audio for a text, from the phrase bank or TTS cache when possible.
+
+    Args:
+        clean_text: Text already passed through normalize_for_speech.
+        rate: Speech rate.
+        pitch: Voice pitch.
+
+    Returns:
+        The encoded audio.
+    """
+    from core.tts_cache import TTSCache
+
+    key = TTSCache.key_for(clean_text, JARVIS_VOICE, rate, pitch)
+    bank = get_phrase_bank()
+    if bank is not None:
+        path = bank.get(key)
+        if path is not None:
+            return _read(path)
+
+    cache = get_tts_cache()
+    if cache is None or not cache.is_cacheable(clean_text):
+        return _synthesize(clean_text, rate, pitch)
+
+    path = cache.get(key)
+    if path is not None:
+        return _read(path)
+    audio = _synthesize(clean_text, rate, pitch)
+    cache.put(key, audio)
+    return audio
 
-def _clean_text_for_speech(text):
+
+def prewarm(phrases, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
     """
-    Clean text for natural speech synthesis.
-    Removes markdown, emojis, and formats numbers/abbreviations.
+    Synthesize fixed phrases into the TTS cache ahead of time.
+
+    Args:
+        phrases: Texts JARVIS is likely to say verbatim.
+        rate: Speech rate they will be spoken at.
+        pitch: Voice pitch they will be spoken at.
+
+    Returns:
+        Number of phrases that had to be synthesized.
     """
-    # Remove markdown formatting
-    clean = text.replace("*", "").replace("#", "").replace("`", "").replace("_", " ")
+    cache = get_tts_cache()
+    if cache is None:
+        return 0
+    rendered = 0
+    for text in phrases:
+        clean_text = normalize_for_speech(text)
+        if not cache.is_cacheable(clean_text):
+            continue
+        key = cache.key_for(clean_text, JARVIS_VOICE, rate, pitch)
+        if os.path.exists(cache.file_for(key)):
+            continue
+        try:
+            audio = _synthesize(clean_text, rate, pitch)
+        except Exception:
+            continue  # Offline: the phrase is synthesized when first spoken
+        cache.put(key, audio)
+        rendered += 1
+    return rendered
+
+
+def _prepare_output():
+    """Wake the audio output once, before the output stream is opened."""
+    # Fix for Bluetooth/AirPods:
+    # Force volume to reasonable level to prevent "0 volume" issue
+    try:
+        subprocess.run(
+            ["osascript", "-e", "set volume output volume 50"],
+            capture_output=True
+        )
+    except FileNotFoundError:
+        return  # Not macOS
 
-    # Remove emojis and special characters (keep alphanumeric, spaces, punctuation)
-    clean = re.sub(r'[^\w\s,?.!\'\"\-\:\;\(\)%]', '', clean)
+    # Brief pause for Bluetooth profile switch (HFP -> A2DP)
+    time.sleep(0.15)
 
-    # Fix common abbreviations for better pronunciation
-    clean = clean.replace("vs.", "versus")
-    clean = clean.replace("etc.", "etcetera")
-    clean = clean.replace("e.g.", "for example")
-    clean = clean.replace("i.e.", "that is")
 
-    # Make percentages sound natural
-    clean = re.sub(r'(\d+)%', r'\1 percent', clean)
+def _decode(audio):
+    from core.audio_output import decode_audio
+    return decode_audio(audio, get_player().sample_rate)
 
-    # Make file sizes sound natural
-    clean = re.sub(r'(\d+\.?\d*)\s*GB', r'\1 gigabytes', clean)
-    clean = re.sub(r'(\d+\.?\d*)\s*MB', r'\1 megabytes', clean)
-    clean = re.sub(r'(\d+\.?\d*)\s*KB', r'\1 kilobytes', clean)
 
-    # Clean up multiple spaces
-    clean = re.sub(r'\s+', ' ', clean).strip()
+def _play(samples, on_start=None, session=None):
+    """Queue decoded samples on the shared player and wait until they have played (or are cancelled)."""
+    utterance = get_player().play(samples, on_start)
+    if session is not None:
+        session.utterance = utterance
+        if session.cancelled.is_set():
+            utterance.cancel()
+    utterance.wait()
 
-    return clean
 
+def _report_speech_error(error):
+    from ui.jarvis_face import Colors
 
-def _get_edge_tts_path():
-    """Get the path to edge-tts executable."""
-    path = shutil.which("edge-tts")
-    if path:
-        return path
-    # Fallback paths
-    fallbacks = [
-        "/Users/adithyasriramoju/.pyenv/versions/3.8.18/bin/edge-tts",
-        "/usr/local/bin/edge-tts",
-        os.path.expanduser("~/.local/bin/edge-tts"),
-    ]
-    for fb in fallbacks:
-        if os.path.exists(fb):
-            return fb
-    return "edge-tts"  # Hope it's in PATH
+    if isinstance(error, ImportError):
+        print(f"  {Colors.RED}[ERROR] {error.name or error} not installed. "
+              f"Install with: pip install edge-tts miniaudio{Colors.RESET}")
+    else:
+        print(f"  {Colors.RED}[ERROR] Speech error: {error}{Colors.RESET}")
+
+
+def _pipeline_settings():
+    """The `tts` settings that shape the sentence pipeline."""
+    global _cached_pipeline
+    if _cached_pipeline is None:
+        settings = load_settings("tts")
+        _cached_pipeline = {
+            "pipeline": settings.get("pipeline", True),
+            "workers": settings.get("workers", 2),
+            "lookahead": settings.get("lookahead", 2),
+        }
+    return _cached_pipeline
+
+
+class SpeechSession:
+    """One call to speak()/speak_stream(), with its timings and a cancel switch."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.finished_at = None
+        self.chunks = 0
+        self.cancelled = threading.Event()
+        self.utterance = None
+
+    def cancel(self):
+        """Barge-in: stop the clip that is playing and drop the rest."""
+        self.cancelled.set()
+        if self.utterance is not None:
+            self.utterance.cancel()
+
+    def metrics(self):
+        """Time to first audio and total wall time, in seconds."""
+        end = self.finished_at or time.perf_counter()
+        return {
+            "ttfa": self.first_audio_at - self.started_at if self.first_audio_at else None,
+            "total": end - self.started_at,
+            "chunks": self.chunks,
+            "cancelled": self.cancelled.is_set(),
+        }
+
+
+def stop_speaking():
+    """
+    Cancel everything being spoken or waiting to be spoken (barge-in).
 
+    Returns:
+        Number of speech sessions cancelled.
+    """
+    with _sessions_lock:
+        sessions = list(_sessions)
+    for session in sessions:
+        session.cancel()
+    return len(sessions)
 
-def speak(text, rate=JARVIS_RATE, pitch=JARVIS_PITCH):
+
+def _put(items, item, session):
+    """Put on a bounded queue, giving up if the session is cancelled meanwhile."""
+    while True:
+        try:
+            items.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if session.cancelled.is_set():
+                return False
+
+
+def _speak_chunks(chunks, rate, pitch, on_start=None, lookahead=2, workers=2, announce=True, session=None):
+    """
+    Synthesize chunks on a worker pool and play them in order as each is ready.
+
+    Up to `lookahead` chunks are synthesized ahead of the one playing. The
+    chunks iterable is consumed on a feeder thread, so it may block (e.g.
+    Gemini still generating). One session's chunks are never interleaved
+    with another's. Pass a SpeechSession to be able to cancel it before
+    this returns.
+
+    Returns:
+        (received text chunks, SpeechSession)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from ui.jarvis_face import Colors
+
+    session = session or SpeechSession()
+    with _sessions_lock:
+        _sessions.add(session)
+    received = []
+    ready = queue.Queue(maxsize=max(1, lookahead))
+    done = object()
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    # The feeder may still be waiting on `chunks` when playback ends; it must
+    # not submit to the pool once that has been shut down
+    pool_lock = threading.Lock()
+    pool_open = [True]
+
+    def synthesize(clean_text):
+        return _decode(_render(clean_text, rate, pitch))
+
+    def submit(clean_text):
+        with pool_lock:
+            if not pool_open[0] or session.cancelled.is_set():
+                return None
+            return pool.submit(synthesize, clean_text)
+
+    def feed():
+        try:
+            for chunk in chunks:
+                if session.cancelled.is_set():
+                    break
+                received.append(chunk)
+                clean_text = normalize_for_speech(chunk)
+                if not clean_text:
+                    continue
+                future = submit(clean_text)
+                if future is None or not _put(ready, (clean_text, future), session):
+                    break
+        except Exception as e:
+            _report_speech_error(e)
+        finally:
+            _put(ready, done, session)
+
+    def first_audio():
+        session.first_audio_at = time.perf_counter()
+        if on_start:
+            on_start()
+
+    feeder = threading.Thread(target=feed, name="jarvis-tts-feed", daemon=True)
+    feeder.start()
+    try:
+        with _playback_lock:
+            while not session.cancelled.is_set():
+                try:
+                    # Wake up now and then so a barge-in is noticed while the stream stalls
+                    item = ready.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is done:
+                    break
+                clean_text, future = item
+                try:
+                    samples = future.result()
+                except Exception as e:
+                    _report_speech_error(e)
+                    continue
+                if session.cancelled.is_set():
+                    break
+                if announce:
+                    print(f"  {Colors.GREEN}[>] Speaking: {clean_text[:60]}"
+                          f"{'...' if len(clean_text) > 60 else ''}{Colors.RESET}")
+                try:
+                    _play(samples, first_audio if session.first_audio_at is None else None, session)
+                    session.chunks += 1
+                except Exception as e:
+                    _report_speech_error(e)
+    finally:
+        session.finished_at = time.perf_counter()
+        if session.cancelled.is_set():
+            # Drop whatever was synthesized ahead
+            while True:
+                try:
+                    item = ready.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not done:
+                    item[1].cancel()
+        else:
+            feeder.join()
+        with pool_lock:
+            pool_open[0] = False
+            pool.shutdown(wait=False)
+        with _sessions_lock:
+            _sessions.discard(session)
+        speech_log.append(session.metrics())
+    return received, session
+
+
+def speak(text, rate=JARVIS_RATE, pitch=JARVIS_PITCH, on_start=None, session=None):
     """
     Speak text using JARVIS voice (Microsoft Edge TTS Neural).
 
+    Longer texts are split into sentences that are synthesized in parallel
+    and played as each becomes ready, so the first sentence is heard while
+    the rest are still being rendered. Safe to call from several threads at
+    once: each call is spoken whole, one after another.
+
     Args:
         text: The text to speak
         rate: Speech rate (e.g., "+10%", "-5%")
         pitch: Voice pitch (e.g., "+5Hz", "-10Hz")
+        on_start: Optional callback run just before audio starts playing
+        session: Optional SpeechSession to use, e.g. to cancel it from another thread
+
+    Returns:
+        The SpeechSession (timings, cancelled), or None if there was nothing to say.
     """
     from ui.jarvis_face import Colors
 
     # Clean text for speech
-    clean_text = _clean_text_for_speech(text)
+    clean_text = normalize_for_speech(text)
 
     if not clean_text:
-        return
+        return None
 
     # Display indicator
     print(f"  {Colors.GREEN}[>] Speaking: {clean_text[:60]}{'...' if len(clean_text) > 60 else ''}{Colors.RESET}")
 
-    try:
-        edge_tts_path = _get_edge_tts_path()
-        output_file = "/tmp/jarvis_response.mp3"
-
-        # Build edge-tts command with voice parameters
-        cmd = [
-            edge_tts_path,
-            "--voice", JARVIS_VOICE,
-            "--rate", rate,
-            "--pitch", pitch,
-            "--text", clean_text,
-            "--write-media", output_file
-        ]
-
-        # Generate audio
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-        # Fix for Bluetooth/AirPods:
-        # Force volume to reasonable level to prevent "0 volume" issue
-        subprocess.run(
-            ["osascript", "-e", "set volume output volume 50"],
-            capture_output=True
-        )
+    settings = _pipeline_settings()
+    chunks = [clean_text]
+    if settings["pipeline"] and not _in_phrase_bank(clean_text, rate, pitch):
+        chunks = list(split_sentences([clean_text]))
 
-        # Brief pause for Bluetooth profile switch (HFP -> A2DP)
-        time.sleep(0.15)
+    _, session = _speak_chunks(chunks, rate, pitch, on_start=on_start, lookahead=settings["lookahead"],
+                               workers=settings["workers"], announce=False, session=session)
+    return session
 
-        # Play audio using macOS native player
-        subprocess.run(["afplay", output_file], check=True)
 
-        # Brief pause after playback to let Bluetooth audio profile settle
-        # This prevents the mic from cutting off the start of the next listen
-        time.sleep(0.3)
+def _in_phrase_bank(clean_text, rate, pitch):
+    """Whether the whole text is pre-rendered (and so better played as one clip)."""
+    from core.tts_cache import TTSCache
 
-        # Clean up temp file
-        if os.path.exists(output_file):
-            os.remove(output_file)
+    bank = get_phrase_bank()
+    return bank is not None and bank.has(TTSCache.key_for(clean_text, JARVIS_VOICE, rate, pitch))
 
-    except subprocess.CalledProcessError as e:
-        print(f"  {Colors.RED}[ERROR] TTS generation failed: {e}{Colors.RESET}")
-    except FileNotFoundError:
-        print(f"  {Colors.RED}[ERROR] edge-tts not found. Install with: pip install edge-tts{Colors.RESET}")
-    except Exception as e:
-        print(f"  {Colors.RED}[ERROR] Speech error: {e}{Colors.RESET}")
+
+def speak_stream(chunks, rate=JARVIS_RATE, pitch=JARVIS_PITCH, lookahead=None, on_start=None, session=None):
+    """
+    Speak text that arrives in pieces, e.g. sentences streamed from Gemini.
+
+    Upcoming chunks are synthesized while the current one plays, so the
+    first sentence is heard before the reply is complete.
+
+    Args:
+        chunks: Iterable of text chunks (consumed on a background thread).
+        rate: Speech rate (e.g., "+10%", "-5%")
+        pitch: Voice pitch (e.g., "+5Hz", "-10Hz")
+        lookahead: Synthesized clips allowed to wait for playback
+                   (default tts.lookahead).
+        on_start: Optional callback run just before the first clip plays.
+        session: Optional SpeechSession to use, e.g. to cancel it from another thread
+
+    Returns:
+        The text that was received (all of it unless cancelled), joined with spaces.
+    """
+    settings = _pipeline_settings()
+    if lookahead is None:
+        lookahead = settings["lookahead"]
+    received, _ = _speak_chunks(chunks, rate, pitch, on_start=on_start, lookahead=lookahead,
+                                workers=settings["workers"], session=session)
+    return " ".join(received)
 
 
 def speak_urgent(text):
@@ -138,9 +608,14 @@ def speak_slow(text):
     speak(text, rate="-10%")
 
 
+# Voice settings for greetings
+GREETING_RATE = "-5%"
+GREETING_PITCH = "+2Hz"
+
+
 def speak_greeting(text):
     """Speak a greeting with warm tone."""
-    speak(text, rate="-5%", pitch="+2Hz")
+    speak(text, rate=GREETING_RATE, pitch=GREETING_PITCH)
 
 
 def play_sound(sound_name):
@@ -0,0 +1,314 @@
+"""
+JARVIS Speech Scheduler - One queue, one speaker, for everything JARVIS says.
+
+Replies, monitor alerts and reminders used to reach the speakers by
+whatever thread produced them. The monitor called speak() from its own
+thread and only held back if racy "speaking"/"listening" flags happened to
+be set. Reminders were only printed. Now every producer submits a
+SpeechRequest here, without blocking. A single consumer thread speaks them
+one at a time, most urgent first:
+
+    critical (battery about to die) > reply > reminder > chatter
+
+- Coalescing: a request whose key is already queued or being spoken is
+  merged into it (the queued one takes the newer text), so an alert that
+  fires twice is said once.
+- Deadlines: a request that could not start before its deadline is
+  dropped. "You've been working for two hours" is useless an hour later.
+- Preemption: a more urgent request cancels the one being spoken. The
+  interrupted request is queued again and said from the start afterwards.
+  Streamed replies cannot be replayed, so they are never interrupted.
+  Speech stopped from outside (a barge-in) is not said again.
+- Holding: during a conversation, hold() keeps reminders and chatter
+  queued until release(). Replies and critical alerts still play.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from core.speech_output import SpeechSession
+
+
+CRITICAL, REPLY, REMINDER, CHATTER = range(4)
+PRIORITIES = {"critical": CRITICAL, "reply": REPLY, "reminder": REMINDER, "chatter": CHATTER}
+
+# Defaults for the `speech_scheduler` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "preempt": True,
+    # Seconds a request may wait before it is dropped, by priority (null: forever)
+    "deadlines": {"critical": None, "reply": None, "reminder": 600, "chatter": 120},
+}
+
+_cached_scheduler = None
+
+
+class SpeechRequest:
+    """Something to say, waiting for, in or finished with its turn."""
+
+    def __init__(self, text, priority, key=None, deadline=None, rate=None, pitch=None,
+                 on_start=None, interruptible=True):
+        self.text = text                  # A string, or an iterable of chunks to stream
+        self.priority = priority
+        self.key = key
+        self.deadline = deadline          # time.monotonic() value, or None
+        self.rate = rate
+        self.pitch = pitch
+        self.on_start = on_start
+        self.interruptible = interruptible
+        self.state = "queued"             # speaking, spoken, expired, cancelled or failed
+        self.result = None                # What the speak function returned
+        self.session = None
+        self.preempted = 0                # Times it was interrupted and queued again
+        self.requeue = False              # Interrupted by the scheduler, to be said again
+        self.done = threading.Event()
+
+    @property
+    def streamed(self):
+        return not isinstance(self.text, str)
+
+    def expired(self, now=None):
+        return self.deadline is not None and (now or time.monotonic()) > self.deadline
+
+    def wait(self, timeout=None):
+        """
+        Block until the request has been spoken, dropped or cancelled.
+
+        Returns:
+            The final state, or None on timeout.
+        """
+        if not self.done.wait(timeout):
+            return None
+        return self.state
+
+
+class SpeechScheduler:
+    """Priority queue of speech requests drained by a single consumer thread."""
+
+    def __init__(self, speak=None, speak_stream=None, preempt=True, deadlines=None):
+        """
+        Args:
+            speak: Callable(text, rate=, pitch=, on_start=, session=), default
+                   speech_output.speak.
+            speak_stream: Same for an iterable of chunks, default
+                          speech_output.speak_stream.
+            preempt: Whether a more urgent request interrupts the current one.
+            deadlines: Default seconds a request may wait, by priority name.
+        """
+        if speak is None or speak_stream is None:
+            from core import speech_output
+            speak = speak or speech_output.speak
+            speak_stream = speak_stream or speech_output.speak_stream
+        self._speak = speak
+        self._speak_stream = speak_stream
+        self.preempt = preempt
+        merged = dict(DEFAULT_SETTINGS["deadlines"])
+        merged.update(deadlines or {})
+        self.deadlines = {PRIORITIES[name]: seconds for name, seconds in merged.items()}
+
+        self.stats = {"submitted": 0, "spoken": 0, "coalesced": 0, "expired": 0,
+                      "preempted": 0, "cancelled": 0}
+        self._queue = []                  # heap of (priority, seq, request)
+        self._keys = {}                   # key -> queued or current request
+        self._seq = itertools.count()
+        self._current = None
+        self._holds = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, settings, **kwargs):
+        """Build a scheduler from the `speech_scheduler` settings section."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        return cls(preempt=merged["preempt"], deadlines=merged["deadlines"], **kwargs)
+
+    def start(self):
+        """Start the consumer thread (idempotent)."""
+        with self._cond:
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name="jarvis-speech", daemon=True)
+                self._thread.start()
+        return self
+
+    def say(self, text, priority=REPLY, key=None, deadline=None, rate=None, pitch=None,
+            on_start=None, interruptible=None):
+        """
+        Queue something to say. Never blocks; safe from any thread.
+
+        Args:
+            text: The text, or an iterable of chunks (e.g. a Gemini stream).
+            priority: CRITICAL, REPLY, REMINDER or CHATTER (or its name).
+            key: Requests with the same key are coalesced.
+            deadline: Seconds from now after which it is not worth saying
+                      (default: per priority, see DEFAULT_SETTINGS).
+            rate: Speech rate, default JARVIS_RATE.
+            pitch: Voice pitch, default JARVIS_PITCH.
+            on_start: Optional callback run just before audio starts.
+            interruptible: Whether more urgent requests may cut it off
+                           (default: yes, unless streamed).
+
+        Returns:
+            The SpeechRequest, or the existing one it was merged into.
+        """
+        if isinstance(priority, str):
+            priority = PRIORITIES[priority]
+        if deadline is None:
+            deadline = self.deadlines.get(priority)
+        request = SpeechRequest(
+            text, priority, key=key,
+            deadline=time.monotonic() + deadline if deadline is not None else None,
+            rate=rate, pitch=pitch, on_start=on_start,
+        )
+        request.interruptible = not request.streamed if interruptible is None else interruptible
+
+        self.start()
+        with self._cond:
+            self.stats["submitted"] += 1
+            existing = self._keys.get(key) if key is not None else None
+            if existing is not None:
+                self.stats["coalesced"] += 1
+                if existing.state == "queued" and not request.streamed:
+                    existing.text = request.text
+                return existing
+
+            if key is not None:
+                self._keys[key] = request
+            heapq.heappush(self._queue, (priority, next(self._seq), request))
+            current = self._current
+            if self.preempt and current is not None and current.interruptible and priority < current.priority:
+                current.preempted += 1
+                current.requeue = True
+                self.stats["preempted"] += 1
+                current.session.cancel()
+            self._cond.notify()
+        return request
+
+    def hold(self):
+        """Keep reminders and chatter queued (e.g. while in a conversation). Nests."""
+        with self._cond:
+            self._holds += 1
+
+    def release(self):
+        """Undo one hold()."""
+        with self._cond:
+            self._holds = max(0, self._holds - 1)
+            self._cond.notify()
+
+    def pending(self):
+        """Number of requests waiting to be spoken."""
+        with self._cond:
+            return len(self._queue)
+
+    def cancel_all(self):
+        """Drop everything queued and stop the current request."""
+        with self._cond:
+            dropped = [request for _, _, request in self._queue]
+            self._queue = []
+            current = self._current
+            for request in dropped:
+                self._finish(request, "cancelled")
+            if current is not None:
+                current.state = "cancelled"  # Not queued again
+                if current.session is not None:
+                    current.session.cancel()
+        return len(dropped) + (current is not None)
+
+    def close(self, timeout=None):
+        """Speak what is already queued, then stop the consumer thread."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._closed = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+
+    # --- Consumer ---
+
+    def _next(self):
+        """Pop the next request to speak, waiting as needed; None once closed and drained."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._queue and self._queue[0][2].expired(now):
+                    self._finish(heapq.heappop(self._queue)[2], "expired")
+
+                if self._queue:
+                    priority, _, request = self._queue[0]
+                    if not self._holds or priority <= REPLY or self._closed:
+                        heapq.heappop(self._queue)
+                        request.state = "speaking"
+                        request.session = SpeechSession()
+                        self._current = request
+                        return request
+                elif self._closed:
+                    return None
+
+                deadlines = [r.deadline for _, _, r in self._queue if r.deadline is not None]
+                self._cond.wait(max(0.0, min(deadlines) - now) + 0.01 if deadlines else None)
+
+    def _finish(self, request, state):
+        """Settle a request that has left the queue (call with the lock held)."""
+        request.state = state
+        if state in self.stats:
+            self.stats[state] += 1
+        if request.key is not None and self._keys.get(request.key) is request:
+            del self._keys[request.key]
+        request.done.set()
+
+    def _run(self):
+        while True:
+            request = self._next()
+            if request is None:
+                return
+            kwargs = {"on_start": request.on_start, "session": request.session}
+            if request.rate is not None:
+                kwargs["rate"] = request.rate
+            if request.pitch is not None:
+                kwargs["pitch"] = request.pitch
+
+            state = "spoken"
+            try:
+                if request.streamed:
+                    request.result = self._speak_stream(request.text, **kwargs)
+                else:
+                    request.result = self._speak(request.text, **kwargs)
+            except Exception as e:
+                _report(e)
+                state = "failed"
+
+            with self._cond:
+                self._current = None
+                if request.requeue and request.state != "cancelled" and state != "failed":
+                    # Preempted: say it again once the urgent request is done
+                    request.state, request.session, request.requeue = "queued", None, False
+                    heapq.heappush(self._queue, (request.priority, next(self._seq), request))
+                elif request.state == "cancelled" or request.session.cancelled.is_set():
+                    # cancel_all(), or a barge-in through stop_speaking()
+                    self._finish(request, "cancelled")
+                else:
+                    self._finish(request, state)
+
+
+def _report(error):
+    from ui.jarvis_face import Colors
+    print(f"  {Colors.RED}[ERROR] Speech scheduler: {error}{Colors.RESET}")
+
+
+def get_scheduler():
+    """Get the speech scheduler, starting its consumer thread on first use."""
+    global _cached_scheduler
+    if _cached_scheduler is None:
+        from core.settings import load_settings
+        _cached_scheduler = SpeechScheduler.from_config(load_settings("speech_scheduler")).start()
+    return _cached_scheduler
+
+
+def close_scheduler(timeout=None):
+    """Finish queued speech and stop the scheduler."""
+    global _cached_scheduler
+    if _cached_scheduler is not None:
+        _cached_scheduler.close(timeout)
+        _cached_scheduler = None
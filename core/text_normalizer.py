@@ -0,0 +1,222 @@
+"""
+JARVIS Text Normalizer - Turns reply text into words the TTS engine reads well.
+
+_clean_text_for_speech used to run six str.replace calls and seven re.sub
+passes over every utterance, and it quietly deleted "$", "°" and "/" so
+"$5" was spoken as "5". All the rules now live in one table of patterns.
+The table is compiled into a single alternation and applied in one scan:
+markdown and emoji removal, abbreviations, percentages, units, currency,
+temperatures, times, ISO dates, ranges and negative numbers.
+
+Replies repeat a lot (router confirmations, monitor alerts, every sentence
+of a streamed reply that the phrase bank and TTS cache look up), so results
+are memoized.
+
+    >>> normalize_for_speech("CPU at 93% - **12.5GB** used by 14:05, sir")
+    'CPU at 93 percent - 12.5 gigabytes used by 2 oh 5 PM, sir'
+"""
+import re
+from functools import lru_cache
+
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+ABBREVIATIONS = {
+    "vs.": "versus",
+    "etc.": "etcetera",
+    "e.g.": "for example",
+    "i.e.": "that is",
+    "approx.": "approximately",
+}
+
+# Unit -> (singular, plural); matched only right after a number
+UNITS = {
+    "TB": ("terabyte", "terabytes"),
+    "GB": ("gigabyte", "gigabytes"),
+    "MB": ("megabyte", "megabytes"),
+    "KB": ("kilobyte", "kilobytes"),
+    "GHz": ("gigahertz", "gigahertz"),
+    "MHz": ("megahertz", "megahertz"),
+    "kHz": ("kilohertz", "kilohertz"),
+    "Hz": ("hertz", "hertz"),
+    "ms": ("millisecond", "milliseconds"),
+    "km/h": ("kilometre per hour", "kilometres per hour"),
+    "mph": ("mile per hour", "miles per hour"),
+    "km": ("kilometre", "kilometres"),
+    "cm": ("centimetre", "centimetres"),
+    "mm": ("millimetre", "millimetres"),
+    "kg": ("kilogram", "kilograms"),
+}
+
+# Symbol -> (major singular, major plural, minor singular, minor plural)
+CURRENCIES = {
+    "$": ("dollar", "dollars", "cent", "cents"),
+    "£": ("pound", "pounds", "penny", "pence"),
+    "€": ("euro", "euros", "cent", "cents"),
+}
+
+DEGREES = {"C": "degrees Celsius", "F": "degrees Fahrenheit", "": "degrees"}
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_UNREADABLE = r"(?:[^\w\s,.?!'\"\-:;()%$£€]|_)"
+
+# Rules in priority order, grouped by the characters they can start with.
+# Each group is tried only where its lookahead matches, which keeps the
+# scan cheap on ordinary words. Within a group, the first rule that matches
+# wins; the rule name selects the handler.
+_RULES = [
+    (r"\d", [
+        ("date", r"\b(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})\b"),
+        ("time", r"\b(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::\d{2})?(?!\d)"
+                 r"(?:\s?(?P<period>[AaPp])(?:[Mm]|\.[Mm](?:\.(?!\s*$))?)(?!\w))?"),
+        ("percent", rf"(?P<ratio>{_NUMBER})\s?%"),
+        ("degrees", rf"(?P<temperature>{_NUMBER})\s?°\s?(?P<letter>[CF]?)(?![A-Za-z])"),
+        ("unit", rf"(?P<quantity>{_NUMBER})\s?(?P<unit_name>"
+                 + "|".join(re.escape(unit) for unit in UNITS) + r")(?![A-Za-z])"),
+    ]),
+    (r"[$£€]", [
+        ("currency", rf"(?P<sign>[$£€])\s?(?P<amount>\d{{1,3}}(?:,\d{{3}})+(?:\.\d+)?|{_NUMBER})"
+                     r"(?:\s?(?P<magnitude>thousand|million|billion|trillion)\b)?"),
+        ("symbol", r"[$£€]"),
+    ]),
+    (r"[\s\-–]", [
+        ("range", r"(?<=\d)\s?[-–]\s?(?=\d)"),
+        ("minus", r"(?<![\w.])-(?=\d)"),
+    ]),
+    (r"[veia]", [
+        ("abbreviation", r"(?<![\w.])(?:" + "|".join(re.escape(a) for a in ABBREVIATIONS) + ")"),
+    ]),
+    (rf"\s|&|{_UNREADABLE}", [
+        ("ampersand", r"\s?&\s?"),
+        # Anything TTS can't read (markdown, emoji, symbols) with the
+        # whitespace around it, and whitespace other than a single space.
+        # Currency signs are left out so they can start a currency match.
+        ("gap", rf"\s*{_UNREADABLE}[\s_]*(?:{_UNREADABLE}[\s_]*)*|\s{{2,}}|[^\S ]"),
+    ]),
+]
+
+_PATTERN = re.compile("|".join(
+    f"(?=(?:{gate}))(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules) + ")"
+    for gate, rules in _RULES
+))
+_SPACES = re.compile(r"\s{2,}")
+
+
+def _plural(amount, singular, plural):
+    return singular if amount in ("1", "1.0") else plural
+
+
+def _date(match):
+    year, month, day = match.group("year", "month", "day")
+    if not 1 <= int(month) <= 12 or not 1 <= int(day) <= 31:
+        return match.group()
+    return f"{int(day)} {MONTHS[int(month) - 1]} {year}"
+
+
+def _time(match):
+    hour, minute, period = int(match.group("hour")), int(match.group("minute")), match.group("period")
+    if hour > 23 or minute > 59 or (period and not 1 <= hour <= 12):
+        return match.group()
+    if period:
+        period = period.upper() + "M"
+    elif hour > 12:
+        hour, period = hour - 12, "PM"
+    elif hour == 0:
+        hour, period = 12, "AM"
+
+    if minute == 0:
+        spoken = f"{hour} {period}" if period else f"{hour} o'clock"
+    elif minute < 10:
+        spoken = f"{hour} oh {minute}"
+    else:
+        spoken = f"{hour} {minute}"
+    return f"{spoken} {period}" if period and minute else spoken
+
+
+def _currency(match):
+    major, majors, minor, minors = CURRENCIES[match.group("sign")]
+    amount, scale = match.group("amount"), match.group("magnitude")
+    if scale:
+        return f"{amount} {scale} {majors}"
+    whole, _, fraction = amount.partition(".")
+    if len(fraction) != 2:
+        return f"{amount} {_plural(amount, major, majors)}"
+    cents = int(fraction)
+    spoken = f"{whole} {_plural(whole, major, majors)}"
+    if cents and whole == "0":
+        return f"{cents} {_plural(str(cents), minor, minors)}"
+    if cents:
+        spoken += f" and {cents} {_plural(str(cents), minor, minors)}"
+    return spoken
+
+
+def _abbreviation(match):
+    # "etc." ending the text also ended the sentence
+    spoken = ABBREVIATIONS[match.group()]
+    return spoken + "." if not match.string[match.end():].strip() else spoken
+
+
+def _unit(match):
+    quantity = match.group("quantity")
+    singular, plural = UNITS[match.group("unit_name")]
+    return f"{quantity} {_plural(quantity, singular, plural)}"
+
+
+def _gap(match):
+    # A run of removed characters still separates words if it held a space
+    for char in match.group():
+        if char.isspace() or char in "_/":
+            return " "
+    return ""
+
+
+_HANDLERS = {
+    "date": _date,
+    "time": _time,
+    "currency": _currency,
+    "percent": lambda m: f"{m.group('ratio')} percent",
+    "degrees": lambda m: f"{m.group('temperature')} {DEGREES[m.group('letter')]}",
+    "unit": _unit,
+    "range": lambda m: " to ",
+    "minus": lambda m: "minus ",
+    "abbreviation": _abbreviation,
+    "ampersand": lambda m: " and ",
+    "gap": _gap,
+    "symbol": lambda m: "",
+}
+
+
+def _replace(match):
+    return _HANDLERS[match.lastgroup](match)
+
+
+def expand(text):
+    """
+    Normalize text for speech in one scan, without memoization.
+
+    Args:
+        text: Reply text, possibly with markdown, emoji and symbols.
+
+    Returns:
+        The text as it should be spoken.
+    """
+    spoken = _PATTERN.sub(_replace, text)
+    if "  " in spoken:
+        spoken = _SPACES.sub(" ", spoken)
+    return spoken.strip()
+
+
+@lru_cache(maxsize=2048)
+def normalize_for_speech(text):
+    """
+    Normalize text for speech, memoized.
+
+    Args:
+        text: Reply text, possibly with markdown, emoji and symbols.
+
+    Returns:
+        The text as it should be spoken. See normalize_for_speech.cache_info()
+        for hit counts.
+    """
+    return expand(text)
@@ -0,0 +1,156 @@
+"""
+JARVIS TTS Cache - Content-addressed store of synthesized speech.
+
+Every call to speak() used to run edge-tts, a network round trip of several
+hundred milliseconds, even for "Yes sir?" or a greeting JARVIS has said a
+hundred times before. Rendered MP3s are now kept in data/tts_cache, named by
+a hash of everything that changes the audio: the cleaned text, the voice,
+the rate and the pitch. A repeated phrase is played straight from disk.
+
+The directory is limited to max_mb; the least recently played clips are
+evicted first (a hit touches the file's mtime, so the order survives
+restarts). Long, one-off replies are not worth keeping and are skipped.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+CACHE_DIR = "data/tts_cache"
+
+# Defaults for the `tts_cache` section of config/settings.yaml
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "path": CACHE_DIR,
+    "max_mb": 50,
+    "max_text_chars": 200,  # Longer texts are synthesized but not stored
+}
+
+
+class TTSCache:
+    """On-disk MP3 cache with LRU eviction by total size."""
+
+    def __init__(self, path=CACHE_DIR, max_mb=50, max_text_chars=200):
+        """
+        Args:
+            path: Directory holding the cached clips.
+            max_mb: Total size limit in megabytes.
+            max_text_chars: Texts longer than this are never cached.
+        """
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_text_chars = max_text_chars
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._size = 0
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a cache from the `tts_cache` settings section, or None if disabled."""
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        if not merged.pop("enabled"):
+            return None
+        return cls(**merged)
+
+    def _load(self):
+        """Index the clips already on disk, oldest first."""
+        clips = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                info = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            clips.append((info.st_mtime, name[:-4], info.st_size))
+        for _, key, size in sorted(clips):
+            self._entries[key] = size
+            self._size += size
+
+    @staticmethod
+    def key_for(clean_text, voice, rate, pitch):
+        """Cache key for a cleaned text spoken with the given voice settings."""
+        material = "\x1f".join((clean_text, voice, rate, pitch))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def file_for(self, key):
+        return os.path.join(self.path, key + ".mp3")
+
+    def is_cacheable(self, clean_text):
+        return 0 < len(clean_text) <= self.max_text_chars
+
+    def get(self, key):
+        """
+        Path of a cached clip, marking it recently used.
+
+        Returns:
+            The file path, or None on a miss.
+        """
+        path = self.file_for(key)
+        with self._lock:
+            if key in self._entries and os.path.exists(path):
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+            if key in self._entries:
+                # Deleted behind our back
+                self._size -= self._entries.pop(key)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, data):
+        """
+        Store a freshly synthesized clip.
+
+        Args:
+            key: From key_for().
+            data: The encoded audio.
+
+        Returns:
+            Path of the cached clip.
+        """
+        path = self.file_for(key)
+        partial = f"{path}.{threading.get_ident()}.part"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._size += len(data)
+            self.stats["stored"] += 1
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._size -= self._entries.pop(key)
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self.file_for(key))
+            except OSError:
+                pass
+
+    def size(self):
+        """Total bytes of cached audio."""
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
@@ -2,17 +2,47 @@
 JARVIS Voice Input - Speech recognition with microphone selection.
 Optimized for smooth command recognition after wake word.
 """
+import hashlib
+import json
+import queue
+import threading
+import time
+
 import speech_recognition as sr
 
+from core.settings import load_settings
+from core.vad import VoiceActivityDetector, listen as vad_listen
+
 # Cache the microphone to avoid repeated lookups
 _cached_mic_index = None
 _cached_recognizer = None
+_cached_vad = None
+_cached_asr = None
+_stream_partials = True
+_shared_source = None
+
+# Lowest speech threshold derived from the tracked noise floor, so a
+# near-silent room doesn't turn every click into a command
+MIN_ENERGY_THRESHOLD = 100
+
+
+def use_shared_source(source):
+    """
+    Listen through an already open sr.AudioSource, such as the wake word
+    engine's microphone stream, instead of opening the microphone each time.
+    Pass None to go back to sr.Microphone.
+    """
+    global _shared_source
+    _shared_source = source
 
 
 def get_microphone():
     """Find AirPods or MacBook Pro Microphone, or return default."""
     global _cached_mic_index
 
+    if _shared_source is not None:
+        return _shared_source
+
     if _cached_mic_index is not None:
         return sr.Microphone(device_index=_cached_mic_index)
 
@@ -55,16 +85,452 @@ def get_recognizer():
     return _cached_recognizer
 
 
-def listen_to_command(timeout=10, phrase_time_limit=15):
+def get_vad(sample_rate):
     """
-    Listen for a voice command.
+    Get the cached voice activity detector for a sample rate.
+
+    Returns:
+        VoiceActivityDetector, or None if VAD endpointing is disabled.
+    """
+    global _cached_vad
+
+    if _cached_vad is None or _cached_vad.sample_rate != sample_rate:
+        settings = load_settings("vad")
+        if not settings.get("enabled", True):
+            return None
+        _cached_vad = VoiceActivityDetector(
+            sample_rate,
+            hangover_ms=settings.get("hangover_ms", 250),
+            energy_ratio=settings.get("energy_ratio", 2.0),
+        )
+    return _cached_vad
+
+
+# --- Speech recognition backends ---
+
+class ASRBackend:
+    """A speech-to-text engine, with latency bookkeeping."""
+
+    name = "base"
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def transcribe(self, audio):
+        """
+        Transcribe one phrase.
+
+        Args:
+            audio: sr.AudioData
+
+        Returns:
+            (text, confidence) - confidence in 0..1, or None if the engine
+            doesn't report one.
+
+        Raises:
+            sr.UnknownValueError: Nothing intelligible was said.
+            sr.RequestError: The engine could not be reached or failed.
+        """
+        start = time.perf_counter()
+        self.calls += 1
+        try:
+            return self._transcribe(audio)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.total_seconds += time.perf_counter() - start
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build from the 'asr' settings section."""
+        return cls()
+
+    def stream(self, sample_rate):
+        """
+        Start a streaming session, for engines that can transcribe while
+        audio is still arriving.
+
+        Returns:
+            Object with feed(bytes) -> partial text and finish() ->
+            (text, confidence), or None if the engine only handles whole
+            phrases.
+        """
+        return None
+
+    def _transcribe(self, audio):
+        raise NotImplementedError
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+        }
+
+
+class GoogleBackend(ASRBackend):
+    """Google Web Speech API (network)."""
+
+    name = "google"
+
+    def __init__(self, language="en-US"):
+        super().__init__()
+        self.language = language
+
+    @classmethod
+    def from_config(cls, settings):
+        return cls(settings.get("language", "en-US"))
+
+    def _transcribe(self, audio):
+        return get_recognizer().recognize_google(audio, language=self.language, with_confidence=True)
+
+
+class VoskBackend(ASRBackend):
+    """Offline Kaldi recognizer; the model is loaded once, not per phrase."""
+
+    name = "vosk"
+
+    def __init__(self, model_path="models/vosk"):
+        super().__init__()
+        from vosk import Model, SetLogLevel
+
+        SetLogLevel(-1)
+        self.model = Model(model_path)
+
+    @classmethod
+    def from_config(cls, settings):
+        return cls(settings.get("vosk_model", "models/vosk"))
+
+    def _transcribe(self, audio):
+        from vosk import KaldiRecognizer
+
+        recognizer = KaldiRecognizer(self.model, 16000)
+        recognizer.SetWords(True)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+        result = json.loads(recognizer.FinalResult())
+
+        text = result.get("text", "").strip()
+        if not text:
+            raise sr.UnknownValueError()
+        words = result.get("result") or []
+        confidence = sum(word["conf"] for word in words) / len(words) if words else None
+        return text, confidence
+
+    def stream(self, sample_rate):
+        return _VoskStream(self, sample_rate)
+
+
+class _VoskStream:
+    """Incremental Kaldi decoding with partial hypotheses."""
+
+    def __init__(self, backend, sample_rate):
+        from vosk import KaldiRecognizer
+
+        self.backend = backend
+        self.recognizer = KaldiRecognizer(backend.model, sample_rate)
+        self.recognizer.SetWords(True)
+        self.segments = []   # Text of segments Kaldi has already finalized
+        self.words = []
+        self.started_at = time.perf_counter()
+
+    def feed(self, data):
+        if self.recognizer.AcceptWaveform(data):
+            self._keep(json.loads(self.recognizer.Result()))
+            return " ".join(self.segments)
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.segments + [partial]).strip()
+
+    def _keep(self, result):
+        if result.get("text"):
+            self.segments.append(result["text"])
+            self.words += result.get("result") or []
+
+    def finish(self):
+        self._keep(json.loads(self.recognizer.FinalResult()))
+        self.backend.calls += 1
+        self.backend.total_seconds += time.perf_counter() - self.started_at
+        text = " ".join(self.segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        confidence = sum(word["conf"] for word in self.words) / len(self.words) if self.words else None
+        return text, confidence
+
+
+class WhisperCppBackend(ASRBackend):
+    """Offline whisper.cpp through the pywhispercpp bindings."""
+
+    name = "whisper"
+
+    def __init__(self, model="base.en", threads=4):
+        super().__init__()
+        from pywhispercpp.model import Model
+
+        self.model = Model(model, n_threads=threads)
+
+    @classmethod
+    def from_config(cls, settings):
+        return cls(settings.get("whisper_model", "base.en"), settings.get("whisper_threads", 4))
+
+    def _transcribe(self, audio):
+        import numpy as np
+
+        pcm = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        segments = self.model.transcribe(pcm.astype(np.float32) / 32768.0)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text, None
+
+
+class StubBackend(ASRBackend):
+    """
+    Deterministic engine for tests: returns transcripts registered for the
+    exact audio with learn(), after an optional simulated delay.
+    """
+
+    name = "stub"
+
+    def __init__(self, transcripts=None, delay=0.0, confidence=1.0, script=None):
+        """
+        Args:
+            transcripts: {audio fingerprint: text}, see fingerprint().
+            delay: Seconds to sleep per call.
+            confidence: Confidence reported with every transcript.
+            script: [(seconds, partial text), ...] replayed by stream() as
+                    audio arrives; the last text is the final transcript.
+        """
+        super().__init__()
+        self.transcripts = dict(transcripts or {})
+        self.delay = delay
+        self.confidence = confidence
+        self.script = list(script or [])
+
+    @staticmethod
+    def fingerprint(audio):
+        return hashlib.sha1(audio.get_raw_data()).hexdigest()
+
+    def learn(self, audio, text):
+        self.transcripts[self.fingerprint(audio)] = text
+
+    def _transcribe(self, audio):
+        if self.delay:
+            time.sleep(self.delay)
+        text = self.transcripts.get(self.fingerprint(audio))
+        if not text:
+            raise sr.UnknownValueError()
+        return text, self.confidence
+
+    def stream(self, sample_rate):
+        return _ScriptedStream(self, sample_rate) if self.script else None
+
+
+class _ScriptedStream:
+    """Partials from StubBackend.script, timed by the amount of audio fed."""
+
+    def __init__(self, backend, sample_rate):
+        self.backend = backend
+        self.bytes_per_second = sample_rate * 2
+        self.fed = 0
+        self.text = ""
+
+    def feed(self, data):
+        self.fed += len(data)
+        for seconds, text in self.backend.script:
+            if seconds * self.bytes_per_second <= self.fed:
+                self.text = text
+        return self.text
+
+    def finish(self):
+        self.backend.calls += 1
+        if not self.text:
+            raise sr.UnknownValueError()
+        return self.backend.script[-1][1], self.backend.confidence
+
+
+class RacingBackend(ASRBackend):
+    """
+    Runs several engines in parallel and takes the first confident result,
+    e.g. a local model and Google: offline or slow networks fall back to the
+    local answer, while a low-confidence local guess waits for Google.
+    """
+
+    name = "race"
+
+    def __init__(self, backends, min_confidence=0.6, timeout=10.0):
+        """
+        Args:
+            backends: ASRBackend instances to race.
+            min_confidence: Results below this wait for the other engines.
+            timeout: Give up on engines slower than this (seconds).
+        """
+        super().__init__()
+        self.backends = list(backends)
+        self.min_confidence = min_confidence
+        self.timeout = timeout
+        self.wins = {backend.name: 0 for backend in self.backends}
+
+    def _transcribe(self, audio):
+        results = queue.Queue()
+
+        def run(backend):
+            try:
+                results.put((backend, backend.transcribe(audio)))
+            except Exception as e:
+                results.put((backend, e))
+
+        for backend in self.backends:
+            threading.Thread(target=run, args=(backend,), name=f"jarvis-asr-{backend.name}",
+                             daemon=True).start()
+
+        deadline = time.perf_counter() + self.timeout
+        best, best_backend, error = None, None, None
+        for _ in self.backends:
+            try:
+                backend, outcome = results.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if isinstance(outcome, Exception):
+                # A clear "nothing said" beats a network error as the final answer
+                if error is None or isinstance(outcome, sr.UnknownValueError):
+                    error = outcome
+                continue
+            confidence = outcome[1]
+            if confidence is None or confidence >= self.min_confidence:
+                self.wins[backend.name] += 1
+                return outcome
+            if best is None or confidence > best[1]:
+                best, best_backend = outcome, backend
+
+        if best is not None:
+            self.wins[best_backend.name] += 1
+            return best
+        raise error or sr.RequestError("no speech engine answered in time")
+
+    def stream(self, sample_rate):
+        """Partials come from the first engine that can stream."""
+        for backend in self.backends:
+            session = backend.stream(sample_rate)
+            if session is not None:
+                return session
+        return None
+
+    def stats(self):
+        stats = super().stats()
+        stats["wins"] = dict(self.wins)
+        stats["engines"] = {backend.name: backend.stats() for backend in self.backends}
+        return stats
+
+
+ASR_BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "whisper": WhisperCppBackend,
+    "stub": StubBackend,
+}
+
+
+def create_backend(name, settings=None):
+    """
+    Instantiate a registered engine.
+
+    Args:
+        name: Key in ASR_BACKENDS.
+        settings: The 'asr' settings section, for per-engine options.
+    """
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown speech engine '{name}'")
+    return ASR_BACKENDS[name].from_config(settings or {})
+
+
+def get_asr():
+    """
+    Get the configured speech engine (cached).
+
+    settings.yaml 'asr': engine picks one backend; race lists several to run
+    in parallel. Engines that fail to load (missing package or model) are
+    skipped, falling back to Google.
+    """
+    global _cached_asr, _stream_partials
+    from ui.jarvis_face import Colors
+
+    if _cached_asr is None:
+        settings = load_settings("asr")
+        _stream_partials = settings.get("streaming", True)
+        names = settings.get("race") or [settings.get("engine", "google")]
+        backends = []
+        for name in names:
+            try:
+                backends.append(create_backend(name, settings))
+            except Exception as e:
+                print(f"  {Colors.YELLOW}[ASR] {name} unavailable: {e}{Colors.RESET}")
+        if not backends:
+            backends = [GoogleBackend.from_config(settings)]
+
+        if len(backends) == 1:
+            _cached_asr = backends[0]
+        else:
+            _cached_asr = RacingBackend(backends, settings.get("min_confidence", 0.6),
+                                        settings.get("race_timeout", 10.0))
+    return _cached_asr
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word-level edit distance divided by the reference length.
+
+    Args:
+        reference: Correct transcript.
+        hypothesis: Engine output (None counts as empty).
+    """
+    ref = reference.lower().split()
+    hyp = (hypothesis or "").lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+
+def _start_partials(sample_rate, on_partial):
+    """
+    Open a streaming session on the speech engine, if it supports one.
+
+    Returns:
+        (session, on_audio) - on_audio feeds the session and passes the
+        partial transcript after every chunk to on_partial, repeats included,
+        so consumers can tell how long it has been stable - or (None, None).
+    """
+    asr = get_asr()
+    session = asr.stream(sample_rate) if _stream_partials else None
+    if session is None:
+        return None, None
+
+    def on_audio(data):
+        partial = session.feed(data)
+        if partial:
+            on_partial(partial)
+    return session, on_audio
+
+
+def capture_command(timeout=10, phrase_time_limit=15, on_partial=None):
+    """
+    Record one spoken phrase from the microphone.
 
     Args:
         timeout: How long to wait for speech to start (seconds)
         phrase_time_limit: Max duration of the phrase (seconds)
+        on_partial: Optional callable(text) for partial transcripts while the
+                    user is still speaking (streaming engines only). The
+                    final transcript is then ready when capture ends.
 
     Returns:
-        The recognized text, or None if nothing detected.
+        sr.AudioData, or None if nothing was said.
     """
     from ui.jarvis_face import Colors
 
@@ -72,29 +538,70 @@ def listen_to_command(timeout=10, phrase_time_limit=15):
 
     try:
         with get_microphone() as source:
-            # Quick ambient noise adjustment - don't make it too long
-            # or it will cut off the beginning of speech
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            # The audio bus tracks ambient noise continuously
+            noise_floor = getattr(source, "noise_floor", None)
+            if noise_floor is None:
+                # Quick ambient noise adjustment - don't make it too long
+                # or it will cut off the beginning of speech
+                recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                noise_floor = recognizer.energy_threshold / recognizer.dynamic_energy_ratio
+            else:
+                recognizer.energy_threshold = max(noise_floor * recognizer.dynamic_energy_ratio,
+                                                  MIN_ENERGY_THRESHOLD)
 
             print(f"  {Colors.CYAN}[*] Listening...{Colors.RESET}")
 
+            vad = get_vad(source.SAMPLE_RATE)
+            if vad is not None:
+                session, on_audio = None, None
+                if on_partial is not None:
+                    session, on_audio = _start_partials(source.SAMPLE_RATE, on_partial)
+                # Ends the phrase ~250 ms after speech instead of pause_threshold
+                audio = vad_listen(source, vad, timeout=timeout, phrase_time_limit=phrase_time_limit,
+                                   noise_floor=noise_floor, on_audio=on_audio)
+                if session is not None:
+                    try:
+                        audio.streamed_transcript = session.finish()
+                    except sr.UnknownValueError:
+                        pass  # recognize_audio falls back to the whole-phrase engine
+                return audio
+
             # Listen with specified timeouts
-            audio = recognizer.listen(
+            return recognizer.listen(
                 source,
                 timeout=timeout,
                 phrase_time_limit=phrase_time_limit
             )
 
-        print(f"  {Colors.DIM}[Processing speech...]{Colors.RESET}")
+    except sr.WaitTimeoutError:
+        print(f"  {Colors.DIM}[No speech detected - timeout]{Colors.RESET}")
+        return None
+    except Exception as e:
+        print(f"  {Colors.RED}[ERROR] Voice input: {e}{Colors.RESET}")
+        return None
+
+
+def recognize_audio(audio):
+    """
+    Transcribe a captured phrase.
+
+    Args:
+        audio: sr.AudioData from capture_command()
 
-        # Recognize using Google
-        command = recognizer.recognize_google(audio)
+    Returns:
+        The recognized text, or None if it could not be understood.
+    """
+    from ui.jarvis_face import Colors
+
+    print(f"  {Colors.DIM}[Processing speech...]{Colors.RESET}")
+
+    try:
+        # Streaming capture has already transcribed the phrase
+        transcript = getattr(audio, "streamed_transcript", None)
+        command, _ = transcript or get_asr().transcribe(audio)
         print(f"  {Colors.WHITE}Heard: \"{command}\"{Colors.RESET}")
         return command
 
-    except sr.WaitTimeoutError:
-        print(f"  {Colors.DIM}[No speech detected - timeout]{Colors.RESET}")
-        return None
     except sr.UnknownValueError:
         print(f"  {Colors.YELLOW}[Could not understand - please repeat]{Colors.RESET}")
         return None
@@ -106,6 +613,23 @@ def listen_to_command(timeout=10, phrase_time_limit=15):
         return None
 
 
+def listen_to_command(timeout=10, phrase_time_limit=15):
+    """
+    Listen for a voice command.
+
+    Args:
+        timeout: How long to wait for speech to start (seconds)
+        phrase_time_limit: Max duration of the phrase (seconds)
+
+    Returns:
+        The recognized text, or None if nothing detected.
+    """
+    audio = capture_command(timeout=timeout, phrase_time_limit=phrase_time_limit)
+    if audio is None:
+        return None
+    return recognize_audio(audio)
+
+
 def listen_quick(timeout=4, phrase_time_limit=8):
     """
     Quick listen for follow-up commands - shorter timeouts.
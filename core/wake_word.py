@@ -1,96 +1,305 @@
-import pvporcupine
-import struct
-import pyaudio
-import yaml
+"""
+JARVIS Wake Word - Long-lived Porcupine session sharing one microphone stream.
+
+Creating Porcupine, enumerating microphones and opening a PyAudio stream on
+every wake cycle cost noticeable time, and the teardown needed a sleep before
+speech recognition could open the microphone again. WakeWordEngine keeps the
+detector and a single audio stream alive for the whole session: frames go to
+the keyword detector while waiting, and to the command recognizer (through an
+sr.AudioSource view of the same stream) during a conversation.
+
+Audio comes from a pluggable AudioSource, so the engine can be driven from a
+WAV file in tests instead of a microphone. A capture thread (core.audio_bus)
+reads it continuously, so the recognizer can start a little in the past and
+the ambient noise level is always known.
+"""
 import time
+import wave
+
+import yaml
 import speech_recognition as sr
 
+from core.audio_bus import AudioBus
+
+
+_cached_engine = None
+
+
 def get_microphone_index():
     """Get the best available microphone index."""
     mic_names = sr.Microphone.list_microphone_names()
-    
+
     # Priority 1: AirPods
     for index, name in enumerate(mic_names):
         if "AirPods" in name:
             print(f"🎙️ Wake word using: {name} (Index {index})")
             return index
-    
+
     # Priority 2: MacBook Pro
     for index, name in enumerate(mic_names):
         if "MacBook Pro Microphone" in name:
             print(f"🎙️ Wake word using: {name} (Index {index})")
             return index
-    
+
     print("🎙️ Wake word using: default microphone")
     return None  # None means use default
 
+
+class AudioSource:
+    """Pull-based source of 16-bit mono PCM frames."""
+
+    sample_rate = 16000
+    frame_length = 512  # Samples per frame
+
+    def read(self):
+        """Return the next frame as bytes; b"" once the source is exhausted."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the underlying device or file."""
+
+
+class PyAudioSource(AudioSource):
+    """Microphone input through one PyAudio stream, kept open until close()."""
+
+    def __init__(self, sample_rate, frame_length, device_index=None):
+        import pyaudio
+
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            rate=sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=frame_length
+        )
+
+    def read(self):
+        return self._stream.read(self.frame_length, exception_on_overflow=False)
+
+    def close(self):
+        self._stream.close()
+        self._pa.terminate()
+
+
+class WavFileSource(AudioSource):
+    """Frames from a 16-bit mono WAV file, for tests and offline replay."""
+
+    def __init__(self, path, frame_length=512, realtime=False):
+        """
+        Args:
+            path: WAV file path.
+            frame_length: Samples per frame.
+            realtime: Pace reads at the file's sample rate, like a live microphone.
+        """
+        self._wav = wave.open(path, "rb")
+        if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != 2:
+            raise ValueError("WavFileSource needs 16-bit mono audio")
+        self.sample_rate = self._wav.getframerate()
+        self.frame_length = frame_length
+        self.realtime = realtime
+
+    def read(self):
+        frame = self._wav.readframes(self.frame_length)
+        if self.realtime and frame:
+            time.sleep(self.frame_length / self.sample_rate)
+        return frame
+
+    def close(self):
+        self._wav.close()
+
+
+class BusMicrophone(sr.AudioSource):
+    """
+    speech_recognition source reading from an AudioBus. Entering it costs
+    nothing - the bus is already capturing - and it starts preroll seconds
+    in the past so the first syllable is never clipped.
+
+    Over a bus fed by WavFileSource(realtime=True) it doubles as a replay
+    harness: recorded audio arrives at the pace of a live microphone.
+    """
+
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, bus, preroll=0.25, chunk=1024):
+        """
+        Args:
+            bus: Started AudioBus.
+            preroll: Seconds of audio from before the listen started to include.
+            chunk: Samples per read.
+        """
+        self.bus = bus
+        self.preroll = preroll
+        self.SAMPLE_RATE = bus.sample_rate
+        self.CHUNK = chunk
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = self.bus.reader(self.preroll)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    @property
+    def noise_floor(self):
+        """Ambient RMS tracked continuously by the audio bus."""
+        return self.bus.noise_floor
+
+
+class EngineMicrophone(BusMicrophone):
+    """
+    BusMicrophone on the wake word engine's bus, so the command recognizer
+    hears the audio right after the wake word without opening a second
+    microphone. Pre-roll never reaches back past the wake word itself.
+    """
+
+    def __init__(self, engine, preroll=0.25, chunk=1024):
+        self.engine = engine
+        super().__init__(engine.bus, preroll, chunk)
+
+    def __enter__(self):
+        self.engine.start()  # Reopens the bus if the engine was reset after an error
+        self.bus = self.engine.bus
+        super().__enter__()
+        self.stream.seek(max(self.stream.position, self.engine.stream.position))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Wake word detection resumes after what the conversation consumed
+        self.engine.resume_at = self.stream.position
+        super().__exit__(exc_type, exc_value, traceback)
+
+
+class WakeWordEngine:
+    """Keyword detector and microphone stream that live for the whole session."""
+
+    def __init__(self, access_key=None, keywords=("jarvis",), source=None, detector=None):
+        """
+        Args:
+            access_key: Picovoice access key; read from settings.yaml if omitted.
+            keywords: Porcupine built-in keywords to listen for.
+            source: AudioSource to read from; defaults to the best microphone.
+            detector: Object with process(pcm) -> keyword index (or -1),
+                      sample_rate and frame_length; defaults to Porcupine.
+        """
+        self.access_key = access_key
+        self.keywords = list(keywords)
+        self.source = source
+        self.detector = detector
+        self.bus = None
+        self.stream = None       # The detector's reader on the bus
+        self.resume_at = 0       # Bus position where the last conversation ended
+
+    def start(self):
+        """Create the detector and start capturing audio (once)."""
+        if self.detector is None:
+            import pvporcupine
+
+            access_key = self.access_key or _load_access_key()
+            if not access_key:
+                raise RuntimeError("Picovoice access key not configured")
+            # Initialize Porcupine with built-in 'jarvis' keyword
+            self.detector = pvporcupine.create(access_key=access_key, keywords=self.keywords)
+
+        if self.source is None:
+            self.source = PyAudioSource(self.detector.sample_rate, self.detector.frame_length,
+                                        get_microphone_index())
+        if self.bus is None:
+            self.bus = AudioBus(self.source)
+            self.stream = self.bus.reader()
+            self.bus.start()
+        return self
+
+    def wait(self, max_frames=None):
+        """
+        Block until a keyword is heard.
+
+        Args:
+            max_frames: Give up after this many frames (None waits forever).
+
+        Returns:
+            The detected keyword index, or None if the source ran out or
+            max_frames passed without a detection.
+        """
+        self.start()
+        # Skip audio the conversation already consumed (including JARVIS's replies)
+        self.stream.seek(max(self.stream.position, self.resume_at))
+        frame_length = self.detector.frame_length
+        frames = 0
+        while max_frames is None or frames < max_frames:
+            frame = self.stream.view(frame_length)
+            if len(frame) < frame_length:
+                if self.bus.error is not None:
+                    raise self.bus.error
+                return None
+            keyword_index = self.detector.process(frame)
+            if keyword_index >= 0:
+                return keyword_index
+            frames += 1
+        return None
+
+    def microphone(self, preroll=0.25):
+        """sr.AudioSource reading from the same bus, for listen_to_command."""
+        self.start()
+        return EngineMicrophone(self, preroll=preroll)
+
+    def close(self):
+        """Stop capturing and release the audio stream and detector."""
+        if self.bus is not None:
+            self.bus.close()
+        elif self.source is not None:
+            self.source.close()
+        self.source = self.bus = self.stream = None
+        self.resume_at = 0
+        if self.detector is not None and hasattr(self.detector, "delete"):
+            self.detector.delete()
+        self.detector = None
+
+
+def _load_access_key():
+    """Read the Picovoice key from settings.yaml, or None if it is not set."""
+    with open("config/settings.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    access_key = config.get("picovoice_access_key")
+    if not access_key or access_key == "YOUR_PICOVOICE_ACCESS_KEY_HERE":
+        return None
+    return access_key
+
+
+def get_engine():
+    """Get the shared wake word engine (created on first use)."""
+    global _cached_engine
+    if _cached_engine is None:
+        _cached_engine = WakeWordEngine()
+    return _cached_engine
+
+
 def wait_for_wake_word():
     """
     Listen for the wake word 'Jarvis' using Porcupine.
     Returns True when wake word is detected.
     """
-    porcupine = None
-    audio_stream = None
-    pa = None
-    
+    engine = get_engine()
     try:
-        # Load access key from config
-        with open("config/settings.yaml", "r") as f:
-            config = yaml.safe_load(f)
-        
-        access_key = config.get("picovoice_access_key")
-        if not access_key or access_key == "YOUR_PICOVOICE_ACCESS_KEY_HERE":
+        if engine.detector is None and not (engine.access_key or _load_access_key()):
             print("❌ Picovoice access key not configured!")
             print("📝 Please get a free key from: https://console.picovoice.ai/")
             print("📝 Then add it to config/settings.yaml")
             return False
-        
-        # Initialize Porcupine with built-in 'jarvis' keyword
-        porcupine = pvporcupine.create(
-            access_key=access_key,
-            keywords=['jarvis']
-        )
-        
-        # Get the best microphone
-        mic_index = get_microphone_index()
-        
-        # Initialize PyAudio
-        pa = pyaudio.PyAudio()
-        audio_stream = pa.open(
-            rate=porcupine.sample_rate,
-            channels=1,
-            format=pyaudio.paInt16,
-            input=True,
-            input_device_index=mic_index,
-            frames_per_buffer=porcupine.frame_length
-        )
-        
+
         print("👂 Listening for wake word 'Jarvis'...")
-        
-        while True:
-            # Read audio frame
-            pcm = audio_stream.read(porcupine.frame_length, exception_on_overflow=False)
-            pcm = struct.unpack_from("h" * porcupine.frame_length, pcm)
-            
-            # Check for wake word
-            keyword_index = porcupine.process(pcm)
-            
-            if keyword_index >= 0:
-                print("✅ Wake word detected!")
-                return True
-                
+        if engine.wait() is not None:
+            print("✅ Wake word detected!")
+            return True
+        return False
+
     except Exception as e:
         print(f"❌ Wake word error: {e}")
+        # Start from a fresh engine next time
+        engine.close()
         return False
-        
-    finally:
-        # Cleanup - release audio resources
-        if audio_stream is not None:
-            audio_stream.close()
-        if pa is not None:
-            pa.terminate()
-        if porcupine is not None:
-            porcupine.delete()
-        # Brief pause to allow audio system to fully release
-        # before voice input opens its own microphone stream
-        time.sleep(0.2)
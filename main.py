@@ -5,13 +5,25 @@ Main entry point for the Iron Man style AI assistant.
 import sys
 import time
 import signal
+import asyncio
+import threading
 
-from core.voice_input import listen_to_command
-from core.gpt_engine import ask_gpt, get_jarvis_greeting
-from core.speech_output import speak, speak_greeting, play_sound
-from core.command_router import route_command, is_shutdown_requested, reset_shutdown_flag
+from core.voice_input import capture_command, recognize_audio, use_shared_source
+from core.gpt_engine import (
+    ask_gpt, ask_gpt_stream, get_jarvis_greeting, get_prompt_builder, get_request_template, STREAM_RESPONSES
+)
+from core.speech_output import (
+    play_sound, get_tts_cache, get_phrase_bank, close_player, stop_speaking, speech_log,
+    GREETING_RATE, GREETING_PITCH
+)
+from core.speech_scheduler import get_scheduler, close_scheduler
+from core.command_router import route_command, correct_command, is_shutdown_requested, reset_shutdown_flag
+from core.intent_classifier import classify_command
 from core.context_memory import ContextMemory
-from core.wake_word import wait_for_wake_word
+from core.settings import load_settings
+from core.wake_word import wait_for_wake_word, get_engine
+from core.orchestrator import Orchestrator
+from core.speculative import SpeculativeRouter
 from ui.jarvis_face import (
     show_jarvis_boot, show_shutdown, show_wake_word_detected,
     show_command, show_response, show_listening, Colors
@@ -26,6 +38,15 @@ _running = True
 _context = None
 _dashboard = None
 _tracker = None
+_orchestrator = None
+_speculator = None
+
+# (timeout, phrase_time_limit) in seconds for commands and follow-ups
+COMMAND_LISTEN = (10, 15)
+FOLLOWUP_LISTEN = (3, 8)
+
+WAKE_REPLY = "Yes sir?"
+SHUTDOWN_REPLY = "Shutting down, sir. It has been a pleasure serving you."
 
 
 def signal_handler(sig, frame):
@@ -33,6 +54,11 @@ def signal_handler(sig, frame):
     global _running
     _running = False
     print(f"\n\n  {Colors.YELLOW}[INTERRUPT RECEIVED]{Colors.RESET}")
+    # Barge-in: stop talking now rather than finishing the reply
+    get_scheduler().cancel_all()
+    stop_speaking()
+    if _orchestrator:
+        _orchestrator.stop()
 
 
 def should_use_action_feedback(action_feedback):
@@ -73,25 +99,54 @@ def should_use_action_feedback(action_feedback):
     return any(indicator.lower() in feedback_lower for indicator in data_indicators)
 
 
-def process_command(command, context):
-    """Process a single command and return the response."""
+def process_command(command, context, stream=False):
+    """
+    Process a single command and return the response.
+
+    With stream=True, replies that need Gemini come back as a generator of
+    sentences instead of a string; the exchange is recorded once it has been
+    fully consumed (see deliver_response).
+    """
     global _dashboard
 
     show_command(command)
 
-    # Route the command
-    action_feedback = route_command(command)
+    # Route the command, unless it already started from partial transcripts
+    action_feedback = _speculator.resolve(command) if _speculator else None
+    if action_feedback is not None:
+        print(f"  {Colors.DIM}[Started before you finished speaking]{Colors.RESET}")
+    else:
+        action_feedback = route_command(command)
+
+    # A misheard local command ("open motion") is cheaper to repair than to send to Gemini
+    if "no matching action" in action_feedback:
+        corrected = correct_command(command)
+        if corrected:
+            print(f"  {Colors.DIM}[Interpreting as: \"{corrected}\"]{Colors.RESET}")
+            action_feedback = route_command(corrected)
+
+    # Paraphrases ("make it quieter") map onto a local intent without an API call
+    if "no matching action" in action_feedback:
+        paraphrased = classify_command(command)
+        if paraphrased:
+            print(f"  {Colors.DIM}[Interpreting as: \"{paraphrased}\"]{Colors.RESET}")
+            action_feedback = route_command(paraphrased)
 
     # Check for shutdown request
     if action_feedback == "SHUTDOWN_REQUESTED":
         return None  # Signal shutdown
 
-    # Determine response
-    if should_use_action_feedback(action_feedback):
-        final_reply = action_feedback
-    elif "no matching action" in action_feedback:
+    # Determine response. The no-match check comes first: its text contains
+    # "found" and "match", which should_use_action_feedback reads as file results.
+    if "no matching action" in action_feedback:
         # General conversation - use GPT with context
-        final_reply = ask_gpt(command, context_history=context.history)
+        if stream:
+            return _record_when_spoken(command, context,
+                                       ask_gpt_stream(command, context_history=context.history,
+                                                      summary=context.summary))
+        final_reply = ask_gpt(command, context_history=context.history, summary=context.summary)
+    elif should_use_action_feedback(action_feedback):
+        final_reply = action_feedback
     else:
         # For simple actions, use the router's JARVIS-style response
         final_reply = action_feedback
@@ -106,19 +161,76 @@ def process_command(command, context):
     return final_reply
 
 
-def listen_for_followup(timeout=4):
-    """
-    Listen briefly for a follow-up command without requiring wake word.
-    Returns the command if heard, None if silence.
-    """
-    print(f"  {Colors.DIM}[Listening for follow-up...]{Colors.RESET}")
+def _record_when_spoken(command, context, sentences):
+    """Pass sentences through, then save the complete reply like process_command does."""
+    spoken = []
+    for sentence in sentences:
+        spoken.append(sentence)
+        yield sentence
+
+    final_reply = " ".join(spoken)
+    context.add_exchange(command, final_reply)
+    if _dashboard:
+        _dashboard.log_command(command, final_reply)
+
+
+def deliver_response(response, on_start=None):
+    """Display and speak a reply from process_command, streamed or whole."""
+    if isinstance(response, str):
+        show_response(response)
+        get_scheduler().say(response, on_start=on_start).wait()
+        return response
+
+    # Sentences are spoken as they arrive; show the full text afterwards
+    request = get_scheduler().say(response, on_start=on_start)
+    request.wait()
+    final_reply = request.result or ""
+    show_response(final_reply)
+    return final_reply
+
+
+def capture_speech(timeout, phrase_time_limit):
+    """Capture stage: show the listening prompt, then record one phrase."""
+    if (timeout, phrase_time_limit) == FOLLOWUP_LISTEN:
+        # Follow-up commands don't require the wake word
+        print(f"  {Colors.DIM}[Listening for follow-up...]{Colors.RESET}")
+    else:
+        show_listening()
+
+    on_partial = None
+    if _speculator:
+        _speculator.reset()
+        on_partial = _speculator.update
+    return capture_command(timeout=timeout, phrase_time_limit=phrase_time_limit, on_partial=on_partial)
+
+
+def acknowledge_wake(on_start=None):
+    """Chime and "Yes sir?" after the wake word; the chime plays while the reply is synthesized."""
+    show_wake_word_detected()
+    chime = threading.Thread(target=play_sound, args=("pop",), daemon=True)
+    chime.start()
+
+    def start_speaking():
+        chime.join()
+        if on_start:
+            on_start()
+
+    get_scheduler().say(WAKE_REPLY, on_start=start_speaking).wait()
+
+
+def prerender_phrases():
+    """Render new fixed phrases into the phrase bank so they play instantly."""
+    bank = get_phrase_bank()
+    if bank is None:
+        return
     try:
-        command = listen_to_command(timeout=timeout, phrase_time_limit=8)
-        if command and len(command.strip()) > 2:
-            return command
-    except Exception:
-        pass
-    return None
+        build = bank.build()
+    except Exception as e:
+        print(f"  {Colors.YELLOW}[Phrase bank unavailable: {e}]{Colors.RESET}")
+        return
+    if build["rendered"]:
+        print(f"  {Colors.DIM}[Phrase bank: {build['rendered']} new phrases rendered "
+              f"in {build['seconds']:.1f}s]{Colors.RESET}")
 
 
 def graceful_shutdown(tracker):
@@ -133,12 +245,43 @@ def graceful_shutdown(tracker):
     if tracker:
         tracker.save()
         print(f"  {Colors.DIM}Session data saved.{Colors.RESET}")
-
-    # Stop monitoring
+    if _context is not None:
+        _context.close()
+
+    bank = get_phrase_bank()
+    if bank is not None:
+        print(f"  {Colors.DIM}Phrase bank: {bank.stats['hits']} of {bank.stats['lookups']} replies, "
+              f"{bank.stats['seconds_saved']:.1f}s of synthesis saved{Colors.RESET}")
+    first_audio = [entry["ttfa"] for entry in speech_log if entry["ttfa"] is not None]
+    if first_audio:
+        print(f"  {Colors.DIM}Speech: {len(first_audio)} replies, first audio after "
+              f"{sum(first_audio) / len(first_audio) * 1000:.0f} ms on average{Colors.RESET}")
+    prompt_stats = get_prompt_builder().stats
+    request_stats = get_request_template().stats
+    if prompt_stats["prompts"] and request_stats["requests"]:
+        print(f"  {Colors.DIM}Gemini requests: {request_stats['requests']}, "
+              f"{request_stats['bytes'] // request_stats['requests']} bytes and "
+              f"~{prompt_stats['prompt_tokens'] // prompt_stats['prompts']} tokens beyond the persona "
+              f"on average (max {prompt_stats['max_prompt_tokens']}), {prompt_stats['dropped']} "
+              f"irrelevant turns or facts left out{Colors.RESET}")
+    scheduler = get_scheduler()
+    print(f"  {Colors.DIM}Speech queue: {scheduler.stats['spoken']} spoken, "
+          f"{scheduler.stats['coalesced']} coalesced, {scheduler.stats['expired']} expired, "
+          f"{scheduler.stats['preempted']} preempted{Colors.RESET}")
+    tts_cache = get_tts_cache()
+    if tts_cache is not None:
+        print(f"  {Colors.DIM}Voice cache: {tts_cache.stats['hits']} hits, "
+              f"{tts_cache.stats['misses']} misses ({tts_cache.hit_rate():.0%}){Colors.RESET}")
+
+    # Stop monitoring and release the microphone
     stop_monitoring()
+    use_shared_source(None)
+    get_engine().close()
 
-    # Speak goodbye
-    speak("Shutting down, sir. It has been a pleasure serving you.")
+    # Speak goodbye after anything still queued
+    scheduler.say(SHUTDOWN_REPLY)
+    close_scheduler(timeout=10)
+    close_player()
 
     time.sleep(1)
     sys.exit(0)
@@ -146,102 +289,59 @@ def graceful_shutdown(tracker):
 
 def main():
     """Main JARVIS entry point."""
-    global _running, _context, _dashboard, _tracker
+    global _running, _context, _dashboard, _tracker, _orchestrator, _speculator
 
     # Set up signal handler for Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
 
     # Initialize components
-    _context = ContextMemory(max_turns=10)
+    _context = ContextMemory.from_config(load_settings("context_memory"))
     _dashboard = JarvisDashboard()
     _tracker = ProductivityTracker()
+    _speculator = SpeculativeRouter()
 
     # Cinematic boot sequence
     show_jarvis_boot()
+    if _context.history:
+        print(f"  {Colors.DIM}[Resuming conversation: {len(_context.history)} recent exchanges]{Colors.RESET}")
 
-    # Start background monitor with speech callback
-    monitor = start_monitoring(speak_callback=speak)
+    # Start background monitor; its alerts go through the speech queue
+    monitor = start_monitoring(scheduler=get_scheduler())
 
     # Speak boot greeting
     greeting = get_jarvis_greeting()
-    speak_greeting(greeting)
+    get_scheduler().say(greeting, rate=GREETING_RATE, pitch=GREETING_PITCH).wait()
+
+    # Render any new fixed phrases in the background; the bank survives restarts
+    threading.Thread(target=prerender_phrases, name="jarvis-phrase-bank", daemon=True).start()
+
+    # One microphone stream, opened once, feeds both wake word detection
+    # and command recognition
+    try:
+        use_shared_source(get_engine().start().microphone())
+    except Exception as e:
+        print(f"  {Colors.YELLOW}[Wake word engine unavailable: {e}]{Colors.RESET}")
 
     print(f"\n  {Colors.DIM}Awaiting wake word 'Jarvis'...{Colors.RESET}\n")
 
-    while _running:
-        try:
-            # Tick productivity tracker
-            _tracker.tick()
-
-            # Wait for wake word
-            if wait_for_wake_word():
-                # Mark monitor as busy
-                monitor.set_listening(True)
-
-                show_wake_word_detected()
-                play_sound("pop")
-
-                # Brief pause for mic reset after wake word detection
-                time.sleep(0.5)
-                speak("Yes sir?")
-                # Allow TTS to fully complete and mic to reset before listening
-                time.sleep(1.2)
-
-                # Continuous conversation loop
-                conversation_active = True
-                while conversation_active and _running:
-                    show_listening()
-
-                    # Listen for command
-                    command = listen_to_command()
-
-                    if command:
-                        # Process the command
-                        monitor.set_speaking(True)
-                        response = process_command(command, _context)
-                        monitor.set_speaking(False)
-
-                        # Check for shutdown
-                        if response is None:
-                            graceful_shutdown(_tracker)
-
-                        # Speak response
-                        show_response(response)
-                        speak(response)
-
-                        # Allow TTS to fully complete before listening for follow-up
-                        time.sleep(1.0)
-
-                        # Check for follow-up (no wake word needed)
-                        followup = listen_for_followup(timeout=3)
-                        if followup:
-                            # Process follow-up
-                            monitor.set_speaking(True)
-                            response = process_command(followup, _context)
-                            monitor.set_speaking(False)
-
-                            if response is None:
-                                graceful_shutdown(_tracker)
-
-                            show_response(response)
-                            speak(response)
-                        else:
-                            # No follow-up, exit conversation mode
-                            conversation_active = False
-                    else:
-                        # Didn't hear anything
-                        print(f"  {Colors.DIM}[No command detected]{Colors.RESET}")
-                        conversation_active = False
-
-                # Resume monitoring
-                monitor.set_listening(False)
-                print(f"\n  {Colors.DIM}Awaiting wake word 'Jarvis'...{Colors.RESET}\n")
-
-        except KeyboardInterrupt:
-            graceful_shutdown(_tracker)
-        except Exception as e:
-            print(f"  {Colors.RED}[ERROR] {e}{Colors.RESET}")
-            time.sleep(1)
+    _orchestrator = Orchestrator(
+        wait_for_wake=wait_for_wake_word,
+        capture=capture_speech,
+        recognize=recognize_audio,
+        process=lambda command: process_command(command, _context, stream=STREAM_RESPONSES),
+        deliver=deliver_response,
+        acknowledge=acknowledge_wake,
+        monitor=monitor,
+        scheduler=get_scheduler(),
+        tick=_tracker.tick,
+        command_listen=COMMAND_LISTEN,
+        followup_listen=FOLLOWUP_LISTEN,
+    )
+
+    try:
+        asyncio.run(_orchestrator.run())
+    except KeyboardInterrupt:
+        pass
 
     # Clean shutdown
     graceful_shutdown(_tracker)
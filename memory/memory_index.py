@@ -0,0 +1,240 @@
+"""
+JARVIS Memory Index - Similarity search over remembered facts.
+
+recall() can only find a fact under the exact key it was stored with, so
+"what did I tell you about my car" misses "the car is an Audi R8". Each
+fact ("key value") is embedded here with the offline hashed n-gram
+vectorizer from core.embeddings, after dropping filler words. The
+embeddings are unit rows of a float32 matrix, memory-mapped from
+memory/index/vectors.f32. A query is one matrix-vector product plus a
+partial sort for the top k.
+
+The index is updated a row at a time as facts are remembered. Row
+assignments are appended to rows.log as [row, key, checksum of the
+embedded text]. A changed fact overwrites its own row in place. The index
+can always be rebuilt from the memory store: sync() re-embeds any fact
+whose checksum does not match and frees rows of facts that are gone. This
+covers a crash between the two writes and a change of vectorizer settings.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+
+INDEX_DIR = "memory/index"
+
+# Words that say nothing about which fact is meant
+_FILLER = re.compile(r"\b(?:my|the|a|an|of|about|is|are|was|i|me|you|your|to|that|what|did|tell)\b")
+
+
+def strip_filler(text):
+    """Lowercase text without the words that say nothing about its topic."""
+    return _FILLER.sub(" ", text.lower())
+
+
+def fact_text(key, value):
+    """The text a fact is embedded as."""
+    return strip_filler(f"{key} {value}")
+
+
+class MemoryIndex:
+    """Memory-mapped matrix of fact embeddings with incremental updates."""
+
+    def __init__(self, path=INDEX_DIR, dim=256, min_capacity=1024):
+        """
+        Args:
+            path: Directory holding vectors.f32, rows.log and meta.json.
+            dim: Embedding size (a power of two).
+            min_capacity: Rows allocated up front; the file doubles when full.
+        """
+        from core.embeddings import HashedNgramVectorizer
+
+        self.path = path
+        self.dim = dim
+        self.vectorizer = HashedNgramVectorizer(dim=dim)
+        self.vectors_file = os.path.join(path, "vectors.f32")
+        self.rows_file = os.path.join(path, "rows.log")
+        self.meta_file = os.path.join(path, "meta.json")
+        self._lock = threading.Lock()
+        self._rows = {}       # key -> (row, checksum)
+        self._owners = []     # row -> key, None for a free row
+        self._free = []       # Rows of forgotten facts, reused first
+        self._log_lines = 0
+        os.makedirs(path, exist_ok=True)
+
+        meta = {"dim": dim, "word_ngrams": list(self.vectorizer.word_ngrams),
+                "char_ngrams": list(self.vectorizer.char_ngrams)}
+        if self._read_meta() != meta:
+            # New index, or one embedded with other settings: start over
+            for name in (self.vectors_file, self.rows_file):
+                if os.path.exists(name):
+                    os.remove(name)
+            with open(self.meta_file, "w") as f:
+                json.dump(meta, f)
+        torn = self._replay()
+        if torn:
+            self._write_log()
+        capacity = max(min_capacity, len(self._owners))
+        if os.path.exists(self.vectors_file):
+            capacity = max(capacity, os.path.getsize(self.vectors_file) // (dim * 4))
+        self._map(capacity)
+        self._log = open(self.rows_file, "a")
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_file, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _replay(self):
+        """Rebuild the row assignments; returns True if the log ended in a torn line."""
+        if not os.path.exists(self.rows_file):
+            return False
+        torn = False
+        with open(self.rows_file, "r") as f:
+            for line in f:
+                try:
+                    row, key, checksum = json.loads(line)
+                except ValueError:
+                    torn = True  # sync() re-embeds whatever it described
+                    break
+                self._log_lines += 1
+                if row >= len(self._owners):
+                    self._owners.extend([None] * (row + 1 - len(self._owners)))
+                previous = self._owners[row]
+                if previous is not None and self._rows.get(previous, (None,))[0] == row:
+                    del self._rows[previous]
+                self._owners[row] = key
+                if key is not None:
+                    self._rows[key] = (row, checksum)
+        self._free = [row for row, key in enumerate(self._owners) if key is None]
+        return torn
+
+    def _map(self, capacity):
+        """(Re)open the vectors file with room for `capacity` rows."""
+        size = capacity * self.dim * 4
+        with open(self.vectors_file, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._matrix = np.memmap(self.vectors_file, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self):
+        return len(self._rows)
+
+    # --- Updates ---
+
+    def add(self, key, value):
+        """Embed one fact, replacing its previous embedding."""
+        text = fact_text(key, value)
+        checksum = zlib.crc32(text.encode("utf-8"))
+        with self._lock:
+            if self._rows.get(key, (None, None))[1] == checksum:
+                return
+            vector = self.vectorizer.transform_one(text)
+            if key in self._rows:
+                row = self._rows[key][0]
+            elif self._free:
+                row = self._free.pop()
+            else:
+                row = len(self._owners)
+                self._owners.append(None)
+                if row >= len(self._matrix):
+                    self._matrix.flush()
+                    self._map(len(self._matrix) * 2)
+            self._matrix[row] = vector
+            self._rows[key] = (row, checksum)
+            self._owners[row] = key
+            self._write_row(row, key, checksum)
+
+    def remove(self, key):
+        """Drop a fact from the index."""
+        with self._lock:
+            entry = self._rows.pop(key, None)
+            if entry is None:
+                return
+            self._matrix[entry[0]] = 0
+            self._owners[entry[0]] = None
+            self._free.append(entry[0])
+            self._write_row(entry[0], None, 0)
+
+    def _write_row(self, row, key, checksum):
+        self._log.write(json.dumps([row, key, checksum]) + "\n")
+        self._log.flush()
+        self._log_lines += 1
+        if self._log_lines > 1000 and self._log_lines > 2 * len(self._rows):
+            self._log.close()
+            self._write_log()
+            self._log = open(self.rows_file, "a")
+
+    def _write_log(self):
+        """Rewrite rows.log with one line per indexed fact."""
+        temp = self.rows_file + ".tmp"
+        with open(temp, "w") as f:
+            for key, (row, checksum) in self._rows.items():
+                f.write(json.dumps([row, key, checksum]) + "\n")
+        os.replace(temp, self.rows_file)
+        self._log_lines = len(self._rows)
+
+    def sync(self, facts):
+        """
+        Bring the index in line with the stored facts.
+
+        Args:
+            facts: Dict of every remembered key -> value.
+
+        Returns:
+            Number of facts embedded or removed.
+        """
+        changed = 0
+        for key in [key for key in self._rows if key not in facts]:
+            self.remove(key)
+            changed += 1
+        for key, value in facts.items():
+            checksum = zlib.crc32(fact_text(key, value).encode("utf-8"))
+            if self._rows.get(key, (None, None))[1] != checksum:
+                self.add(key, value)
+                changed += 1
+        self._matrix.flush()
+        return changed
+
+    # --- Queries ---
+
+    def search(self, query, k=3, min_score=0.0):
+        """
+        Facts most similar to a query.
+
+        Args:
+            query: Free text, e.g. "my car".
+            k: Number of results.
+            min_score: Cosine similarity below which results are dropped.
+
+        Returns:
+            List of (key, score), best first.
+        """
+        vector = self.vectorizer.transform_one(fact_text(query, ""))
+        with self._lock:
+            owners = self._owners  # Only ever appended to or updated in place
+            rows = len(owners)
+            matrix = self._matrix[:rows]
+        if not rows or not vector.any():
+            return []
+        scores = matrix @ vector
+        k = min(k, rows)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for row in top:
+            key = owners[row]
+            if key is not None and scores[row] >= min_score:
+                results.append((key, float(scores[row])))
+        return results
+
+    def close(self):
+        with self._lock:
+            self._matrix.flush()
+            self._log.close()
@@ -1,33 +1,63 @@
-import json
-import os
+import threading
 
-MEMORY_FILE = "memory/user_profile.json"
+from memory.memory_store import MemoryStore, LOG_FILE, LEGACY_FILE
+
+MEMORY_FILE = LEGACY_FILE  # Imported into LOG_FILE on first use
+
+# Cosine similarity a fact needs to answer a recall() with a different key
+RECALL_MIN_SCORE = 0.35
+
+_cached_store = None
+_cached_index = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Get the memory store, replaying its log on first use."""
+    global _cached_store
+    with _store_lock:
+        if _cached_store is None:
+            _cached_store = MemoryStore(LOG_FILE, legacy_path=MEMORY_FILE)
+    return _cached_store
+
+def get_index():
+    """Get the similarity index over remembered facts, synced with the store on first use."""
+    global _cached_index
+    store = get_store()
+    with _store_lock:
+        if _cached_index is None:
+            from memory.memory_index import MemoryIndex
+            _cached_index = MemoryIndex()
+            _cached_index.sync(store.snapshot())
+    return _cached_index
 
 def load_memory():
-    if not os.path.exists(MEMORY_FILE):
-        return {}
-    try:
-        with open(MEMORY_FILE, "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {}
+    return get_store().snapshot()
 
 def save_memory_to_file(memory_data):
-    os.makedirs(os.path.dirname(MEMORY_FILE), exist_ok=True)
-    with open(MEMORY_FILE, "w") as f:
-        json.dump(memory_data, f, indent=4)
+    get_store().replace(memory_data)
+    get_index().sync(memory_data)
 
 def remember(key, value):
     """Save a piece of information to memory."""
-    memory = load_memory()
-    memory[key] = value
-    save_memory_to_file(memory)
+    get_store().set(key, value)
+    get_index().add(key, value)
     return f"I've remembered that {key} is {value}."
 
+def search_memory(query, k=3):
+    """Facts most similar to a query, as (key, value, score) tuples, best first."""
+    store = get_store()
+    return [(key, store.get(key), score) for key, score in get_index().search(query, k)
+            if key in store]
+
 def recall(key):
     """Retrieve a piece of information from memory."""
-    memory = load_memory()
-    value = memory.get(key)
+    value = get_store().get(key)
+    if not value:
+        # "my car" finds a fact stored as "the car"
+        for match, match_value, score in search_memory(key, k=1):
+            if score >= RECALL_MIN_SCORE and match_value:
+                key, value = match, match_value
     if value:
         return f"You told me that {key} is {value}."
     else:
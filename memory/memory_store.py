@@ -0,0 +1,262 @@
+"""
+JARVIS Memory Store - Key-value storage engine behind memory_manager.
+
+remember() used to load the whole user_profile.json, change one key and
+rewrite the file, indented, every time. recall() parsed the full file on
+every lookup. A crash halfway through a rewrite left a truncated file,
+which load_memory() quietly read as "no memories at all".
+
+Facts now live in a dict in memory. Lookups touch no file. Each change is
+appended to memory/user_profile.log as one checksummed JSON line, then
+flushed and fsync'd before remember() returns:
+
+    b3b21820 {"k":"my favorite color","v":"blue"}
+    f58eb1a0 {"k":"note","d":1}
+
+Opening the store replays the log. A torn last line (a crash mid-append)
+is detected by its checksum and cut off. A damaged line anywhere else is
+skipped and counted, and the records after it are still replayed. The
+store is then rewritten from what was read, and the original log is kept
+aside, never silently discarded. Superseded
+records are dropped by compaction once they outnumber the live keys. The
+compacted log is written to a temp file, fsync'd and swapped in with
+os.replace, so a crash leaves either the old log or the new one.
+
+An existing user_profile.json is imported the first time the store is
+opened. The JSON file itself is left in place as a backup.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+
+
+LOG_FILE = "memory/user_profile.log"
+LEGACY_FILE = "memory/user_profile.json"
+
+
+def _encode(record):
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line):
+    """The record on a log line, or None if the line is damaged."""
+    if len(line) < 10 or line[8:9] != b" " or not line.endswith(b"\n"):
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        record = json.loads(payload.decode("utf-8"))
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and "k" in record else None
+
+
+def _fsync_dir(path):
+    """Make a rename in this directory durable (not possible on every platform)."""
+    try:
+        fd = os.open(path or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class MemoryStore:
+    """Dict-backed store with an fsync'd append-only log and compaction."""
+
+    def __init__(self, path=LOG_FILE, legacy_path=LEGACY_FILE, fsync=True, min_compact=1000):
+        """
+        Args:
+            path: The log file.
+            legacy_path: JSON profile to import if the log does not exist yet.
+            fsync: Flush every write to disk before returning.
+            min_compact: Compaction waits until the log holds at least this
+                         many records and twice as many as there are keys.
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.fsync = fsync
+        self.min_compact = min_compact
+        self.stats = {"records": 0, "appends": 0, "compactions": 0, "recovered_bytes": 0,
+                      "damaged_lines": 0, "load_seconds": 0.0}
+        self._data = {}
+        self.version = 0  # Bumped on every change, so readers can tell their copy is stale
+        self._lock = threading.RLock()
+        self._file = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    # --- Opening ---
+
+    def _open(self):
+        start = time.perf_counter()
+        if os.path.exists(self.path):
+            self._replay()
+        else:
+            self._migrate()
+        self._file = open(self.path, "ab")
+        self.stats["load_seconds"] = time.perf_counter() - start
+        self._maybe_compact()
+
+    def _replay(self):
+        with open(self.path, "rb") as f:
+            content = f.read()
+
+        offset, records, damaged, torn = 0, 0, 0, 0
+        while offset < len(content):
+            end = content.find(b"\n", offset)
+            line = content[offset:] if end < 0 else content[offset:end + 1]
+            offset += len(line)
+            record = _decode(line)
+            if record is None:
+                if offset == len(content):
+                    torn = len(line)  # The last line: a write interrupted by a crash
+                else:
+                    damaged += 1
+                continue
+            self._apply(record)
+            records += 1
+
+        self.stats["recovered_bytes"] = torn
+        self.stats["damaged_lines"] = damaged
+        if damaged:
+            kept = f"{self.path}.damaged-{int(time.time())}"
+            os.replace(self.path, kept)
+            self._write_compacted()
+            _warn(f"Memory log had {damaged} damaged line(s), skipped; kept {len(self._data)} facts, "
+                  f"original saved as {kept}")
+            records = len(self._data)
+        elif torn:
+            with open(self.path, "r+b") as f:
+                f.truncate(len(content) - torn)
+                f.flush()
+                os.fsync(f.fileno())
+        self.stats["records"] = records
+
+    def _migrate(self):
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            self._write_compacted()
+            return
+        try:
+            with open(self.legacy_path, "r") as f:
+                legacy = json.load(f)
+            if not isinstance(legacy, dict):
+                raise ValueError("not a JSON object")
+        except ValueError as e:
+            damaged = f"{self.legacy_path}.damaged-{int(time.time())}"
+            os.replace(self.legacy_path, damaged)
+            _warn(f"Could not import {self.legacy_path} ({e}); saved as {damaged}")
+            legacy = {}
+        self._data = dict(legacy)
+        self._write_compacted()
+
+    def _apply(self, record):
+        if record.get("d"):
+            self._data.pop(record["k"], None)
+        else:
+            self._data[record["k"]] = record.get("v")
+
+    # --- Reads ---
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def snapshot(self):
+        """A copy of every fact, as a dict."""
+        with self._lock:
+            return dict(self._data)
+
+    # --- Writes ---
+
+    def set(self, key, value):
+        """Store one fact; durable when this returns."""
+        self.update({key: value})
+
+    def update(self, facts):
+        """Store several facts with a single write and fsync."""
+        self._append([{"k": key, "v": value} for key, value in facts.items()])
+
+    def delete(self, key):
+        """Forget a fact. Returns whether it existed."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._append([{"k": key, "d": 1}])
+            return True
+
+    def replace(self, facts):
+        """Make the store hold exactly these facts (one compacted rewrite)."""
+        with self._lock:
+            self._data = dict(facts)
+            self.version += 1
+            self._file.close()
+            self._write_compacted()
+            self._file = open(self.path, "ab")
+
+    def _append(self, records):
+        if not records:
+            return
+        data = b"".join(_encode(record) for record in records)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            for record in records:
+                self._apply(record)
+            self.version += 1
+            self.stats["records"] += len(records)
+            self.stats["appends"] += 1
+            self._maybe_compact()
+
+    # --- Compaction ---
+
+    def _maybe_compact(self):
+        records = self.stats["records"]
+        if records >= self.min_compact and records > 2 * len(self._data):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with one record per live fact."""
+        with self._lock:
+            self._file.close()
+            self._write_compacted()
+            self._file = open(self.path, "ab")
+            self.stats["compactions"] += 1
+
+    def _write_compacted(self):
+        temp = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(b"".join(_encode({"k": key, "v": value}) for key, value in self._data.items()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        _fsync_dir(os.path.dirname(self.path))
+        self.stats["records"] = len(self._data)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _warn(message):
+    from ui.jarvis_face import Colors
+    print(f"  {Colors.YELLOW}[MEMORY] {message}{Colors.RESET}")
@@ -8,21 +8,32 @@ import psutil
 from datetime import datetime, timedelta
 
 
+# Speech priority of each alert (see core.speech_scheduler); others are reminders
+ALERT_PRIORITIES = {
+    "battery_critical": "critical",
+    "work_session": "chatter",
+    "late_night": "chatter",
+}
+
+
 class JarvisMonitor:
     """
     Background monitor that runs periodic system checks and triggers
     alerts via a speech callback when something needs attention.
     """
 
-    def __init__(self, speak_callback=None):
+    def __init__(self, speak_callback=None, scheduler=None):
         """
         Initialize the monitor.
 
         Args:
             speak_callback: Function to call when JARVIS needs to speak an alert.
                            Should accept a single string argument.
+            scheduler: SpeechScheduler to queue alerts on instead; it decides
+                       when they can be spoken.
         """
         self.speak_callback = speak_callback
+        self.scheduler = scheduler
         self._running = False
         self._thread = None
         self._last_alerts = {}  # Track when alerts were last triggered
@@ -59,6 +70,15 @@ class JarvisMonitor:
         if not self._can_alert(alert_type):
             return
 
+        if self.scheduler:
+            # Queued by priority; held back during conversations, coalesced
+            # with the same alert if it is still waiting
+            self._last_alerts[alert_type] = datetime.now()
+            print(f"\n  [JARVIS ALERT] {message}")
+            kind = alert_type.rsplit("_", 1)[0] if alert_type.startswith("work_session") else alert_type
+            self.scheduler.say(message, priority=ALERT_PRIORITIES.get(kind, "reminder"), key=kind)
+            return
+
         # Don't interrupt if JARVIS is speaking or listening
         if self._is_speaking or self._is_listening:
             return
@@ -209,10 +229,11 @@ def get_monitor():
     return _monitor_instance
 
 
-def start_monitoring(speak_callback=None):
-    """Start the global monitor with the given speech callback."""
+def start_monitoring(speak_callback=None, scheduler=None):
+    """Start the global monitor with the given speech callback or scheduler."""
     monitor = get_monitor()
     monitor.speak_callback = speak_callback
+    monitor.scheduler = scheduler
     monitor.start()
     return monitor
 
@@ -2,6 +2,8 @@
 Setup script for building JARVIS as a macOS application.
 Usage: python setup.py py2app
 """
+import glob
+
 from setuptools import setup
 
 APP = ['jarvis_app.py']
@@ -15,6 +17,8 @@ DATA_FILES = [
         'behaviors/code_session.xml',
         'behaviors/job_search.xml',
     ]),
+    # Pre-rendered phrases, if build_app.sh could build them
+    ('data/phrase_bank', glob.glob('data/phrase_bank/*.mp3') + glob.glob('data/phrase_bank/index.json')),
 ]
 
 OPTIONS = {
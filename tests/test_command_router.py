@@ -1,10 +1,20 @@
 """Tests for command_router.py - verifies routing logic."""
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
 
 class TestCommandRouter(unittest.TestCase):
 
+    def patch_handler(self, intent_name):
+        """Replace the handler registered for an intent with a mock, for this test."""
+        from core.command_router import router
+        intent = next(intent for intent in router.intents if intent.name == intent_name)
+        patcher = patch.object(intent, "handler")
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
     @patch('core.command_router.open_app')
     def test_open_chrome(self, mock_open):
         from core.command_router import route_command
@@ -19,15 +29,15 @@ class TestCommandRouter(unittest.TestCase):
         mock_open.assert_called_with("Visual Studio Code")
         self.assertIn("Visual Studio Code", result)
 
-    @patch('core.command_router.mute_system')
-    def test_mute(self, mock_mute):
+    def test_mute(self):
+        mock_mute = self.patch_handler("mute")
         from core.command_router import route_command
         result = route_command("mute")
         mock_mute.assert_called_once()
         self.assertIn("muted", result)
 
-    @patch('core.command_router.unmute_system')
-    def test_unmute(self, mock_unmute):
+    def test_unmute(self):
+        mock_unmute = self.patch_handler("unmute")
         from core.command_router import route_command
         result = route_command("unmute")
         mock_unmute.assert_called_once()
@@ -40,6 +50,14 @@ class TestCommandRouter(unittest.TestCase):
         mock_vol.assert_called_with(75)
         self.assertIn("75", result)
 
+    @patch('core.command_router.change_volume')
+    def test_volume_steps_are_relative(self, mock_change):
+        from core.command_router import route_command, VOLUME_STEP
+        self.assertIn("up", route_command("volume up"))
+        mock_change.assert_called_with(VOLUME_STEP)
+        self.assertIn("down", route_command("volume down"))
+        mock_change.assert_called_with(-VOLUME_STEP)
+
     @patch('core.command_router.get_weather')
     def test_weather(self, mock_weather):
         mock_weather.return_value = "Sunny, temperature 72F"
@@ -48,12 +66,30 @@ class TestCommandRouter(unittest.TestCase):
         mock_weather.assert_called_once()
         self.assertIn("72", result)
 
+    def use_temp_memory(self):
+        """Point memory_manager at a throwaway store and index instead of memory/."""
+        from memory import memory_manager
+        from memory.memory_index import MemoryIndex
+        from memory.memory_store import MemoryStore
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = MemoryStore(os.path.join(directory.name, "profile.log"), legacy_path=None)
+        index = MemoryIndex(os.path.join(directory.name, "index"))
+        self.addCleanup(store.close)
+        self.addCleanup(index.close)
+        for p in (patch.object(memory_manager, "_cached_store", store),
+                  patch.object(memory_manager, "_cached_index", index)):
+            p.start()
+            self.addCleanup(p.stop)
+
     def test_remember(self):
+        self.use_temp_memory()
         from core.command_router import route_command
         result = route_command("remember that my favorite color is blue")
         self.assertTrue("remember" in result.lower() or "noted" in result.lower())
 
     def test_recall(self):
+        self.use_temp_memory()
         from core.command_router import route_command
         # First remember something
         route_command("remember that my favorite color is blue")
@@ -104,13 +140,257 @@ class TestCommandRouter(unittest.TestCase):
         result = route_command("open youtube")
         mock_yt.assert_called_once()
 
-    @patch('core.command_router.open_github')
-    def test_open_github(self, mock_gh):
-        mock_gh.return_value = "Opening GitHub."
+    def test_open_github(self):
+        mock_gh = self.patch_handler("open_github")
         from core.command_router import route_command
         result = route_command("open github")
         mock_gh.assert_called_once()
 
 
+class TestIntentMatcher(unittest.TestCase):
+
+    def test_automaton_finds_overlapping_phrases(self):
+        from core.intent_matcher import PhraseAutomaton
+        automaton = PhraseAutomaton(["mute", "unmute", "ute", "he"])
+        self.assertEqual(automaton.find("please unmute"), {0, 1, 2})
+        self.assertEqual(automaton.find("ushers"), {3})
+        self.assertEqual(automaton.find("nothing"), set())
+
+    def test_precedence_follows_table_order(self):
+        from core.command_router import match_intent
+        self.assertEqual(match_intent("unmute").name, "unmute")
+        self.assertEqual(match_intent("mute the volume").name, "mute")
+        self.assertEqual(match_intent("open vs code").name, "open_vscode")
+        self.assertEqual(match_intent("forget what i said about paris").name, "forget")
+        self.assertIsNone(match_intent("forget it"))
+        self.assertIsNone(match_intent("tell me a joke about cats"))
+
+    def test_matches_linear_scan(self):
+        from core.command_router import router, match_intent
+        utterances = [
+            "jarvis i love you", "open youtube and play music", "go to github.com",
+            "what's the temperature", "remind me to stretch in 30 minutes",
+            "battery status", "hi jarvis what can you do", "check my inbox",
+        ]
+        for text in utterances:
+            expected = None
+            for intent in router.intents:
+                groups = (intent.phrases,) + intent.requires
+                if all(any(p in text for p in group) for group in groups):
+                    expected = intent
+                    break
+            self.assertIs(match_intent(text), expected, text)
+
+
+class TestSlotExtractor(unittest.TestCase):
+
+    def test_scan_finds_typed_values(self):
+        from core.slot_extractor import SlotScan
+        scan = SlotScan("go to github.com and open notes.txt in 1 hour 30 minutes at 5")
+        self.assertEqual(scan.first("url"), "github.com")
+        self.assertEqual(scan.first("filename"), "notes.txt")
+        self.assertEqual(scan.first("duration").minutes, 90)
+        self.assertEqual(scan.first("duration").prefix, "in")
+        self.assertEqual(scan.first("int"), 5)
+
+    def test_spoken_durations(self):
+        from core.slot_extractor import SlotScan
+        self.assertEqual(SlotScan("for half an hour").first("duration").minutes, 30)
+        self.assertEqual(SlotScan("after 90 seconds").first("duration").minutes, 1.5)
+        self.assertEqual(SlotScan("in a minute").first("duration").seconds, 60)
+
+    @patch('core.command_router.set_reminder')
+    def test_reminder_message_and_duration(self, mock_reminder):
+        from core.command_router import route_command
+        result = route_command("remind me to stretch in 1 hour 30 minutes")
+        mock_reminder.assert_called_with("stretch", 90)
+        self.assertIn("90 minutes", result)
+
+    @patch('core.command_router.set_reminder')
+    def test_reminder_time_is_the_in_duration(self, mock_reminder):
+        from core.command_router import route_command
+        result = route_command("remind me to stretch for 5 minutes in 30 minutes")
+        mock_reminder.assert_called_with("stretch for 5 minutes", 30)
+        self.assertIn("30 minutes", result)
+        self.assertIn("specify", route_command("remind me to stretch for 5 minutes"))
+
+    @patch('core.command_router.open_url')
+    def test_url_slot(self, mock_url):
+        from core.command_router import route_command
+        route_command("go to github.com/anthropics please")
+        mock_url.assert_called_with("github.com/anthropics")
+
+
+class TestFuzzyMatcher(unittest.TestCase):
+
+    def test_metaphone_homophones(self):
+        from core.fuzzy_matcher import metaphone
+        self.assertEqual(metaphone("whether"), metaphone("weather"))
+        self.assertEqual(metaphone("night"), metaphone("knight"))
+        self.assertNotEqual(metaphone("notion"), metaphone("motion"))
+
+    def test_edit_distance_cutoff(self):
+        from core.fuzzy_matcher import edit_distance
+        self.assertEqual(edit_distance("open motion", "open notion", 2), 1)
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 1), 2)
+
+    def test_corrects_misheard_commands(self):
+        from core.command_router import correct_command
+        self.assertEqual(correct_command("open motion"), "open notion")
+        self.assertEqual(correct_command("what is the whether like"), "what is the weather like")
+        self.assertEqual(correct_command("open visual studio code"), "open vs code")
+
+    def test_leaves_conversation_alone(self):
+        from core.command_router import correct_command
+        self.assertIsNone(correct_command("tell me a joke about cats"))
+        self.assertIsNone(correct_command("how are you"))
+
+
+class TestIntentRegistry(unittest.TestCase):
+
+    def test_lazy_action_imports_on_first_call(self):
+        import sys
+        from core.intent_registry import lazy_import
+        sys.modules.pop("colorsys", None)
+        action = lazy_import("colorsys", "rgb_to_hsv")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertEqual(action(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertIn("colorsys", sys.modules)
+
+    def test_slots_and_reply(self):
+        from core.intent_registry import IntentRegistry
+        registry = IntentRegistry()
+        calls = []
+        registry.add("dim", ["dim"], lambda command: calls.append(command.slots),
+                     slots={"level": "int", "unit": r"(percent|%)"}, reply="Dimmed, sir.")
+        intent = registry.match("dim to 30 percent")
+        self.assertEqual(intent.dispatch("dim to 30 percent"), "Dimmed, sir.")
+        self.assertEqual(calls, [{"level": 30, "unit": "percent"}])
+
+    def test_duplicate_name_rejected(self):
+        from core.intent_registry import IntentRegistry
+        registry = IntentRegistry()
+        registry.add("ping", ["ping"], reply="Pong.")
+        with self.assertRaises(ValueError):
+            registry.add("ping", ["ping again"], reply="Pong.")
+
+    def test_plugin_intents_append_after_core(self):
+        import sys
+        import types
+        from core.intent_registry import IntentRegistry
+        plugin = types.ModuleType("jarvis_test_plugin")
+        plugin.register = lambda registry: registry.add("plugin_mute", ["mute"], reply="Plugin.")
+        sys.modules["jarvis_test_plugin"] = plugin
+        try:
+            registry = IntentRegistry()
+            registry.add("mute", ["mute"], reply="Core.")
+            registry.load_plugin("jarvis_test_plugin")
+            self.assertEqual(registry.match("mute").name, "mute")
+            self.assertEqual(len(registry), 2)
+        finally:
+            del sys.modules["jarvis_test_plugin"]
+
+
+class TestIntentClassifier(unittest.TestCase):
+
+    PROTOTYPES = {
+        "unmute": {"command": "unmute", "examples": ["i can't hear anything", "bring the sound back"]},
+        "volume_down": {"command": "volume down", "examples": ["make it quieter", "turn it down"]},
+        "conversation": {"command": None, "examples": ["tell me a joke", "how are you"]},
+    }
+
+    def test_vectors_are_stable_unit_rows(self):
+        from core.embeddings import HashedNgramVectorizer
+        vectorizer = HashedNgramVectorizer(dim=256)
+        first = vectorizer.transform(["make it quieter", ""])
+        second = HashedNgramVectorizer(dim=256).transform(["make it quieter", ""])
+        self.assertAlmostEqual(float((first[0] ** 2).sum()), 1.0, places=5)
+        self.assertEqual(float(abs(first[1]).sum()), 0.0)
+        self.assertTrue((first == second).all())
+
+    def test_maps_paraphrases_to_commands(self):
+        from core.intent_classifier import IntentClassifier
+        classifier = IntentClassifier(self.PROTOTYPES)
+        self.assertEqual(classifier.command_for("i cannot hear anything"), "unmute")
+        self.assertEqual(classifier.command_for("could you make it quieter"), "volume down")
+
+    def test_conversation_and_unknowns_go_to_gemini(self):
+        from core.intent_classifier import IntentClassifier
+        classifier = IntentClassifier(self.PROTOTYPES)
+        self.assertIsNone(classifier.command_for("tell me a joke about cats"))
+        self.assertIsNone(classifier.command_for("explain black holes"))
+
+    def test_near_misses_go_to_gemini(self):
+        from core.intent_classifier import IntentClassifier, load_prototypes
+        classifier = IntentClassifier(load_prototypes())
+        for text in ("turn off the lights", "how cold is space", "is it going to be a good day"):
+            self.assertIsNone(classifier.command_for(text), text)
+        self.assertEqual(classifier.command_for("make it quieter"), "volume down")
+        self.assertEqual(classifier.command_for("turn the sound off"), "mute")
+
+    def test_index_cached_until_examples_change(self):
+        import os
+        import tempfile
+        from core.intent_classifier import IntentClassifier
+        with tempfile.TemporaryDirectory() as tmp:
+            index_file = os.path.join(tmp, "intent_index.npz")
+            IntentClassifier(self.PROTOTYPES, index_file=index_file)
+            built = os.path.getmtime(index_file)
+            with patch("core.embeddings.HashedNgramVectorizer.fit") as fit:
+                cached = IntentClassifier(self.PROTOTYPES, index_file=index_file)
+            fit.assert_not_called()
+            self.assertEqual(cached.command_for("i cannot hear anything"), "unmute")
+
+            changed = dict(self.PROTOTYPES, mute={"command": "mute", "examples": ["silence"]})
+            rebuilt = IntentClassifier(changed, index_file=index_file)
+            self.assertEqual(rebuilt.command_for("silence please"), "mute")
+            self.assertGreaterEqual(os.path.getmtime(index_file), built)
+
+
+class TestSpeculativeRouter(unittest.TestCase):
+
+    def _router(self, routed):
+        from core.speculative import SpeculativeRouter
+
+        def route(text):
+            routed.append(text)
+            return f"routed {text}"
+        return SpeculativeRouter(route=route)
+
+    def test_stable_prefix_is_routed_once_and_committed(self):
+        routed = []
+        speculator = self._router(routed)
+        self.assertIsNone(speculator.update("open"))
+        self.assertIsNone(speculator.update("open chrome"))  # Not yet stable
+        self.assertIsNone(speculator.update("open chrome"))
+        speculation = speculator.update("open chrome and")
+        self.assertEqual(speculation.text, "open chrome")
+        self.assertIsNone(speculator.update("open chrome and then"))  # One speculation per utterance
+        self.assertEqual(speculator.resolve("Open Chrome"), "routed open chrome")
+        self.assertEqual(routed, ["open chrome"])
+        self.assertEqual(speculator.stats["committed"], 1)
+
+    def test_different_final_transcript_cancels(self):
+        routed = []
+        speculator = self._router(routed)
+        for _ in range(3):
+            speculator.update("open chrome")
+        self.assertIsNone(speculator.resolve("what is my battery level"))
+        self.assertEqual(speculator.stats["cancelled"], 1)
+        self.assertIsNone(speculator.resolve("open chrome"))  # Reset after resolving
+
+    def test_only_complete_speculative_commands(self):
+        routed = []
+        speculator = self._router(routed)
+        for partial in ("set volume to", "set volume to 50", "set volume to 50"):
+            self.assertIsNone(speculator.update(partial))  # volume is not speculative
+        speculator.reset()
+        speculator.phrases.append("open chrome tabs")
+        for _ in range(3):
+            self.assertIsNone(speculator.update("open chrome"))  # Could still become a longer command
+        self.assertEqual(routed, [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,214 @@
+"""Tests for the shared HTTP client, against a local stub server."""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like real APIs
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.ports.add(self.client_address[1])
+        if self.path == "/flaky":
+            server.flaky_calls += 1
+            if server.flaky_calls < 3:
+                return self._reply(503, {"error": "busy"}, {"Retry-After": "0"})
+        if self.path == "/missing":
+            return self._reply(404, {"error": "not found"})
+        self._reply(200, {"path": self.path})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        if self.path == "/cachedContents":
+            self.server.cache_requests.append(payload)
+            if self.server.refuse_cache:
+                return self._reply(400, {"error": {"message": "Cached content is too small"}})
+            return self._reply(200, {"name": f"cachedContents/c{len(self.server.cache_requests)}"})
+        if self.path == "/generate":
+            self.server.generate_requests.append(payload)
+            if payload.get("cachedContent") in self.server.expired:
+                return self._reply(404, {"error": {"code": 404, "status": "NOT_FOUND",
+                                                   "message": "CachedContent not found (or permission denied)"}})
+            if payload["contents"][0]["parts"][0]["text"] == "":
+                return self._reply(400, {"error": {"code": 400, "status": "INVALID_ARGUMENT",
+                                                   "message": "* contents: text must not be empty"}})
+        self._reply(200, payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.ports = set()
+        cls.server.flaky_calls = 0
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        from core.http_client import HttpClient
+        self.server.ports.clear()
+        self.server.flaky_calls = 0
+        self.client = HttpClient(backoff=0.01)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_connections_are_reused(self):
+        for i in range(5):
+            response = self.client.get(f"{self.base}/ping/{i}")
+            self.assertEqual(response.json(), {"path": f"/ping/{i}"})
+        self.assertEqual(len(self.server.ports), 1)
+
+    def test_post_json(self):
+        response = self.client.post(f"{self.base}/echo", json={"hello": "jarvis"})
+        self.assertEqual(response.json(), {"hello": "jarvis"})
+
+    def test_retries_transient_status(self):
+        response = self.client.get(f"{self.base}/flaky")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.flaky_calls, 3)
+        self.assertEqual(self.client.stats()[self.base[7:]]["retries"], 2)
+
+    def test_gives_up_after_retries(self):
+        response = self.client.get(f"{self.base}/flaky", retries=1)
+        self.assertEqual(response.status_code, 503)
+
+    def test_client_errors_not_retried(self):
+        response = self.client.get(f"{self.base}/missing")
+        self.assertEqual(response.status_code, 404)
+        stats = self.client.stats()[self.base[7:]]
+        self.assertEqual((stats["requests"], stats["errors"], stats["retries"]), (1, 1, 0))
+
+    def test_connection_errors_retried_with_backoff(self):
+        import requests
+        from core.http_client import HttpClient
+        client = HttpClient(retries=2, backoff=0.01)
+        with patch("core.http_client.time.sleep") as sleep:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.get("http://127.0.0.1:9/unreachable", timeout=0.5)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(client.stats()["127.0.0.1:9"]["errors"], 3)
+
+    def test_latency_metrics(self):
+        self.client.get(f"{self.base}/a")
+        with self.client.timed("example.search"):
+            pass
+        stats = self.client.stats()
+        self.assertEqual(stats[self.base[7:]]["requests"], 1)
+        self.assertGreater(stats[self.base[7:]]["avg_ms"], 0)
+        self.assertEqual(stats["example.search"]["requests"], 1)
+
+
+class TestGeminiRequest(unittest.TestCase):
+    """Precompiled Gemini request bodies and cached content, against the stub server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.ports = set()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        from core.http_client import HttpClient
+        self.server.cache_requests = []
+        self.server.generate_requests = []
+        self.server.expired = set()
+        self.server.refuse_cache = False
+        self.client = HttpClient(backoff=0.01)
+        self.addCleanup(self.client.close)
+
+    def make_template(self, **kwargs):
+        from core.gemini_request import GeminiRequestTemplate
+        return GeminiRequestTemplate("You are J.A.R.V.I.S. \u2014 \"sir\".",
+                                     generation_config={"temperature": 0.8}, **kwargs)
+
+    def test_body_matches_full_serialization(self):
+        from core.gemini_request import JSON_HEADERS
+        template = self.make_template()
+        data = template.body("User: caf\u00e9?\nJARVIS:")
+        expected = {
+            "contents": [{"role": "user", "parts": [{"text": "User: caf\u00e9?\nJARVIS:"}]}],
+            "systemInstruction": {"parts": [{"text": "You are J.A.R.V.I.S. \u2014 \"sir\"."}]},
+            "generationConfig": {"temperature": 0.8},
+        }
+        self.assertEqual(json.loads(data), expected)
+        response = self.client.post(f"{self.base}/generate", headers=JSON_HEADERS, data=data)
+        self.assertEqual(response.json(), expected)
+        self.assertEqual((template.stats["requests"], template.stats["bytes"]), (1, len(data)))
+
+    def test_cached_content_created_once_and_referenced(self):
+        template = self.make_template(cached_content=True, cache_ttl_seconds=600)
+        url = f"{self.base}/cachedContents"
+        name = template.ensure_cache(self.client, url)
+        self.assertEqual(name, "cachedContents/c1")
+        self.assertEqual(template.ensure_cache(self.client, url), name)
+        self.assertEqual(self.server.cache_requests[0]["ttl"], "600s")
+        body = json.loads(template.body("hello", name))
+        self.assertEqual(body["cachedContent"], name)
+        self.assertNotIn("systemInstruction", body)
+
+        template.invalidate(name)
+        self.assertEqual(template.ensure_cache(self.client, url), "cachedContents/c2")
+
+    def test_refused_cache_falls_back_to_inline(self):
+        self.server.refuse_cache = True
+        template = self.make_template(cached_content=True)
+        url = f"{self.base}/cachedContents"
+        self.assertIsNone(template.ensure_cache(self.client, url))
+        self.assertIsNone(template.ensure_cache(self.client, url))
+        self.assertEqual(len(self.server.cache_requests), 1)
+        self.assertIn("too small", template.cache_refused)
+        self.assertIn("systemInstruction", json.loads(template.body("hello", template.active_cache())))
+
+    def test_only_a_lost_cache_is_retried_inline(self):
+        from core import gpt_engine
+        template = self.make_template(cached_content=True)
+        with patch("core.gpt_engine.get_client", return_value=self.client), \
+                patch.object(gpt_engine, "_cached_request_template", template), \
+                patch.object(gpt_engine, "CACHE_URL", f"{self.base}/cachedContents"):
+            # A bad request of its own is passed through, sent once, cache kept
+            response = gpt_engine._post_prompt(f"{self.base}/generate", "")
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(len(self.server.generate_requests), 1)
+            self.assertEqual(template.active_cache(), "cachedContents/c1")
+
+            # Gemini no longer knows the cache: sent again with the persona inline
+            self.server.expired.add("cachedContents/c1")
+            response = gpt_engine._post_prompt(f"{self.base}/generate", "hello")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("systemInstruction", self.server.generate_requests[-1])
+            self.assertEqual(len(self.server.generate_requests), 3)
+            self.assertIsNone(template.active_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
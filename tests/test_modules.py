@@ -3,6 +3,24 @@ import unittest
 import os
 import time
 import tempfile
+from unittest.mock import patch
+
+
+def use_temp_memory(test):
+    """Point memory_manager at a throwaway store and index instead of memory/."""
+    from memory import memory_manager
+    from memory.memory_index import MemoryIndex
+    from memory.memory_store import MemoryStore
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    store = MemoryStore(os.path.join(directory.name, "profile.log"), legacy_path=None)
+    index = MemoryIndex(os.path.join(directory.name, "index"))
+    test.addCleanup(store.close)
+    test.addCleanup(index.close)
+    for p in (patch.object(memory_manager, "_cached_store", store),
+              patch.object(memory_manager, "_cached_index", index)):
+        p.start()
+        test.addCleanup(p.stop)
 
 
 class TestContextMemory(unittest.TestCase):
@@ -43,6 +61,36 @@ class TestContextMemory(unittest.TestCase):
         ctx = ContextMemory()
         self.assertEqual(ctx.get_context_string(), "")
 
+    def test_overflow_folds_into_summary(self):
+        from core.context_memory import ContextMemory
+        ctx = ContextMemory(max_turns=10, max_tokens=40, summary_tokens=15)
+        for i in range(6):
+            ctx.add_exchange(f"question number {i}", f"A rather long answer to question {i}, sir.")
+        self.assertLessEqual(ctx.tokens, 40)
+        self.assertEqual(ctx.tokens, sum(tokens for _, tokens, _ in ctx._entries))
+        self.assertEqual(ctx.history[-1]["user"], "question number 5")
+        # The oldest questions fell out of the summary too, the newer ones are kept
+        self.assertNotIn("question number 0", ctx.summary)
+        self.assertIn("question number 3", ctx.summary)
+        self.assertTrue(ctx.get_context_string().startswith(ctx.summary + "\nUser: question number 4"))
+
+    def test_session_resumes_after_restart(self):
+        from core.context_memory import ContextMemory
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "conversation.jsonl")
+            ctx = ContextMemory(max_turns=3, path=path)
+            for i in range(60):
+                ctx.add_exchange(f"msg {i}", f"reply {i}")
+            ctx.close()
+            with open(path, "r") as f:
+                self.assertLess(len(f.readlines()), 50)  # Compacted along the way
+
+            resumed = ContextMemory(max_turns=3, path=path)
+            self.assertEqual([e["user"] for e in resumed.history], ["msg 57", "msg 58", "msg 59"])
+            self.assertEqual(resumed.summary, ctx.summary)
+            resumed.close()
+            self.assertEqual(len(ContextMemory(max_turns=3, path=path, resume_hours=0).history), 0)
+
 
 class TestFileOps(unittest.TestCase):
 
@@ -145,6 +193,9 @@ class TestNotifier(unittest.TestCase):
 
 class TestMemoryManager(unittest.TestCase):
 
+    def setUp(self):
+        use_temp_memory(self)
+
     def test_remember_and_recall(self):
         from memory.memory_manager import remember, recall
         remember("test_key", "test_value")
@@ -157,6 +208,102 @@ class TestMemoryManager(unittest.TestCase):
         self.assertIn("don't have", result)
 
 
+class TestMemoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.log = os.path.join(self.dir.name, "profile.log")
+        self.legacy = os.path.join(self.dir.name, "profile.json")
+
+    def test_facts_survive_reopen_and_torn_last_write(self):
+        from memory.memory_store import MemoryStore
+        store = MemoryStore(self.log, legacy_path=self.legacy)
+        store.set("my favorite color", "blue")
+        store.set("my favorite color", "red")
+        store.set("car", "Audi R8")
+        store.delete("car")
+        store.close()
+        with open(self.log, "ab") as f:
+            f.write(b'0badc0de {"k":"half wr')  # Crash mid-append
+
+        store = MemoryStore(self.log, legacy_path=self.legacy)
+        self.assertEqual(store.snapshot(), {"my favorite color": "red"})
+        self.assertEqual(store.stats["recovered_bytes"], 22)
+        store.set("city", "Malibu")
+        store.close()
+        self.assertEqual(MemoryStore(self.log, legacy_path=self.legacy).get("city"), "Malibu")
+
+    def test_compaction_and_legacy_import(self):
+        import json
+        from memory.memory_store import MemoryStore
+        with open(self.legacy, "w") as f:
+            json.dump({"my favorite color": "blue"}, f)
+        store = MemoryStore(self.log, legacy_path=self.legacy, min_compact=10)
+        self.assertEqual(store.get("my favorite color"), "blue")
+        for i in range(20):
+            store.set("counter", i)
+        self.assertGreaterEqual(store.stats["compactions"], 1)
+        with open(self.log, "rb") as f:
+            self.assertLess(len(f.readlines()), 10)
+        store.close()
+        self.assertEqual(MemoryStore(self.log, legacy_path=self.legacy).snapshot(),
+                         {"my favorite color": "blue", "counter": 19})
+
+    def test_damaged_log_is_kept_aside(self):
+        from unittest.mock import patch
+        from memory.memory_store import MemoryStore
+        store = MemoryStore(self.log, legacy_path=self.legacy)
+        store.update({"a": 1, "b": 2, "c": 3})
+        store.close()
+        with open(self.log, "rb") as f:
+            lines = f.readlines()
+        with open(self.log, "wb") as f:
+            f.writelines([lines[0], b"garbage\n", lines[2]])
+
+        with patch("builtins.print"):
+            store = MemoryStore(self.log, legacy_path=self.legacy)
+        # The record after the damaged line is still there
+        self.assertEqual(store.snapshot(), {"a": 1, "c": 3})
+        self.assertEqual(store.stats["damaged_lines"], 1)
+        self.assertEqual(len([name for name in os.listdir(self.dir.name) if ".damaged-" in name]), 1)
+        store.close()
+        self.assertEqual(MemoryStore(self.log, legacy_path=self.legacy).snapshot(), {"a": 1, "c": 3})
+
+
+class TestMemoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_recall_finds_fact_under_a_different_key(self):
+        from memory import memory_manager
+        use_temp_memory(self)
+        memory_manager.remember("the car", "an Audi R8")
+        memory_manager.remember("wifi password", "hunter2")
+        self.assertIn("Audi R8", memory_manager.recall("my car"))
+        self.assertIn("hunter2", memory_manager.recall("the wi-fi password"))
+        self.assertIn("don't have", memory_manager.recall("my dentist"))
+
+    def test_incremental_updates_persist(self):
+        from memory.memory_index import MemoryIndex
+        path = os.path.join(self.dir.name, "index")
+        index = MemoryIndex(path, min_capacity=2)
+        index.sync({"my birthday": "May 29", "my sister": "Morgan", "the car": "Audi R8"})
+        index.add("the car", "Porsche 911")
+        index.remove("my sister")
+        index.close()
+
+        index = MemoryIndex(path)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.search("car porsche", k=1)[0][0], "the car")
+        self.assertEqual(index.sync({"my birthday": "May 29", "the car": "Porsche 911"}), 0)
+        # A fact written to the store but never indexed (crash in between) is picked up
+        self.assertEqual(index.sync({"my birthday": "May 29", "the car": "Porsche 911", "city": "Malibu"}), 1)
+        self.assertEqual(index.search("which city", k=1)[0][0], "city")
+
+
 class TestWeeklySmummary(unittest.TestCase):
 
     def test_no_data(self):
@@ -175,6 +322,203 @@ class TestWebAgent(unittest.TestCase):
         self.assertIsNotNone(result)
 
 
+class TestResponseCache(unittest.TestCase):
+
+    def test_normalized_prompts_share_a_key(self):
+        from core.response_cache import ResponseCache
+        cache = ResponseCache(":memory:")
+        self.assertEqual(cache.key_for("What's the meaning of life?", period="evening"),
+                         cache.key_for("jarvis what's the meaning of life", period="evening"))
+        self.assertNotEqual(cache.key_for("meaning of life", period="evening"),
+                            cache.key_for("meaning of life", period="morning"))
+        history = [{"user": "hi", "assistant": "Hello, sir."}]
+        self.assertNotEqual(cache.key_for("why", history), cache.key_for("why"))
+
+    def test_hits_misses_and_ttl(self):
+        from core.response_cache import ResponseCache
+        cache = ResponseCache(":memory:")
+        key = cache.key_for("what is the meaning of life")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "what is the meaning of life", "42, sir.")
+        self.assertEqual(cache.get(key), "42, sir.")
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+        self.assertIsNone(cache.get(key))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 0))
+
+    def test_lru_eviction(self):
+        from core.response_cache import ResponseCache
+        cache = ResponseCache(":memory:", max_entries=2)
+        for prompt in ("one", "two"):
+            cache.put(prompt, prompt, prompt)
+            time.sleep(0.01)
+        cache.get("one")  # "two" is now least recently used
+        time.sleep(0.01)
+        cache.put("three", "three", "three")
+        self.assertIsNone(cache.get("two"))
+        self.assertEqual(cache.get("one"), "one")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_cacheable_patterns(self):
+        from core.response_cache import ResponseCache
+        cache = ResponseCache(":memory:", never_cache=[r"\bjoke\b"], always_cache=[r"\bknock knock\b"])
+        self.assertTrue(cache.is_cacheable("Why is the sky blue?"))
+        self.assertFalse(cache.is_cacheable("tell me a joke"))
+        self.assertTrue(cache.is_cacheable("tell me a knock knock joke"))
+        self.assertIsNone(ResponseCache.from_config({"enabled": False}))
+
+    def test_ask_gpt_reuses_cached_reply(self):
+        use_temp_memory(self)
+        from unittest.mock import patch, MagicMock
+        from core import gpt_engine
+        from core.response_cache import ResponseCache
+        response = MagicMock()
+        response.json.return_value = {"candidates": [{"content": {"parts": [{"text": "Forty-two, sir."}]}}]}
+        with patch.object(gpt_engine, "_cached_response_cache", ResponseCache(":memory:")), \
+                patch("core.gpt_engine.get_client") as client:
+            post = client.return_value.post
+            post.return_value = response
+            self.assertEqual(gpt_engine.ask_gpt("What is the meaning of life?"), "Forty-two, sir.")
+            self.assertEqual(gpt_engine.ask_gpt("what is the meaning of life"), "Forty-two, sir.")
+            gpt_engine.ask_gpt("what is the meaning of life", system_context={"battery": 40})
+        self.assertEqual(post.call_count, 2)
+
+    def test_changed_fact_misses_cache(self):
+        use_temp_memory(self)
+        from unittest.mock import patch, MagicMock
+        from core import gpt_engine
+        from core.response_cache import ResponseCache
+        from memory import memory_manager
+        response = MagicMock()
+        response.json.return_value = {"candidates": [{"content": {"parts": [{"text": "An Audi R8, sir."}]}}]}
+        with patch.object(gpt_engine, "_cached_response_cache", ResponseCache(":memory:")), \
+                patch("core.gpt_engine.get_client") as client:
+            post = client.return_value.post
+            post.return_value = response
+            memory_manager.remember("my car", "an Audi R8")
+            gpt_engine.ask_gpt("what car do I drive")
+            gpt_engine.ask_gpt("what car do I drive")
+            self.assertEqual(post.call_count, 1)
+            memory_manager.remember("my car", "a Tesla Model S")
+            gpt_engine.ask_gpt("what car do I drive")
+        self.assertEqual(post.call_count, 2)
+        self.assertIn(b"Tesla", post.call_args[1]["data"])
+
+
+class TestPromptContext(unittest.TestCase):
+
+    HISTORY = [
+        {"user": "recommend a book about space", "assistant": "Cosmos by Carl Sagan is a fine choice, sir."},
+        {"user": "what's the capital of France", "assistant": "Paris, sir."},
+        {"user": "how tall is mount everest", "assistant": "About 8849 metres, sir."},
+        {"user": "what is a good pasta recipe", "assistant": "Cacio e pepe, sir. Simple and elegant."},
+    ]
+
+    def make_builder(self, **kwargs):
+        from core.prompt_context import PromptContextBuilder
+        self.version = 0
+        facts = [("the car", "an Audi R8", 0.55), ("wifi password", "hunter2", 0.12)]
+        return PromptContextBuilder(search_facts=lambda query, k: facts[:k],
+                                    facts_version=lambda: self.version, **kwargs)
+
+    def test_relevant_context_only(self):
+        builder = self.make_builder()
+        context = builder.build("who wrote that space book", self.HISTORY, {"battery": 40},
+                                "Current time: 10:00 (morning)", "Earlier the user asked: hello.")
+        self.assertIn("CURRENT CONTEXT: Current time: 10:00 (morning), System status: battery: 40", context.text)
+        self.assertIn("- the car: an Audi R8", context.text)
+        self.assertNotIn("hunter2", context.text)
+        # The old but relevant turn and the latest one, in conversation order
+        self.assertLess(context.text.index("Carl Sagan"), context.text.index("Cacio e pepe"))
+        self.assertNotIn("Paris", context.text)
+        self.assertLess(context.text.index("Earlier the user asked"), context.text.index("RECENT CONVERSATION"))
+        self.assertEqual((context.count("turn"), context.count("fact")), (2, 1))
+
+    def test_budget_keeps_mandatory_items(self):
+        builder = self.make_builder(budget_tokens=5)
+        context = builder.build("who wrote that space book", self.HISTORY)
+        self.assertEqual([item.kind for item in context.items], ["turn"])
+        self.assertIn("Cacio e pepe", context.text)
+        self.assertEqual(context.dropped, 5)
+
+    def test_cached_per_turn(self):
+        builder = self.make_builder()
+        first = builder.build("tell me more", self.HISTORY)
+        self.assertIs(builder.build("tell me more", self.HISTORY), first)
+        self.version += 1  # Something was remembered
+        self.assertIsNot(builder.build("tell me more", self.HISTORY), first)
+        self.assertIsNot(builder.build("tell me more", self.HISTORY[:2]), first)
+        self.assertEqual((builder.stats["builds"], builder.stats["cache_hits"]), (3, 1))
+
+
+class TestOrchestrator(unittest.TestCase):
+
+    def _orchestrator(self, heard, process, delivered):
+        """Orchestrator wired to fakes: one wake word, then scripted speech."""
+        import threading
+        from core.orchestrator import Orchestrator
+        wakes = iter([True])
+        parked = threading.Event()
+        speech = iter(heard)
+
+        def wait_for_wake():
+            if next(wakes, False):
+                return True
+            parked.wait(1)  # Behave like a wake word engine that hears nothing
+            return False
+
+        def deliver(reply, on_start):
+            on_start()
+            delivered.append(reply if isinstance(reply, str) else list(reply))
+
+        return Orchestrator(
+            wait_for_wake=wait_for_wake,
+            capture=lambda timeout, limit: next(speech, None),
+            recognize=lambda audio: audio,
+            process=process,
+            deliver=deliver,
+            acknowledge=lambda on_start: on_start(),
+        )
+
+    def _run(self, orchestrator, until):
+        import asyncio
+        from unittest.mock import patch
+
+        async def scenario():
+            task = asyncio.ensure_future(orchestrator.run())
+            for _ in range(200):
+                if until() or task.done():
+                    break
+                await asyncio.sleep(0.01)
+            orchestrator.stop()
+            return await asyncio.wait_for(task, 2)
+
+        with patch("builtins.print"):
+            return asyncio.run(scenario())
+
+    def test_conversation_turns_in_order(self):
+        delivered = []
+        orchestrator = self._orchestrator(
+            ["what time is it", "and the weather"],
+            lambda command: iter([f"Reply to {command}.", "Anything else?"]),
+            delivered)
+        shutdown = self._run(orchestrator, until=lambda: len(delivered) == 2)
+        self.assertFalse(shutdown)
+        self.assertEqual(delivered, [["Reply to what time is it.", "Anything else?"],
+                                     ["Reply to and the weather.", "Anything else?"]])
+        first, second = orchestrator.metrics
+        self.assertIsNotNone(first["wake_to_audio"])
+        self.assertIsNotNone(first["wake_to_ack"])
+        self.assertIsNone(second["wake_to_audio"])  # Follow-up, no wake word
+
+    def test_shutdown_command_stops_pipeline(self):
+        delivered = []
+        orchestrator = self._orchestrator(["shut down"], lambda command: None, delivered)
+        self.assertTrue(self._run(orchestrator, until=lambda: False))
+        self.assertEqual(delivered, [])
+
+
 class TestMainResponseSelection(unittest.TestCase):
 
     def test_should_use_action_feedback(self):
@@ -1,16 +1,35 @@
 """Tests for voice-related modules (non-audio, logic-only tests)."""
 import unittest
-import re
+
+
+def tone_wav(test, *segments):
+    """Write (samples, amplitude) segments of a 440 Hz tone to a temp WAV."""
+    import math
+    import os
+    import struct
+    import tempfile
+    import wave
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    test.addCleanup(os.remove, path)
+    samples = []
+    for count, amplitude in segments:
+        samples += [int(amplitude * math.sin(2 * math.pi * 440 * i / 16000))
+                    for i in range(count)]
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(struct.pack("<%dh" % len(samples), *samples))
+    return path
 
 
 class TestSpeechOutputCleaning(unittest.TestCase):
-    """Test the text cleaning logic used in speech_output.py."""
+    """Test core.text_normalizer, which cleans every utterance before synthesis."""
 
     def _clean_text(self, text):
-        """Replicate the cleaning logic from speech_output.speak()."""
-        clean = text.replace("*", "").replace("#", "").replace("`", "")
-        clean = re.sub(r'[^\w\s,?.!\'\"]', '', clean)
-        return clean
+        from core.text_normalizer import normalize_for_speech
+        return normalize_for_speech(text)
 
     def test_removes_markdown_asterisks(self):
         result = self._clean_text("**bold text**")
@@ -18,7 +37,7 @@ class TestSpeechOutputCleaning(unittest.TestCase):
 
     def test_removes_hash_headers(self):
         result = self._clean_text("## Header")
-        self.assertEqual(result, " Header")
+        self.assertEqual(result, "Header")
 
     def test_removes_backticks(self):
         result = self._clean_text("`code`")
@@ -32,6 +51,814 @@ class TestSpeechOutputCleaning(unittest.TestCase):
         result = self._clean_text("Hello 🎉 World")
         self.assertNotIn("🎉", result)
 
+    def test_golden_corpus(self):
+        import json
+        import os
+        from core.text_normalizer import expand
+        corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "speech_normalization.json")
+        with open(corpus, "r", encoding="utf-8") as f:
+            cases = json.load(f)
+        for case in cases:
+            with self.subTest(text=case["text"]):
+                self.assertEqual(expand(case["text"]), case["spoken"])
+
+    def test_repeated_text_is_memoized(self):
+        from core.text_normalizer import normalize_for_speech
+        text = "Memory allocation stable at 58%, sir."
+        normalize_for_speech(text)
+        hits = normalize_for_speech.cache_info().hits
+        self.assertEqual(normalize_for_speech(text), "Memory allocation stable at 58 percent, sir.")
+        self.assertEqual(normalize_for_speech.cache_info().hits, hits + 1)
+
+
+class TestStreamingSpeech(unittest.TestCase):
+    """Test sentence streaming from Gemini into the speech pipeline."""
+
+    def test_split_sentences_across_fragments(self):
+        from core.gpt_engine import split_sentences
+        fragments = ["Indeed, s", "ir. Mr. Stark is ", "out! Pi is 3.", "14. Shall I call him"]
+        self.assertEqual(list(split_sentences(fragments)),
+                         ["Indeed, sir.", "Mr. Stark is out!", "Pi is 3.14.", "Shall I call him"])
+
+    def test_speak_stream_plays_chunks_in_order(self):
+        from unittest.mock import patch
+        from core import speech_output
+        played, started = [], []
+
+        def play(samples, on_start=None, session=None):
+            if on_start:
+                on_start()
+            played.append(samples)
+
+        with patch.object(speech_output, "_synthesize", lambda text, rate, pitch: text.encode()), \
+                patch.object(speech_output, "_decode", lambda audio: audio.decode()), \
+                patch.object(speech_output, "_play", play), \
+                patch.object(speech_output, "get_tts_cache", return_value=None), \
+                patch.object(speech_output, "get_phrase_bank", return_value=None), \
+                patch("builtins.print"):
+            spoken = speech_output.speak_stream(iter(["First.", "**Second.**", "Third."]), lookahead=1,
+                                                on_start=lambda: started.append(len(played)))
+        self.assertEqual(played, ["First.", "Second.", "Third."])
+        self.assertEqual(spoken, "First. **Second.** Third.")
+        self.assertEqual(started, [0])
+
+    def test_streamed_reply_recorded_after_playback(self):
+        import os
+        import sys
+        from unittest.mock import patch
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import main
+        from core.context_memory import ContextMemory
+        context = ContextMemory()
+        with patch("main.route_command", return_value="Command recognized, but no matching action was found."), \
+                patch("main.correct_command", return_value=None), \
+                patch("main.classify_command", return_value=None), \
+                patch("main.ask_gpt_stream", return_value=iter(["Very well.", "Forty-two."])), \
+                patch("main.show_command"), patch("builtins.print"):
+            reply = main.process_command("meaning of life", context, stream=True)
+            self.assertEqual(len(context.history), 0)
+            self.assertEqual(list(reply), ["Very well.", "Forty-two."])
+        self.assertEqual(context.history[-1]["assistant"], "Very well. Forty-two.")
+
+
+class TestAudioPlayer(unittest.TestCase):
+    """Test in-process synthesis and the shared playback queue."""
+
+    def test_decode_wav_in_memory(self):
+        from core.audio_output import decode_audio
+        from core.speech_output import StubTTSBackend
+        audio = StubTTSBackend(sample_rate=16000).synthesize("Hello there.")
+        samples = decode_audio(audio, sample_rate=24000)
+        self.assertEqual(samples.dtype.name, "int16")
+        self.assertAlmostEqual(len(samples), len("Hello there.") * 0.06 * 24000, delta=2)
+
+    def test_concurrent_producers_do_not_interleave(self):
+        import threading
+        import numpy as np
+        from core.audio_output import AudioPlayer, MemoryOutput
+        player = AudioPlayer(MemoryOutput(), block=64).start()
+        order = []
+
+        def produce(value):
+            utterance = player.play(np.full(1000, value, dtype=np.int16),
+                                    on_start=lambda: order.append(value))
+            utterance.wait()
+
+        threads = [threading.Thread(target=produce, args=(value,)) for value in range(1, 6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        output = player.output
+        player.close()
+
+        played = np.frombuffer(bytes(output.played), dtype=np.int16)
+        self.assertEqual(len(played), 5000)
+        # Each utterance is one contiguous run, in the order playback started
+        runs = [int(played[i]) for i in range(0, 5000, 1000)]
+        self.assertEqual(runs, order)
+        self.assertTrue(all((played[i:i + 1000] == played[i]).all() for i in range(0, 5000, 1000)))
+
+    def test_cancelled_utterance_is_skipped(self):
+        import numpy as np
+        from core.audio_output import AudioPlayer, MemoryOutput
+        player = AudioPlayer(MemoryOutput(realtime=True), block=240).start()
+        first = player.play(np.ones(4800, dtype=np.int16))
+        second = player.play(np.full(4800, 2, dtype=np.int16))
+        second.cancel()
+        first.wait()
+        self.assertTrue(second.wait(1))
+        self.assertFalse(second.started.is_set())
+        self.assertEqual(len(player.output.played), 4800 * 2)
+        player.close()
+
+    def test_speak_through_stub_engine_writes_no_files(self):
+        import os
+        import tempfile
+        from unittest.mock import patch
+        from core import speech_output
+        from core.audio_output import AudioPlayer, MemoryOutput
+        player = AudioPlayer(MemoryOutput())
+        engine = speech_output.StubTTSBackend()
+        before = set(os.listdir(tempfile.gettempdir()))
+        with patch.object(speech_output, "_cached_player", player), \
+                patch.object(speech_output, "_cached_tts", engine), \
+                patch.object(speech_output, "get_tts_cache", return_value=None), \
+                patch.object(speech_output, "get_phrase_bank", return_value=None), \
+                patch("builtins.print"):
+            speech_output.speak("Good evening, sir.")
+        output = player.output
+        player.close()
+        self.assertEqual(engine.calls, ["Good evening, sir."])
+        self.assertAlmostEqual(len(output.played) / 2, len("Good evening, sir.") * 0.06 * 24000, delta=2)
+        self.assertEqual(set(os.listdir(tempfile.gettempdir())) - before, set())
+
+
+class TestSpeechPipeline(unittest.TestCase):
+    """Test sentence-pipelined speech with barge-in."""
+
+    REPORT = ("Running full diagnostic, sir. Power reserves at 80 percent. "
+              "Processor load nominal. All primary systems operational, sir.")
+
+    def setUp(self):
+        from unittest.mock import patch
+        from core import speech_output
+        from core.audio_output import AudioPlayer, MemoryOutput
+        self.output = MemoryOutput(realtime=True)
+        self.player = AudioPlayer(self.output, block=480)
+        self.engine = speech_output.StubTTSBackend(seconds_per_char=0.004, delay=0.05)
+        for p in [patch.object(speech_output, "_cached_player", self.player),
+                  patch.object(speech_output, "_cached_tts", self.engine),
+                  patch.object(speech_output, "_cached_pipeline",
+                               {"pipeline": True, "workers": 2, "lookahead": 2}),
+                  patch.object(speech_output, "get_tts_cache", return_value=None),
+                  patch.object(speech_output, "get_phrase_bank", return_value=None),
+                  patch("builtins.print")]:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(self.player.close)
+
+    def test_sentences_played_in_order_as_ready(self):
+        from core import speech_output
+        session = speech_output.speak(self.REPORT)
+        sentences = list(speech_output.split_sentences([self.REPORT]))
+        self.assertEqual(len(sentences), 4)
+        self.assertEqual(sorted(self.engine.calls), sorted(sentences))
+        self.assertEqual(session.chunks, 4)
+        played = bytes(self.output.played)
+        from core.audio_output import decode_audio
+        expected = b"".join(decode_audio(self.engine.synthesize(s)).tobytes() for s in sentences)
+        self.assertEqual(played, expected)
+        metrics = session.metrics()
+        # First audio after one sentence's synthesis, not all four
+        self.assertLess(metrics["ttfa"], 0.05 * 3)
+        self.assertFalse(metrics["cancelled"])
+
+    def test_barge_in_cancels_remaining_sentences(self):
+        import threading
+        import time
+        from core import speech_output
+        result = {}
+        speaker = threading.Thread(target=lambda: result.setdefault("session", speech_output.speak(self.REPORT)))
+        speaker.start()
+        deadline = time.time() + 2
+        while not self.output.played and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(speech_output.stop_speaking(), 1)
+        speaker.join(1)
+        self.assertFalse(speaker.is_alive())
+        metrics = result["session"].metrics()
+        self.assertTrue(metrics["cancelled"])
+        self.assertLess(metrics["chunks"], 4)
+        self.assertEqual(speech_output.stop_speaking(), 0)
+
+    def test_barge_in_during_stalled_stream(self):
+        import threading
+        import time
+        from unittest.mock import patch
+        from core import speech_output
+        resume = threading.Event()
+
+        def stalled():
+            yield "First sentence, sir."
+            resume.wait(5)  # Gemini stops sending
+            yield "Too late."
+
+        result = {}
+        speaker = threading.Thread(target=lambda: result.setdefault("session", speech_output.speak_stream(stalled())))
+        with patch.object(speech_output, "_report_speech_error") as report:
+            speaker.start()
+            deadline = time.time() + 2
+            while not self.output.played and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.3)  # First sentence done; playback is waiting for the next
+            self.assertEqual(speech_output.stop_speaking(), 1)
+            speaker.join(1)
+            self.assertFalse(speaker.is_alive())
+            resume.set()  # The stream wakes up after the pool has been shut down
+            time.sleep(0.1)
+        report.assert_not_called()
+
+    def test_concurrent_speakers_not_interleaved(self):
+        import threading
+        from core import speech_output
+        first = "Alert one, part one. Alert one, part two."
+        second = "Alert two, part one. Alert two, part two."
+        threads = [threading.Thread(target=speech_output.speak, args=(text,)) for text in (first, second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        from core.audio_output import decode_audio
+        clips = {text: b"".join(decode_audio(self.engine.synthesize(s)).tobytes()
+                                for s in speech_output.split_sentences([text]))
+                 for text in (first, second)}
+        played = bytes(self.output.played)
+        self.assertIn(played, (clips[first] + clips[second], clips[second] + clips[first]))
+
+
+class TestSpeechScheduler(unittest.TestCase):
+    """Test the priority speech queue shared by replies, alerts and reminders."""
+
+    def setUp(self):
+        import threading
+        from core.speech_scheduler import SpeechScheduler
+        self.spoken = []
+        self.active = 0
+        self.overlapped = False
+        self.gate = threading.Event()
+        self._lock = threading.Lock()
+        self.scheduler = SpeechScheduler(speak=self._speak, speak_stream=self._speak).start()
+        self.addCleanup(self.scheduler.close, 2)
+        self.addCleanup(self.gate.set)
+
+    def _speak(self, text, on_start=None, session=None, rate=None, pitch=None):
+        """Fake audio sink: records what is said and checks nothing overlaps."""
+        import time
+        with self._lock:
+            self.active += 1
+            self.overlapped |= self.active > 1
+        if text == "Hold on.":
+            self.gate.wait(2)
+        elif text == "A long story, sir.":
+            session.cancelled.wait(2)
+        else:
+            time.sleep(0.005)
+        self.spoken.append(text)
+        with self._lock:
+            self.active -= 1
+        return session
+
+    def _block(self):
+        """Keep the consumer busy with an uninterruptible request until self.gate is set."""
+        import time
+        blocker = self.scheduler.say("Hold on.", interruptible=False)
+        while blocker.state == "queued":
+            time.sleep(0.005)
+        return blocker
+
+    def test_most_urgent_first_and_hold(self):
+        from core.speech_scheduler import CRITICAL, REPLY, REMINDER, CHATTER
+        self._block()
+        requests = [self.scheduler.say(text, priority=priority) for text, priority in
+                    [("Chatter.", CHATTER), ("Reminder.", REMINDER), ("Reply.", REPLY), ("Critical.", CRITICAL)]]
+        self.gate.set()
+        for request in requests:
+            self.assertEqual(request.wait(2), "spoken")
+        self.assertEqual(self.spoken, ["Hold on.", "Critical.", "Reply.", "Reminder.", "Chatter."])
+
+        self.scheduler.hold()
+        chatter = self.scheduler.say("Take a break.", priority="chatter")
+        self.assertEqual(self.scheduler.say("Yes sir?").wait(2), "spoken")
+        self.assertIsNone(chatter.wait(0.1))
+        self.scheduler.release()
+        self.assertEqual(chatter.wait(2), "spoken")
+        self.assertEqual(self.spoken[-2:], ["Yes sir?", "Take a break."])
+
+    def test_duplicates_coalesced_and_stale_requests_dropped(self):
+        import time
+        self._block()
+        first = self.scheduler.say("Power reserves at 19 percent.", priority="reminder", key="battery")
+        second = self.scheduler.say("Power reserves at 18 percent.", priority="reminder", key="battery")
+        stale = self.scheduler.say("Perhaps a short break?", priority="chatter", deadline=0.05)
+        self.assertIs(first, second)
+        time.sleep(0.1)
+        self.gate.set()
+        self.assertEqual(first.wait(2), "spoken")
+        self.assertEqual(stale.wait(2), "expired")
+        self.assertEqual(self.spoken, ["Hold on.", "Power reserves at 18 percent."])
+        self.assertEqual(self.scheduler.stats["coalesced"], 1)
+        self.assertEqual(self.scheduler.stats["expired"], 1)
+
+    def test_producers_on_many_threads_never_block_or_overlap(self):
+        import threading
+        self._block()
+        requests = []
+        producers = [threading.Thread(target=lambda i=i: requests.append(
+            self.scheduler.say(f"Alert {i}.", priority="reminder"))) for i in range(8)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join(1)
+        # Every producer returned while the consumer was still busy
+        self.assertEqual(len(requests), 8)
+        self.assertEqual(self.scheduler.pending(), 8)
+        self.gate.set()
+        for request in requests:
+            self.assertEqual(request.wait(2), "spoken")
+        self.assertEqual(sorted(self.spoken[1:]), sorted(f"Alert {i}." for i in range(8)))
+        self.assertFalse(self.overlapped)
+
+    def test_barge_in_is_not_replayed(self):
+        import time
+        request = self.scheduler.say("A long story, sir.", priority="chatter")
+        deadline = time.time() + 2
+        while request.state != "speaking" and time.time() < deadline:
+            time.sleep(0.005)
+        request.session.cancel()  # What stop_speaking() does to a session
+        self.assertEqual(request.wait(2), "cancelled")
+        self.assertEqual(self.scheduler.say("Next.").wait(2), "spoken")
+        self.assertEqual(self.spoken, ["A long story, sir.", "Next."])
+
+    def test_critical_alert_preempts_and_interrupted_request_replays(self):
+        import time
+        from unittest.mock import patch
+        from core import speech_output
+        from core.audio_output import AudioPlayer, MemoryOutput, decode_audio
+        from core.speech_scheduler import SpeechScheduler
+        output = MemoryOutput(realtime=True)
+        player = AudioPlayer(output, block=240)
+        engine = speech_output.StubTTSBackend(seconds_per_char=0.004)
+        for p in [patch.object(speech_output, "_cached_player", player),
+                  patch.object(speech_output, "_cached_tts", engine),
+                  patch.object(speech_output, "get_tts_cache", return_value=None),
+                  patch.object(speech_output, "get_phrase_bank", return_value=None),
+                  patch("builtins.print")]:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(player.close)
+        scheduler = SpeechScheduler().start()
+        self.addCleanup(scheduler.close, 2)
+
+        chatter = scheduler.say("You have been working for two hours, perhaps a short break is in order.",
+                                priority="chatter")
+        deadline = time.time() + 2
+        while not output.played and time.time() < deadline:
+            time.sleep(0.005)
+        critical = scheduler.say("Power reserves critically low.", priority="critical")
+        self.assertEqual(critical.wait(3), "spoken")
+        self.assertEqual(chatter.wait(3), "spoken")
+        self.assertEqual(chatter.preempted, 1)
+
+        clip = {request: decode_audio(engine.synthesize(request.text)).tobytes() for request in (chatter, critical)}
+        played = bytes(output.played)
+        # Cut off, then the alert, then the interrupted request from the start
+        self.assertTrue(played.endswith(clip[critical] + clip[chatter]))
+        self.assertLess(len(played), 2 * len(clip[chatter]) + len(clip[critical]))
+
+
+class TestTTSCache(unittest.TestCase):
+    """Test the on-disk cache of synthesized speech."""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_key_covers_text_voice_rate_and_pitch(self):
+        from core.tts_cache import TTSCache
+        base = TTSCache.key_for("Yes sir?", "en-GB-RyanNeural", "+0%", "+0Hz")
+        self.assertEqual(base, TTSCache.key_for("Yes sir?", "en-GB-RyanNeural", "+0%", "+0Hz"))
+        for other in [("Yes sir!", "en-GB-RyanNeural", "+0%", "+0Hz"),
+                      ("Yes sir?", "en-US-GuyNeural", "+0%", "+0Hz"),
+                      ("Yes sir?", "en-GB-RyanNeural", "-5%", "+0Hz"),
+                      ("Yes sir?", "en-GB-RyanNeural", "+0%", "+2Hz")]:
+            self.assertNotEqual(base, TTSCache.key_for(*other))
+
+    def test_lru_eviction_by_size(self):
+        import os
+        from core.tts_cache import TTSCache
+        cache = TTSCache(os.path.join(self.tmp.name, "cache"), max_mb=2500 / 1024 / 1024)
+        for key in "abc":
+            cache.put(key, b"\0" * 1000)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))        # b is now the most recent
+        cache.put("d", b"\0" * 1000)
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.stats["evictions"], 2)
+        self.assertFalse(os.path.exists(cache.file_for("a")))
+        # The order survives a restart
+        reopened = TTSCache(cache.path, max_mb=2500 / 1024 / 1024)
+        self.assertEqual(list(reopened._entries), ["b", "d"])
+
+    def test_speak_synthesizes_once_and_keeps_clip(self):
+        import os
+        from unittest.mock import patch
+        from core import speech_output
+        from core.tts_cache import TTSCache
+        cache = TTSCache(os.path.join(self.tmp.name, "cache"))
+        synthesized, played = [], []
+
+        def synthesize(text, rate, pitch):
+            synthesized.append(text)
+            return b"mp3"
+
+        with patch.object(speech_output, "_cached_tts_cache", cache), \
+                patch.object(speech_output, "get_phrase_bank", return_value=None), \
+                patch.object(speech_output, "_synthesize", synthesize), \
+                patch.object(speech_output, "_decode", lambda audio: audio), \
+                patch.object(speech_output, "_play", lambda samples, on_start, session: played.append(samples)), \
+                patch("builtins.print"):
+            self.assertEqual(speech_output.prewarm(["Yes sir?"]), 1)
+            self.assertEqual(speech_output.prewarm(["Yes sir?"]), 0)
+            speech_output.speak("Yes sir?")
+            speech_output.speak("**Yes** sir?")
+            speech_output.speak("Yes sir?", rate="+10%")
+
+        self.assertEqual(synthesized, ["Yes sir?", "Yes sir?"])
+        self.assertEqual(played, [b"mp3"] * 3)
+        key = cache.key_for("Yes sir?", speech_output.JARVIS_VOICE, "+0%", "+0Hz")
+        self.assertTrue(os.path.exists(cache.file_for(key)))
+        self.assertEqual(cache.stats["hits"], 2)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_long_text_not_cached(self):
+        import os
+        from unittest.mock import patch
+        from core import speech_output
+        from core.tts_cache import TTSCache
+        cache = TTSCache(os.path.join(self.tmp.name, "cache"), max_text_chars=20)
+        with patch.object(speech_output, "_cached_tts_cache", cache), \
+                patch.object(speech_output, "get_phrase_bank", return_value=None), \
+                patch.object(speech_output, "_synthesize", return_value=b"mp3"):
+            audio = speech_output._render("A rather long reply that will not repeat.")
+        self.assertEqual(audio, b"mp3")
+        self.assertEqual(len(cache), 0)
+
+
+class TestPhraseBank(unittest.TestCase):
+    """Test pre-rendering of JARVIS's fixed phrases."""
+
+    SOURCE = '''
+"""Module docstring. Not spoken."""
+GREETINGS = {"morning": ["Good morning, sir. Ready when you are."]}
+
+
+def handler(level):
+    """Docstring, sir."""
+    print("Printed, not spoken.")
+    if level:
+        return f"Volume set to {level} percent, sir."
+    return "Please specify a volume level, sir."
+
+
+router.add("thanks", ["thank you"], reply="At your service, sir. Always.")
+'''
+
+    def setUp(self):
+        import os
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, "replies.py")
+        with open(self.source, "w") as f:
+            f.write(self.SOURCE)
+
+    def test_scan_finds_static_phrases_and_templates(self):
+        from core.phrase_bank import scan_source
+        phrases, templates = scan_source(self.source)
+        self.assertEqual(sorted(text for text, _, _ in phrases),
+                         ["At your service, sir. Always.", "Good morning, sir. Ready when you are.",
+                          "Please specify a volume level, sir."])
+        self.assertEqual([text for text, _, _ in templates], ["Volume set to {} percent, sir."])
+        owners = {text: owner for text, _, owner in phrases}
+        self.assertEqual(owners["Good morning, sir. Ready when you are."], "GREETINGS")
+
+    def test_repo_phrases_cover_wake_reply_and_greeting_voice(self):
+        from core.phrase_bank import collect_phrases
+        from core.speech_output import GREETING_RATE, GREETING_PITCH, JARVIS_RATE, JARVIS_PITCH
+        phrases, templates = collect_phrases()
+        self.assertIn(("Yes sir?", JARVIS_RATE, JARVIS_PITCH), phrases)
+        greeting = "Afternoon, sir. Systems standing by."
+        self.assertIn((greeting, JARVIS_RATE, JARVIS_PITCH), phrases)
+        self.assertIn((greeting, GREETING_RATE, GREETING_PITCH), phrases)
+        self.assertIn("Volume set to {} percent, sir.", [text for text, _ in templates])
+
+    def test_build_then_speak_from_bank(self):
+        import os
+        from unittest.mock import patch
+        from core import speech_output
+        from core.phrase_bank import PhraseBank
+
+        def synthesize(text, rate, pitch):
+            return text.encode()
+
+        bank = PhraseBank(os.path.join(self.tmp.name, "bank"), workers=2, sources=[self.source])
+        build = bank.build(synthesize)
+        self.assertEqual((build["phrases"], build["rendered"], build["failed"]), (4, 4, 0))
+        self.assertEqual(bank.build(synthesize)["rendered"], 0)
+
+        played = []
+        with patch.object(speech_output, "_cached_phrase_bank", bank), \
+                patch.object(speech_output, "get_tts_cache", return_value=None), \
+                patch.object(speech_output, "_synthesize") as synthesize_mock, \
+                patch.object(speech_output, "_decode", lambda audio: audio.decode()), \
+                patch.object(speech_output, "_play", lambda samples, on_start, session: played.append(samples)), \
+                patch("builtins.print"):
+            speech_output.speak("At your service, sir. Always.")
+            speech_output.speak_greeting("Good morning, sir. Ready when you are.")
+        synthesize_mock.assert_not_called()
+        self.assertEqual(played, ["At your service, sir. Always.", "Good morning, sir. Ready when you are."])
+        self.assertEqual(bank.stats["hits"], 2)
+
+        # The index survives a restart, and removed phrases are pruned
+        reopened = PhraseBank(bank.path, sources=[self.source])
+        self.assertEqual(len(reopened.entries), 4)
+        with open(self.source, "w") as f:
+            f.write('REPLY = "Only this one, sir."\n')
+        self.assertEqual(reopened.build(synthesize)["removed"], 4)
+        self.assertIn("1/1 static phrases rendered (100%)", reopened.report())
+
+    def test_sources_found_from_any_directory_and_clips_named_by_format(self):
+        import os
+        from unittest.mock import patch
+        from core.phrase_bank import PhraseBank, collect_phrases
+        from core.speech_output import JARVIS_RATE, JARVIS_PITCH, StubTTSBackend
+
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        with patch("builtins.print") as printed:
+            phrases, _ = collect_phrases(["main.py", "core/no_such_module.py"])
+        self.assertIn(("Yes sir?", JARVIS_RATE, JARVIS_PITCH), phrases)
+        self.assertIn("no_such_module.py", str(printed.call_args))
+
+        stub = StubTTSBackend(seconds_per_char=0.001)
+        bank = PhraseBank(os.path.join(self.tmp.name, "bank"), sources=[self.source])
+        bank.build(lambda text, rate, pitch: stub.synthesize(text))
+        key = next(iter(bank.entries))
+        self.assertTrue(bank.get(key).endswith(".wav"))
+        self.assertTrue(os.path.exists(bank.get(key)))
+
+
+class TestWakeWordEngine(unittest.TestCase):
+    """Test the persistent wake word session against a WAV file."""
+
+    class LoudnessDetector:
+        """Stand-in for Porcupine: 'hears' the keyword in any loud frame."""
+        sample_rate = 16000
+        frame_length = 512
+
+        def __init__(self):
+            self.frames = 0
+
+        def process(self, pcm):
+            self.frames += 1
+            return 0 if max(abs(s) for s in pcm) > 8000 else -1
+
+    def _wav(self, *segments):
+        return tone_wav(self, *segments)
+
+    def _engine(self, path, frame_length=512, realtime=False):
+        from core.wake_word import WakeWordEngine, WavFileSource
+        engine = WakeWordEngine(source=WavFileSource(path, frame_length=frame_length, realtime=realtime),
+                                detector=self.LoudnessDetector())
+        self.addCleanup(engine.close)
+        return engine
+
+    def test_rearming_reuses_detector_and_stream(self):
+        engine = self._engine(self._wav((10 * 512, 0), (512, 20000), (5 * 512, 0), (512, 20000)))
+        detector, source = engine.detector, engine.source
+        self.assertEqual(engine.wait(), 0)
+        self.assertEqual(detector.frames, 11)
+        self.assertEqual(engine.wait(), 0)
+        self.assertEqual(detector.frames, 17)
+        self.assertIs(engine.detector, detector)
+        self.assertIs(engine.source, source)
+        self.assertIsNone(engine.wait())  # End of file
+
+    def test_source_frames_rechunked_for_detector(self):
+        engine = self._engine(self._wav((4800, 0), (1600, 20000)), frame_length=300)
+        self.assertEqual(engine.wait(), 0)
+
+    def test_command_audio_read_from_same_stream(self):
+        import struct
+        import speech_recognition as sr
+        engine = self._engine(self._wav((512, 20000), (16000, 3000)), realtime=True)
+        self.assertEqual(engine.wait(), 0)
+        with engine.microphone() as source:
+            self.assertEqual(source.SAMPLE_RATE, 16000)
+            self.assertGreater(source.noise_floor, 0)
+            audio = sr.Recognizer().record(source, duration=0.5)
+        samples = struct.unpack("<%dh" % (len(audio.frame_data) // 2), audio.frame_data)
+        self.assertGreater(len(samples), 4000)
+        self.assertLessEqual(max(samples), 3000)  # Only the audio after the wake word
+
+    def test_audio_bus_views_and_preroll(self):
+        from core.audio_bus import AudioBus
+        from core.wake_word import WavFileSource
+        path = self._wav((3000, 0), (3000, 1000))
+        bus = AudioBus(WavFileSource(path, frame_length=256), capacity_seconds=0.25)  # 4000 samples
+        bus.start()
+        bus._thread.join()
+        self.assertEqual(bus.written, 6000)
+        late = bus.reader(preroll=1.0)  # Clamped to what the ring still holds
+        self.assertEqual(late.position, 2000)
+        window = late.view(4000)  # Wraps around the ring, still one contiguous view
+        self.assertIs(window.base, bus._ring)
+        self.assertEqual((abs(window[:1000]).max(), abs(window[1000:]).max()), (0, 1000))
+        self.assertEqual(len(late.view(10)), 0)  # End of file
+        bus.close()
+
+    def test_noise_floor_ignores_speech_and_follows_the_room(self):
+        from core.audio_bus import NoiseFloor
+        floor = NoiseFloor()
+        for i in range(200):
+            floor.update(3000 if i % 40 < 30 else 100)  # Speech with short pauses
+        self.assertLess(floor.value, 300)  # Near the pauses, nowhere near speech
+        for i in range(200):
+            floor.update(500)  # Fan switched on
+        self.assertAlmostEqual(floor.value, 500, delta=1)
+
+
+class TestVoiceActivityDetector(unittest.TestCase):
+    """Test VAD endpointing on synthetic audio."""
+
+    def _phrase(self, lead=0.5, speech=0.6, gap=0.15, trail=1.0):
+        """Harmonic 'speech' with a short pause in the middle, over light noise."""
+        import numpy as np
+        rng = np.random.default_rng(0)
+        t = np.arange(int(speech * 16000)) / 16000
+        voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 8)) * 2000
+        parts = [np.zeros(int(lead * 16000)), voiced, np.zeros(int(gap * 16000)), voiced,
+                 np.zeros(int(trail * 16000))]
+        samples = np.concatenate(parts) + rng.standard_normal(sum(len(p) for p in parts)) * 50
+        speech_end = lead + 2 * speech + gap
+        return samples.astype(np.int16), speech_end
+
+    def _source(self, samples):
+        import speech_recognition as sr
+
+        class Replay(sr.AudioSource):
+            SAMPLE_RATE, SAMPLE_WIDTH, CHUNK = 16000, 2, 1024
+
+            def __init__(self):
+                self.stream, self.consumed = self, 0
+
+            def read(self, size):
+                chunk = samples[self.consumed:self.consumed + size]
+                self.consumed += len(chunk)
+                return chunk.tobytes()
+        return Replay()
+
+    def test_endpoint_within_hangover(self):
+        from core.vad import VoiceActivityDetector, listen
+        samples, speech_end = self._phrase()
+        source = self._source(samples)
+        audio = listen(source, VoiceActivityDetector(), timeout=5, noise_floor=50)
+        delay = source.consumed / 16000 - speech_end
+        self.assertGreaterEqual(delay, 0.25)  # The mid-phrase pause did not end it
+        self.assertLess(delay, 0.35)
+        duration = len(audio.frame_data) / 2 / 16000
+        self.assertAlmostEqual(duration, 1.35 + 0.3 + 0.15, delta=0.1)  # Phrase + pre-roll + tail
+
+    def test_frame_features(self):
+        import numpy as np
+        from core.vad import VoiceActivityDetector
+        vad = VoiceActivityDetector()
+        samples, _ = self._phrase(lead=0.2, trail=0.0)
+        noise = np.random.default_rng(1).standard_normal(3200) * 1000
+        rms, zcr, flatness = vad.features(np.concatenate((samples[3200:6400], noise)))
+        self.assertEqual(len(rms), 20)
+        self.assertLess(flatness[:10].max(), 0.1)    # Voiced
+        self.assertGreater(flatness[10:].min(), 0.3)  # Noise
+        self.assertLess(zcr[:10].max(), zcr[10:].min())
+
+    def test_silence_times_out(self):
+        import numpy as np
+        import speech_recognition as sr
+        from core.vad import VoiceActivityDetector, listen
+        source = self._source(np.zeros(16000 * 3, dtype=np.int16))
+        with self.assertRaises(sr.WaitTimeoutError):
+            listen(source, VoiceActivityDetector(), timeout=1)
+        self.assertLess(source.consumed, 16000 * 1.2)
+
+
+class TestASRBackends(unittest.TestCase):
+    """Test the speech engine registry and racing."""
+
+    def _audio(self, data=b"\x01\x00" * 160):
+        import speech_recognition as sr
+        return sr.AudioData(data, 16000, 2)
+
+    def test_stub_is_deterministic(self):
+        import speech_recognition as sr
+        from core.voice_input import StubBackend, create_backend
+        stub = create_backend("stub")
+        self.assertIsInstance(stub, StubBackend)
+        stub.learn(self._audio(), "open chrome")
+        self.assertEqual(stub.transcribe(self._audio()), ("open chrome", 1.0))
+        with self.assertRaises(sr.UnknownValueError):
+            stub.transcribe(self._audio(b"\x00\x00" * 160))
+        self.assertEqual((stub.stats()["calls"], stub.stats()["errors"]), (2, 1))
+
+    def test_race_takes_first_confident_result(self):
+        import time
+        from core.voice_input import RacingBackend, StubBackend
+        audio = self._audio()
+        fast_unsure = StubBackend(delay=0.01, confidence=0.3)
+        slow_sure = StubBackend(delay=0.1)
+        fast_unsure.learn(audio, "open crow")
+        slow_sure.learn(audio, "open chrome")
+        fast_unsure.name, slow_sure.name = "local", "remote"
+        race = RacingBackend([fast_unsure, slow_sure], min_confidence=0.6)
+        self.assertEqual(race.transcribe(audio), ("open chrome", 1.0))
+
+        slow_sure.delay, fast_unsure.confidence = 1.0, 0.9
+        start = time.perf_counter()
+        self.assertEqual(race.transcribe(audio), ("open crow", 0.9))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(race.wins, {"local": 1, "remote": 1})
+
+    def test_race_falls_back_when_engines_fail(self):
+        import speech_recognition as sr
+        from core.voice_input import ASRBackend, RacingBackend, StubBackend
+
+        class Offline(ASRBackend):
+            name = "google"
+
+            def _transcribe(self, audio):
+                raise sr.RequestError("no network")
+
+        audio = self._audio()
+        unsure = StubBackend(confidence=0.2)
+        unsure.learn(audio, "open chrome")
+        self.assertEqual(RacingBackend([Offline(), unsure]).transcribe(audio), ("open chrome", 0.2))
+        with self.assertRaises(sr.RequestError):
+            RacingBackend([Offline(), Offline()]).transcribe(audio)
+
+    def test_word_error_rate(self):
+        from core.voice_input import word_error_rate
+        self.assertEqual(word_error_rate("Turn on the lights", "turn on the lights"), 0.0)
+        self.assertEqual(word_error_rate("turn on the lights", "turn of the light please"), 0.75)
+        self.assertEqual(word_error_rate("open chrome", None), 1.0)
+
+
+class TestStreamingCapture(unittest.TestCase):
+    """Replay a recording at real-time speed through streaming recognition."""
+
+    def test_command_routed_before_capture_ends(self):
+        import time
+        from unittest.mock import patch
+        from core import voice_input
+        from core.audio_bus import AudioBus
+        from core.speculative import SpeculativeRouter
+        from core.voice_input import StubBackend, capture_command, recognize_audio
+        from core.wake_word import BusMicrophone, WavFileSource
+
+        # 0.3 s quiet, 0.8 s "speech", then silence for the VAD to end on
+        path = tone_wav(self, (4800, 0), (12800, 8000), (16000, 0))
+        bus = AudioBus(WavFileSource(path, frame_length=512, realtime=True)).start()
+        self.addCleanup(bus.close)
+        engine = StubBackend(script=[(0.5, "open"), (0.7, "open chrome"), (0.9, "open chrome"),
+                                     (1.1, "open chrome")])
+        started = []
+        speculator = SpeculativeRouter(route=lambda text: started.append(time.perf_counter()) or "Opened")
+
+        with patch.object(voice_input, "_cached_asr", engine), \
+                patch.object(voice_input, "_shared_source", BusMicrophone(bus, preroll=0)), \
+                patch.object(engine, "transcribe") as transcribe, \
+                patch("builtins.print"):
+            audio = capture_command(timeout=2, on_partial=speculator.update)
+            captured = time.perf_counter()
+            command = recognize_audio(audio)
+
+        self.assertEqual(command, "open chrome")
+        transcribe.assert_not_called()  # Final transcript came from the stream
+        self.assertGreater(captured - started[0], 0.3)  # Routed while the user was still talking
+        self.assertEqual(speculator.resolve(command), "Opened")
+
 
 class TestVoiceInputMicPriority(unittest.TestCase):
     """Test microphone selection logic."""